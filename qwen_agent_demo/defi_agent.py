@@ -8,7 +8,7 @@ from dotenv import load_dotenv
 from qwen_agent.agents import Assistant
 from qwen_agent.llm import get_chat_model
 
-from defi_intent_parser.tool import ParseSwapIntentTool
+from defi_intent_parser.tool import ParseSwapIntentTool, ParseSwapPlanTool
 
 # 加载环境变量
 load_dotenv()
@@ -138,7 +138,7 @@ def main():
     print_section("DeFi Swap 意图解析 Agent")
     print(f"\n📋 配置信息:")
     print(f"   模型: {model_name}")
-    print(f"   工具: parse_swap_intent")
+    print(f"   工具: parse_swap_intent, parse_swap_plan")
     
     # 初始化 LLM
     llm_cfg = {
@@ -151,6 +151,7 @@ def main():
     # 创建工具实例
     tools = [
         ParseSwapIntentTool(),
+        ParseSwapPlanTool(),
     ]
     
     # 创建 Agent 并挂载工具
@@ -172,6 +173,10 @@ def main():
      "amount": "10"
    }
 
+如果用户的指令包含多个步骤（例如 "swap 100 U for ETH on Base and then bridge half to Polygon"、
+"换成 ETH，然后把一半跨链到 Polygon"），改为调用一次 parse_swap_plan 工具，直接返回它给出的
+{"steps": [...]}，不要逐步多次调用工具。
+
 请直接返回 JSON，不要添加额外的解释文字。如果解析失败，返回错误信息。''',
         function_list=tools,  # 挂载工具
     )
@@ -1,12 +1,25 @@
 """
 DeFi 意图解析包。
 
-目前仅提供最小的 Swap 意图解析函数：
-- parse_swap_intent(text): 从自然语言中抽取链名、代币和金额等字段。
+目前提供：
+- parse_swap_intent(text): 从自然语言中抽取链名、代币和金额等字段，金额同时给出按代币精度
+  换算的精确整数 amountBaseUnits。
+- parse_swap_plan(text): 把“然后 / 再 / and then”连接的多步骤指令拆成有序的执行计划，
+  步骤之间带依赖关系（“一半”“全部”引用前一步的产出）。
+- parse_swap_intents(texts, workers, chunksize): 多进程批量解析，按输入顺序流式产出；
+  命令行入口见 `python -m defi_intent_parser --help`。
+- AliasMatcher: Aho-Corasick 多模式别名匹配器，一次扫描找出所有链名 / 代币。
+- TokenRegistry / load_registry(): mmap 加载的代币注册表（符号、别名、链、ZRC-20 地址、精度），
+  源数据在 data/tokens.json，用 `python -m defi_intent_parser.compile_registry` 编译。
 """
 
+from .batch import parse_swap_intents
+from .matcher import AliasMatch, AliasMatcher
 from .parser import parse_swap_intent
+from .plan import parse_swap_plan
+from .registry import TokenRegistry, load_registry
 
-__all__ = ["parse_swap_intent"]
+__all__ = ["AliasMatch", "AliasMatcher", "TokenRegistry", "load_registry", "parse_swap_intent", "parse_swap_intents",
+           "parse_swap_plan"]
 
 
@@ -0,0 +1,74 @@
+"""
+批量重放聊天日志：python -m defi_intent_parser
+
+从 JSONL 或 CSV 读取文本，多进程解析后按输入顺序写出 JSONL，每行形如
+{"line": 1, "chain": ..., "tokenIn": ..., "tokenOut": ..., "amount": ...}。
+输入输出都是流式处理，内存占用不随文件大小增长。
+
+示例：
+    python -m defi_intent_parser chats.jsonl -o intents.jsonl --field text --workers 8
+    python -m defi_intent_parser chats.csv --field message > intents.jsonl
+    cat chats.jsonl | python -m defi_intent_parser - --format jsonl
+"""
+import argparse
+import csv
+import json
+import sys
+from itertools import tee
+from typing import Iterator, TextIO
+
+from .batch import parse_swap_intents
+
+
+def _read_jsonl(stream: TextIO, field: str) -> Iterator[str]:
+    for line in stream:
+        line = line.strip()
+        if not line:
+            continue
+        record = json.loads(line)
+        # 既支持 {"text": "..."} 这样的对象，也支持一行一个 JSON 字符串
+        value = record.get(field) if isinstance(record, dict) else record
+        yield value if isinstance(value, str) else ""
+
+
+def _read_csv(stream: TextIO, field: str) -> Iterator[str]:
+    for row in csv.DictReader(stream):
+        yield row.get(field) or ""
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m defi_intent_parser", description="批量解析 DeFi Swap 意图")
+    parser.add_argument("input", help="输入文件（JSONL 或 CSV），- 表示标准输入")
+    parser.add_argument("-o", "--output", default="-", help="输出 JSONL 文件，默认标准输出")
+    parser.add_argument("--format", choices=["jsonl", "csv"], help="输入格式，默认按扩展名判断")
+    parser.add_argument("--field", default="text", help="文本所在的字段 / 列名")
+    parser.add_argument("--workers", type=int, default=None, help="进程数，默认 CPU 核数")
+    parser.add_argument("--chunksize", type=int, default=1000, help="每个任务块的条数")
+    parser.add_argument("--include-text", action="store_true", help="输出中带上原文")
+    args = parser.parse_args(argv)
+
+    input_format = args.format or ("csv" if args.input.lower().endswith(".csv") else "jsonl")
+    source = sys.stdin if args.input == "-" else open(args.input, encoding="utf-8", newline="")
+    sink = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+    try:
+        reader = _read_csv if input_format == "csv" else _read_jsonl
+        texts = reader(source, args.field)
+        if args.include_text:
+            # tee 只缓存还在解析中的那部分文本，内存仍受在途块数限制
+            texts, originals = tee(texts)
+        intents = parse_swap_intents(texts, workers=args.workers, chunksize=args.chunksize)
+        for number, intent in enumerate(intents, 1):
+            record = {"line": number, **intent}
+            if args.include_text:
+                record["text"] = next(originals)
+            sink.write(json.dumps(record, ensure_ascii=False) + "\n")
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if sink is not sys.stdout:
+            sink.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,57 @@
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from .parser import parse_swap_intents_chunk
+
+
+def _parse_chunk(texts: List[str]) -> List[Dict[str, Any]]:
+    """在子进程中解析一批文本（模块级函数，才能被进程池 pickle）。"""
+    return parse_swap_intents_chunk(texts)
+
+
+def _chunks(texts: Iterable[str], chunksize: int) -> Iterator[List[str]]:
+    iterator = iter(texts)
+    while True:
+        chunk = list(islice(iterator, chunksize))
+        if not chunk:
+            return
+        yield chunk
+
+
+def parse_swap_intents(
+    texts: Iterable[str],
+    workers: Optional[int] = None,
+    chunksize: int = 1000,
+    max_pending: Optional[int] = None,
+) -> Iterator[Dict[str, Any]]:
+    """
+    批量解析 Swap 意图，按输入顺序逐条产出结果。
+
+    输入按 `chunksize` 条切块分给 `workers` 个进程（默认 CPU 核数；为 1 时在
+    当前进程内串行解析）。同时在途的块最多 `max_pending` 个（默认 workers * 2），
+    所以输入可以是任意长的惰性迭代器（例如逐行读取的日志文件），内存占用
+    与输入总量无关。提前停止迭代时，尚未开始的块会被取消。
+    """
+    if chunksize < 1:
+        raise ValueError("chunksize must be at least 1")
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        for chunk in _chunks(texts, chunksize):
+            yield from _parse_chunk(chunk)
+        return
+
+    max_pending = max_pending or workers * 2
+    pool = ProcessPoolExecutor(max_workers=workers)
+    pending = deque()
+    try:
+        for chunk in _chunks(texts, chunksize):
+            pending.append(pool.submit(_parse_chunk, chunk))
+            if len(pending) >= max_pending:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
@@ -0,0 +1,26 @@
+"""
+编译代币注册表：python -m defi_intent_parser.compile_registry [tokens.json] [tokens.bin]
+
+默认读取 data/tokens.json、写出 data/tokens.bin。修改 JSON 后重新运行即可，
+不需要改代码；解析器加载时若发现默认二进制文件过期也会自动重编译。
+"""
+import argparse
+import sys
+
+from .registry import DEFAULT_PATH, DEFAULT_SOURCE, TokenRegistry, compile_file
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m defi_intent_parser.compile_registry", description="编译代币注册表")
+    parser.add_argument("source", nargs="?", default=DEFAULT_SOURCE, help="JSON 源文件")
+    parser.add_argument("output", nargs="?", default=DEFAULT_PATH, help="输出的二进制文件")
+    args = parser.parse_args(argv)
+
+    size = compile_file(args.source, args.output)
+    registry = TokenRegistry(args.output)
+    print(f"{args.output}: {len(registry)} tokens, {size} bytes")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
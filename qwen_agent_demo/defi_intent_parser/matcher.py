@@ -0,0 +1,238 @@
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from functools import lru_cache
+from typing import Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+# 序列化时 kind 以整数保存
+KINDS = ("chain", "token")
+
+
+class AliasMatch(NamedTuple):
+    """一次别名命中：text[start:end] 对应 kind（如 "chain" / "token"）下的规范值 value。"""
+
+    start: int
+    end: int
+    kind: str
+    value: str
+
+
+def _fold_char(char: str) -> str:
+    """单字符大小写折叠；折叠后长度变化的字符（如 ß）保持原样，保证下标一一对应。"""
+    folded = char.lower()
+    return folded if len(folded) == 1 else char
+
+
+def _is_ascii_letter(char: str) -> bool:
+    return "a" <= char <= "z" or "A" <= char <= "Z"
+
+
+class _MatcherBase(ABC):
+    @abstractmethod
+    def iter_matches(self, text: str) -> Iterator[AliasMatch]:
+        """逐个产出 text 中的全部别名命中（可重叠、不保证顺序）。"""
+
+    def find_all(self, text: str, kind: Optional[str] = None) -> List[AliasMatch]:
+        """
+        返回按起始位置排序的命中列表；同一 kind 内重叠时取最左最长的那个，
+        不同 kind 之间互不影响（同一个词既可以是链名也可以是代币）。
+        """
+        candidates = sorted(
+            (match for match in self.iter_matches(text) if kind is None or match.kind == kind),
+            key=lambda match: (match.start, match.start - match.end),
+        )
+        selected = []
+        covered_until = {}
+        for match in candidates:
+            if match.start >= covered_until.get(match.kind, 0):
+                selected.append(match)
+                covered_until[match.kind] = match.end
+        return selected
+
+
+def _rejected_by_boundary(text: str, start: int, end: int) -> bool:
+    return (start > 0 and _is_ascii_letter(text[start - 1])) or (end < len(text) and _is_ascii_letter(text[end]))
+
+
+class AliasMatcher(_MatcherBase):
+    """
+    基于 Aho-Corasick 自动机的多模式别名匹配器。
+
+    一次扫描文本即可找出所有链名 / 代币别名的出现位置，耗时与文本长度成正比，
+    与别名表大小无关。大小写折叠只在构建时做一次：别名按字符折叠后入树，
+    同时为字母表中每个字符登记其大写形式到 `fold` 表，匹配时逐字符查表即可，
+    不需要先把整段文本转小写。
+
+    纯 ASCII 别名按单词匹配：命中位置前后紧邻 ASCII 字母时丢弃
+    （"u" 不会命中 "usdc" 或 "bus"），数字和中文可以紧邻（"50U"、"换成ETH"）。
+
+    节点以并行数组保存（edges / fail / terminal / outputs），模式信息在 patterns 中，
+    便于整体序列化。
+    """
+
+    def __init__(self, entries: Iterable[Tuple[str, str, str]] = ()):
+        # edges[n]: 字符 -> 子节点；fail[n]: 失败指针；terminal[n]: 恰好在 n 结束的模式编号；
+        # outputs[n]: build 后 n 处的全部命中模式（terminal 加上失败链继承的）
+        self.edges: List[Dict[str, int]] = [{}]
+        self.fail: List[int] = [0]
+        self.terminal: List[List[int]] = [[]]
+        self.outputs: List[List[int]] = [[]]
+        # patterns[i] = (折叠后长度, kind, value, 是否按单词边界匹配)
+        self.patterns: List[Tuple[int, str, str, bool]] = []
+        # 原文字符 -> 折叠字符；不在表中的字符不属于任何别名
+        self.fold: Dict[str, str] = {}
+        self._built = True
+        for alias, kind, value in entries:
+            self.add(alias, kind, value)
+        self.build()
+
+    def add(self, alias: str, kind: str, value: str):
+        """登记一个别名；添加完毕后需调用 build()。"""
+        folded = "".join(_fold_char(char) for char in alias)
+        if not folded:
+            return
+        node = 0
+        for char in folded:
+            nxt = self.edges[node].get(char)
+            if nxt is None:
+                nxt = len(self.edges)
+                self.edges[node][char] = nxt
+                self.edges.append({})
+                self.fail.append(0)
+                self.terminal.append([])
+                self.outputs.append([])
+            node = nxt
+            if char not in self.fold:
+                for variant in {char, char.upper(), char.title()}:
+                    if len(variant) == 1 and _fold_char(variant) == char:
+                        self.fold[variant] = char
+
+        pattern = (len(folded), kind, value, alias.isascii())
+        if pattern not in (self.patterns[i] for i in self.terminal[node]):
+            self.terminal[node].append(len(self.patterns))
+            self.patterns.append(pattern)
+        self._built = False
+
+    def build(self):
+        """按 BFS 计算失败指针，并把失败链上的输出合并到每个节点。"""
+        if self._built:
+            return
+        edges, fail, terminal, outputs = self.edges, self.fail, self.terminal, self.outputs
+        outputs[0] = []
+        queue = []
+        for child in edges[0].values():
+            fail[child] = 0
+            queue.append(child)
+        head = 0
+        while head < len(queue):
+            node = queue[head]
+            head += 1
+            # 失败节点更浅，BFS 保证它的 outputs 已经算好
+            outputs[node] = terminal[node] + outputs[fail[node]]
+            for char, child in edges[node].items():
+                state = fail[node]
+                while state and char not in edges[state]:
+                    state = fail[state]
+                target = edges[state].get(char, 0)
+                fail[child] = target if target != child else 0
+                queue.append(child)
+        self._built = True
+
+    def iter_matches(self, text: str) -> Iterator[AliasMatch]:
+        """按结束位置顺序产出所有命中（可能重叠）。"""
+        if not self._built:
+            self.build()
+        edges, fail, outputs, patterns, fold = self.edges, self.fail, self.outputs, self.patterns, self.fold
+        node = 0
+        for index, raw in enumerate(text):
+            char = fold.get(raw)
+            if char is None:
+                node = 0
+                continue
+            while node and char not in edges[node]:
+                node = fail[node]
+            node = edges[node].get(char, 0)
+            for pattern_id in outputs[node]:
+                length, kind, value, ascii_word = patterns[pattern_id]
+                start = index - length + 1
+                if ascii_word and _rejected_by_boundary(text, start, index + 1):
+                    continue
+                yield AliasMatch(start, index + 1, kind, value)
+
+    def to_arrays(self, intern: Callable[[str], int]) -> Dict[str, List[int]]:
+        """
+        导出为 ArrayAliasMatcher 使用的整数列（CSR 布局），字符串经 `intern`
+        换成字符串表下标。每个节点的出边按字符码位排序，便于二分查找。
+        """
+        self.build()
+        columns = {name: [] for name in ArrayAliasMatcher.COLUMNS}
+        columns["node_edge_start"].append(0)
+        columns["node_out_start"].append(0)
+        for node, edges in enumerate(self.edges):
+            for char, target in sorted(edges.items(), key=lambda item: ord(item[0])):
+                columns["edge_char"].append(ord(char))
+                columns["edge_target"].append(target)
+            columns["node_edge_start"].append(len(columns["edge_char"]))
+            columns["node_fail"].append(self.fail[node])
+            columns["out_pattern"].extend(self.outputs[node])
+            columns["node_out_start"].append(len(columns["out_pattern"]))
+        for length, kind, value, ascii_word in self.patterns:
+            columns["pattern_length"].append(length)
+            columns["pattern_kind"].append(KINDS.index(kind))
+            columns["pattern_value"].append(intern(value))
+            columns["pattern_word"].append(int(ascii_word))
+        for raw, folded in sorted(self.fold.items(), key=lambda item: ord(item[0])):
+            columns["fold_from"].append(ord(raw))
+            columns["fold_to"].append(ord(folded))
+        return columns
+
+
+class ArrayAliasMatcher(_MatcherBase):
+    """
+    与 AliasMatcher 行为一致、但直接在整数数组上运行的只读自动机。
+
+    各列可以是 list，也可以是指向 mmap 文件的 memoryview，这样加载时不需要
+    重建节点和模式对象，出边用二分查找。只有字符折叠表会展开成 dict：
+    它的大小取决于字母表而不是别名数量。`string(i)` 把字符串表下标还原为字符串。
+    """
+
+    COLUMNS = (
+        "node_edge_start", "edge_char", "edge_target", "node_fail",
+        "node_out_start", "out_pattern",
+        "pattern_length", "pattern_kind", "pattern_value", "pattern_word",
+        "fold_from", "fold_to",
+    )
+
+    def __init__(self, columns: Dict[str, Sequence[int]], string: Callable[[int], str]):
+        for name in self.COLUMNS:
+            setattr(self, name, columns[name])
+        self.fold = {chr(raw): folded for raw, folded in zip(self.fold_from, self.fold_to)}
+        # 命中的规范值很少，缓存解码结果
+        self._string = lru_cache(maxsize=4096)(string)
+
+    def iter_matches(self, text: str) -> Iterator[AliasMatch]:
+        """按结束位置顺序产出所有命中（可能重叠）。"""
+        edge_start, edge_char, edge_target, fail = self.node_edge_start, self.edge_char, self.edge_target, self.node_fail
+        out_start, out_pattern = self.node_out_start, self.out_pattern
+        fold = self.fold
+        node = 0
+        for index, raw in enumerate(text):
+            char = fold.get(raw)
+            if char is None:
+                node = 0
+                continue
+            while True:
+                low, high = edge_start[node], edge_start[node + 1]
+                edge = bisect_left(edge_char, char, low, high)
+                if edge < high and edge_char[edge] == char:
+                    node = edge_target[edge]
+                    break
+                if node == 0:
+                    break
+                node = fail[node]
+            for slot in range(out_start[node], out_start[node + 1]):
+                pattern_id = out_pattern[slot]
+                start = index - self.pattern_length[pattern_id] + 1
+                if self.pattern_word[pattern_id] and _rejected_by_boundary(text, start, index + 1):
+                    continue
+                yield AliasMatch(start, index + 1, KINDS[self.pattern_kind[pattern_id]],
+                                 self._string(self.pattern_value[pattern_id]))
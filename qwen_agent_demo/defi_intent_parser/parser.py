@@ -1,93 +1,131 @@
 import re
-from typing import Any, Dict, Optional
-
-
-# 简单的链名映射表（可以根据需要扩展）
-CHAIN_ALIASES = {
-    "base": "base",
-    "Base": "base",
-    "BASE": "base",
-    "polygon": "polygon",
-    "Polygon": "polygon",
-    "POLYGON": "polygon",
-}
-
-
-# 简单的代币符号映射表（可以根据需要扩展）
-TOKEN_ALIASES = {
-    "usdc": "USDC",
-    "USDC": "USDC",
-    "usdt": "USDT",
-    "USDT": "USDT",
-    # 口语中的“U”统一先映射为 USDT，后续可根据项目需要调整为 USDC
-    "u": "USDT",
-    "U": "USDT",
-    "eth": "ETH",
-    "ETH": "ETH",
-    "matic": "MATIC",
-    "MATIC": "MATIC",
-}
+from functools import lru_cache
+from typing import Any, Dict, List, Optional
+
+from .amounts import to_base_units_many
+from .registry import load_registry
+
+
+# 金额（后面可跟空白），以及句末的英文单词；模块加载时编译一次
+AMOUNT_PATTERN = re.compile(r"(\d+(?:\.\d+)?)\s*")
+AMOUNT_TOKEN_PATTERN = re.compile(r"(\d+(?:\.\d+)?)\s*([A-Za-z]+|[Uu])")
+TAIL_WORD_PATTERN = re.compile(r"([A-Za-z]{2,})\s*$")
+# 目标代币前的关键字；英文按单词匹配（"swap 100 U for ETH"、"usdt to eth"）
+TOKEN_OUT_PATTERN = re.compile(r"兑换成|换成|换为|\b(?:for|into|to)\b", re.IGNORECASE)
+
+
+# 链名 / 代币别名来自 mmap 加载的注册表（data/tokens.json 编译而来），新增代币只需改数据
+REGISTRY = load_registry()
+_MATCHER = REGISTRY.matcher
 
 
 def _normalize_token(token: str) -> Optional[str]:
     """将各种大小写 / 口语 token 归一化为标准代币符号。"""
     if not token:
         return None
-    return TOKEN_ALIASES.get(token, TOKEN_ALIASES.get(token.lower()))
+    for match in _MATCHER.find_all(token, "token"):
+        if match.start == 0 and match.end == len(token):
+            return match.value
+    return None
+
+
+@lru_cache(maxsize=None)
+def token_decimals(symbol: str, chain: Optional[str] = None) -> Optional[int]:
+    """
+    代币精度（注册表数据，进程内缓存）。指定的链上没有该代币时
+    退回到任意一条记录；未登记的代币返回 None。
+    """
+    record = REGISTRY.token(symbol, chain) or REGISTRY.token(symbol)
+    return record["decimals"] if record else None
 
 
-def _extract_chain(text: str) -> Optional[str]:
-    """从文本中提取链名（Base、Polygon 等），返回规范化后的 chain 标识。"""
-    for alias, normalized in CHAIN_ALIASES.items():
-        if alias in text:
-            return normalized
+def _extract_chain(matches: list) -> Optional[str]:
+    """从匹配结果中取第一个链名（Base、Polygon 等），返回规范化后的 chain 标识。"""
+    for match in matches:
+        if match.kind == "chain":
+            return match.value
     return None
 
 
-def _extract_amount_and_token_in(text: str) -> (Optional[str], Optional[str]):
+def _extract_amount_and_token_in(text: str, tokens_by_start: Dict[int, Any]) -> (Optional[str], Optional[str]):
     """
     提取输入金额和代币：
     - 支持类似“10 USDC”、“50 U”、“5.5 usdt”等形式。
+    - 取第一个紧跟代币别名的金额；都不紧跟时退回到“数字 + 英文单词”，代币记为 None。
     """
-    # 匹配金额 + 代币的简单正则
-    pattern = r"(\d+(?:\.\d+)?)\s*([A-Za-z]+|[Uu])"
-    match = re.search(pattern, text)
+    for match in AMOUNT_PATTERN.finditer(text):
+        token = tokens_by_start.get(match.end())
+        if token is not None:
+            return match.group(1), token.value
+    match = AMOUNT_TOKEN_PATTERN.search(text)
     if not match:
         return None, None
-    amount = match.group(1)
-    raw_token = match.group(2)
-    token = _normalize_token(raw_token)
-    return amount, token
+    return match.group(1), _normalize_token(match.group(2))
 
 
-def _extract_token_out(text: str) -> Optional[str]:
+def _extract_token_out(text: str, token_matches: list, token_in: Optional[str] = None) -> Optional[str]:
     """
-    根据"换成 / 兑换成 / 换为"等关键字，提取目标代币。
+    根据"换成 / 兑换成 / 换为 / for / into / to"等关键字，提取目标代币。
     示例：
     - 帮我在 Base 上用 10 USDC 换成 ETH
     - 把我 50 U 兑换成 Polygon 上的 MATIC
+    - swap 100 U for ETH on Base
+    句末兜底不接受与 token_in 相同的代币（"swap 10 usdc" 不是把 USDC 换成 USDC）。
     """
-    # 为了简单，这里只找第一个出现"换成/兑换成/换为"的位置
-    for kw in ["换成", "兑换成", "换为"]:
-        if kw in text:
-            idx = text.index(kw) + len(kw)
-            tail = text[idx:]
-            # 在 tail 中找所有可能的英文串（代币或链名）
-            all_matches = re.findall(r"([A-Za-z]+)", tail)
-            # 排除链名，找第一个代币符号
-            for match in all_matches:
-                normalized = _normalize_token(match)
-                if normalized and normalized not in CHAIN_ALIASES.values():
-                    return normalized
+    for keyword in TOKEN_OUT_PATTERN.finditer(text):
+        # 关键字之后的第一个代币别名（链名是另一类，不会混进来）
+        for match in token_matches:
+            if match.start >= keyword.end():
+                return match.value
     # 如果没有关键词，就尝试直接在句子末尾找一个代币符号（兜底）
-    tail_match = re.search(r"([A-Za-z]{2,})\s*$", text)
+    tail_match = TAIL_WORD_PATTERN.search(text)
     if tail_match:
-        normalized = _normalize_token(tail_match.group(1))
-        if normalized and normalized not in CHAIN_ALIASES.values():
-            return normalized
+        for match in token_matches:
+            if match.start == tail_match.start(1) and match.end == tail_match.end(1) and match.value != token_in:
+                return match.value
     return None
 
 
+def _parse_fields(text: str) -> Dict[str, Any]:
+    if not isinstance(text, str):
+        raise TypeError("text must be a string")
+
+    # 一次扫描拿到全部链名和代币命中
+    matches = _MATCHER.find_all(text)
+    token_matches = [match for match in matches if match.kind == "token"]
+
+    chain = _extract_chain(matches)
+    amount, token_in = _extract_amount_and_token_in(text, {match.start: match for match in token_matches})
+    token_out = _extract_token_out(text, token_matches, token_in)
+
+    return {
+        "chain": chain,
+        "tokenIn": token_in,
+        "tokenOut": token_out,
+        "amount": amount,
+    }
+
+
+def attach_base_units(intents: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    为一批意图就地补上 amountBaseUnits：按 tokenIn 的精度分组后整列换算。
+
+    精度未知（没有 tokenIn 或未登记）或小数位超过精度时为 None。
+    """
+    groups: Dict[int, List[Dict[str, Any]]] = {}
+    for intent in intents:
+        intent["amountBaseUnits"] = None
+        if intent["amount"] is not None and intent["tokenIn"] is not None:
+            decimals = token_decimals(intent["tokenIn"], intent["chain"])
+            if decimals is not None:
+                groups.setdefault(decimals, []).append(intent)
+    for decimals, group in groups.items():
+        values = to_base_units_many([intent["amount"] for intent in group], decimals)
+        for intent, value in zip(group, values):
+            intent["amountBaseUnits"] = value
+    return intents
+
+
 def parse_swap_intent(text: str) -> Dict[str, Any]:
     """
     从自然语言文本中解析 DeFi Swap 意图。
@@ -97,23 +135,17 @@ def parse_swap_intent(text: str) -> Dict[str, Any]:
         "chain": "base",
         "tokenIn": "USDC",
         "tokenOut": "ETH",
-        "amount": "10"
+        "amount": "10",
+        "amountBaseUnits": 10000000
     }
 
+    amount 保留原文中的十进制字符串，amountBaseUnits 是按 tokenIn 精度换算后的
+    精确整数（最小单位），下游直接使用即可，不必再查精度或经过 float。
     解析不出的字段返回 None。
     """
-    if not isinstance(text, str):
-        raise TypeError("text must be a string")
-
-    chain = _extract_chain(text)
-    amount, token_in = _extract_amount_and_token_in(text)
-    token_out = _extract_token_out(text)
-
-    return {
-        "chain": chain,
-        "tokenIn": token_in,
-        "tokenOut": token_out,
-        "amount": amount,
-    }
+    return attach_base_units([_parse_fields(text)])[0]
 
 
+def parse_swap_intents_chunk(texts: List[str]) -> List[Dict[str, Any]]:
+    """批量版本：先逐条抽取字段，再整批换算金额。"""
+    return attach_base_units([_parse_fields(text) for text in texts])
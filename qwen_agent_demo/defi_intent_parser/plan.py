@@ -0,0 +1,182 @@
+import re
+from decimal import Decimal
+from typing import Any, Dict, List, Optional
+
+from .parser import _MATCHER, _parse_fields, attach_base_units
+
+# 步骤连接词：然后 / 接着 / 之后 / 再 / then / and then / and also / after that / 分号，
+# 以及后面紧跟动作词或金额的 and（"swap ... and bridge ..."、"... and 20 usdt for eth"），避免误拆 "USDC and ETH"。
+# "再" 只在标点或空白之后、或紧跟动作词时才算连接词，避免拆开 "再来一次"
+STEP_SEPARATOR_PATTERN = re.compile(
+    r"\s*(?:[,，]?\s*(?:\band then\b|\band also\b|\bthen\b|\bafter that\b)|然后|接着|之后|[;；]"
+    r"|(?<=[,，;；。\s])再|再(?=把|将|跨|转|换|兑|发|桥)"
+    r"|[,，]?\s*\band\b(?=\s+(?:\d|(?:swap|bridge|send|transfer|buy|sell|exchange|convert)\b)))\s*",
+    re.IGNORECASE,
+)
+
+# 动作识别按顺序匹配，先命中的优先（"跨链换成" 算 bridge）
+ACTION_PATTERNS = [
+    ("bridge", re.compile(r"\bbridge\b|跨链|桥接|跨到", re.IGNORECASE)),
+    ("transfer", re.compile(r"\b(?:send|transfer)\b|转给|发送|转账", re.IGNORECASE)),
+    ("swap", re.compile(r"\b(?:swap|exchange|buy|sell|convert)\b|兑换|换成|换为", re.IGNORECASE)),
+]
+
+# 引用上一步产出的数量："一半"、"全部"、"30%"
+HALF_PATTERN = re.compile(r"\bhalf\b|一半", re.IGNORECASE)
+ALL_PATTERN = re.compile(r"\b(?:all|everything|it)\b|全部|所有|全都", re.IGNORECASE)
+PERCENT_PATTERN = re.compile(r"(\d+(?:\.\d+)?)\s*[%％]")
+# 收款地址（EVM 地址）
+ADDRESS_PATTERN = re.compile(r"(?<![0-9A-Za-z])0x[0-9a-fA-F]{40}(?![0-9A-Za-z])")
+
+
+def split_steps(text: str) -> List[str]:
+    """按连接词把一句话拆成有序的步骤文本，空片段丢弃。"""
+    return [part.strip(" ,，.。") for part in STEP_SEPARATOR_PATTERN.split(text) if part.strip(" ,，.。")]
+
+
+def _detect_action(text: str, intent: Dict[str, Any]) -> Optional[str]:
+    for action, pattern in ACTION_PATTERNS:
+        if pattern.search(text):
+            return action
+    return "swap" if intent["tokenOut"] else None
+
+
+def _amount_fraction(text: str) -> Optional[str]:
+    """步骤中引用前一步数量的比例（"0.5"、"1"、"0.3"），没有引用时返回 None。"""
+    match = PERCENT_PATTERN.search(text)
+    if match:
+        return format((Decimal(match.group(1)) / 100).normalize(), "f")
+    if HALF_PATTERN.search(text):
+        return "0.5"
+    if ALL_PATTERN.search(text):
+        return "1"
+    return None
+
+
+def _output_token(step: Dict[str, Any]) -> Optional[str]:
+    # swap 产出 tokenOut；bridge / transfer 原样搬运 tokenIn
+    return step["tokenOut"] if step["action"] == "swap" and step["tokenOut"] else step["tokenIn"]
+
+
+def _produced_token(step: Dict[str, Any]) -> Optional[str]:
+    # 这一步新得到的代币：swap 换来的 tokenOut、bridge 到达目的链的 tokenIn；transfer 只花不产
+    if step["action"] == "swap":
+        return step["tokenOut"]
+    if step["action"] == "bridge":
+        return step["tokenIn"]
+    return None
+
+
+def _output_chain(step: Dict[str, Any]) -> Optional[str]:
+    return step["toChain"] or step["chain"]
+
+
+def _parse_step(index: int, text: str, steps: List[Dict[str, Any]]) -> Dict[str, Any]:
+    address = ADDRESS_PATTERN.search(text)
+    if address:
+        # 地址里的数字和字母不能被当成金额或代币
+        stripped = text[:address.start()] + " " + text[address.end():]
+    else:
+        stripped = text
+    intent = _parse_fields(stripped)
+    action = _detect_action(stripped, intent)
+    fraction = _amount_fraction(stripped)
+    if fraction is not None:
+        # "30%" 里的数字不是金额
+        intent["amount"] = None
+
+    step = {
+        "step": index,
+        "action": action,
+        "chain": intent["chain"],
+        "toChain": None,
+        "tokenIn": intent["tokenIn"],
+        "tokenOut": intent["tokenOut"] if action == "swap" else None,
+        "amount": intent["amount"],
+        "amountBaseUnits": None,
+        "amountFrom": None,
+        "dependsOn": [],
+        "recipient": address.group() if address else None,
+        "text": text,
+    }
+    if step["tokenIn"] is None:
+        # 没有"金额 + 代币"时（"bridge 30% of my ETH"），取第一个不是目标代币的代币
+        step["tokenIn"] = next(
+            (match.value for match in _MATCHER.find_all(stripped, "token") if match.value != step["tokenOut"]), None
+        )
+    if action == "bridge":
+        # 一个链名时是目的链，源链沿用上一步；两个链名时按"从 A 到 B"
+        chains = [match.value for match in _MATCHER.find_all(stripped, "chain")]
+        step["chain"] = chains[0] if len(chains) > 1 else None
+        step["toChain"] = chains[-1] if chains else None
+
+    if not steps:
+        return step
+    previous = steps[-1]
+    if step["chain"] is None:
+        step["chain"] = _output_chain(previous)
+    if step["amount"] is None:
+        # 数量来自之前某一步的产出：优先找产出同一代币的最近一步
+        source = previous
+        if step["tokenIn"] is not None:
+            source = next((prior for prior in reversed(steps) if _output_token(prior) == step["tokenIn"]), previous)
+        if step["tokenIn"] is None:
+            step["tokenIn"] = _output_token(source)
+        step["amountFrom"] = {"step": source["step"], "fraction": fraction or "1"}
+        step["dependsOn"].append(source["step"])
+    elif step["tokenIn"] is not None:
+        # 写了金额，但花的是之前某一步换来的代币（"再把 0.01 ETH 跨链"），仍要等那一步完成
+        source = next((prior for prior in reversed(steps) if _produced_token(prior) == step["tokenIn"]), None)
+        if source is not None:
+            step["dependsOn"].append(source["step"])
+    return step
+
+
+def parse_swap_plan(text: str) -> List[Dict[str, Any]]:
+    """
+    把包含多个步骤的指令一次解析成有序的执行计划。
+
+    例如 "swap 100 U for ETH on Base and then bridge half to Polygon" 返回：
+    [
+        {"step": 0, "action": "swap", "chain": "base", "toChain": None,
+         "tokenIn": "USDT", "tokenOut": "ETH", "amount": "100", "amountBaseUnits": 100000000,
+         "amountFrom": None, "dependsOn": [], "recipient": None, "text": "swap 100 U for ETH on Base"},
+        {"step": 1, "action": "bridge", "chain": "base", "toChain": "polygon",
+         "tokenIn": "ETH", "tokenOut": None, "amount": None, "amountBaseUnits": None,
+         "amountFrom": {"step": 0, "fraction": "0.5"}, "dependsOn": [0], "recipient": None,
+         "text": "bridge half to Polygon"},
+    ]
+
+    - action: swap / bridge / transfer，识别不出为 None。
+    - 没写金额的步骤通过 amountFrom 引用之前某一步的产出（"一半" 为 0.5，
+      "全部" 或不写为 1，"30%" 为 0.3），dependsOn 记录这些依赖；实际数量要等
+      被依赖的步骤执行后才知道，所以 amount / amountBaseUnits 为 None。写了金额、
+      但花的是之前某一步换来（或跨链转入）的代币时，也记入 dependsOn。
+    - recipient 为步骤中出现的收款地址（"send it to 0x…"），没有时为 None。
+    - 没写链名时沿用上一步所在（bridge 则为到达）的链；没写代币时沿用被依赖步骤的产出代币。
+
+    只有一个步骤时返回单元素列表，字段与 parse_swap_intent 兼容。
+    """
+    if not isinstance(text, str):
+        raise TypeError("text must be a string")
+    steps: List[Dict[str, Any]] = []
+    for index, part in enumerate(split_steps(text)):
+        step = _parse_step(index, part, steps)
+        if step["action"] == "swap" and step["tokenOut"]:
+            _share_trailing_clause(step, steps)
+        steps.append(step)
+    return attach_base_units(steps)
+
+
+def _share_trailing_clause(step: Dict[str, Any], steps: List[Dict[str, Any]]) -> None:
+    """
+    "swap 10 usdc and 20 usdt for eth on base" 拆开后，前面的 "swap 10 usdc" 没有目标代币和链：
+    紧挨在前、写了金额却缺 tokenOut 的 swap 步骤共用这一步的目标代币，没写链时也共用它的链。
+    """
+    for prior in reversed(steps):
+        if prior["action"] != "swap" or prior["tokenOut"] or prior["amount"] is None:
+            break
+        if prior["tokenIn"] != step["tokenOut"]:
+            prior["tokenOut"] = step["tokenOut"]
+        if prior["chain"] is None:
+            prior["chain"] = step["chain"]
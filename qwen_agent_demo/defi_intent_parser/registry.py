@@ -0,0 +1,230 @@
+"""
+代币注册表：链、代币符号、别名、ZRC-20 地址和精度。
+
+源数据是 data/tokens.json，由 `python -m defi_intent_parser.compile_registry`
+编译成紧凑的二进制文件 data/tokens.bin。二进制文件全部由 uint32 列组成
+（字符串放在一张共享字符串表里），加载时直接 mmap，不解析、不建 Python 对象，
+所以启动耗时和常驻内存不随条目数增长；别名匹配用的 Aho-Corasick 自动机
+也预先编译好放在同一个文件里。
+
+文件布局（小端）：
+    magic "ZTRG" | version | 段数 | 每段 (offset, length) | 各段数据（4 字节对齐）
+"""
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+from bisect import bisect_left
+from typing import Any, Dict, List, Optional, Union
+
+from .matcher import AliasMatcher, ArrayAliasMatcher
+
+MAGIC = b"ZTRG"
+VERSION = 1
+NO_ADDRESS = 0xFFFFFFFF
+
+_DATA_DIR = os.path.join(os.path.dirname(__file__), "data")
+DEFAULT_SOURCE = os.path.join(_DATA_DIR, "tokens.json")
+DEFAULT_PATH = os.path.join(_DATA_DIR, "tokens.bin")
+
+SECTIONS = (
+    "string_offsets", "string_blob",
+    "chain_name", "chain_id",
+    "token_symbol", "token_chain", "token_zrc20", "token_decimals",
+) + ArrayAliasMatcher.COLUMNS
+
+_HEADER = struct.Struct("<4sII")
+_ENTRY = struct.Struct("<II")
+
+
+class RegistryError(ValueError):
+    """注册表源数据或二进制文件不合法。"""
+
+
+def _u32_bytes(values: List[int]) -> bytes:
+    column = array("I", values)
+    if sys.byteorder != "little":
+        column.byteswap()
+    return column.tobytes()
+
+
+def compile_registry(source: Dict[str, Any]) -> bytes:
+    """
+    把 tokens.json 结构编译成二进制注册表。
+
+    source = {"chains": [{"name", "chain_id", "aliases"}],
+              "tokens": [{"symbol", "chain", "decimals", "zrc20", "aliases"}]}
+    同一代币在不同链上各占一条记录；别名按符号合并后进入匹配器。
+    """
+    strings: Dict[str, int] = {}
+
+    def intern(value: str) -> int:
+        if value not in strings:
+            strings[value] = len(strings)
+        return strings[value]
+
+    chains = sorted(source.get("chains", []), key=lambda chain: chain["name"])
+    chain_names = {chain["name"] for chain in chains}
+    tokens = []
+    for token in source.get("tokens", []):
+        if token.get("chain") not in chain_names:
+            raise RegistryError(f"token {token.get('symbol')!r} references unknown chain {token.get('chain')!r}")
+        if not isinstance(token.get("decimals"), int) or not 0 <= token["decimals"] <= 255:
+            raise RegistryError(f"token {token['symbol']!r} on {token['chain']!r} has invalid decimals")
+        tokens.append(dict(token, symbol=token["symbol"].upper()))
+    tokens.sort(key=lambda token: (token["symbol"], token["chain"]))
+
+    matcher = AliasMatcher()
+    for chain in chains:
+        for alias in [chain["name"], *chain.get("aliases", [])]:
+            matcher.add(alias, "chain", chain["name"])
+    for token in tokens:
+        for alias in [token["symbol"], *token.get("aliases", [])]:
+            matcher.add(alias, "token", token["symbol"])
+
+    columns: Dict[str, List[int]] = {
+        "chain_name": [intern(chain["name"]) for chain in chains],
+        "chain_id": [int(chain["chain_id"]) for chain in chains],
+        "token_symbol": [intern(token["symbol"]) for token in tokens],
+        "token_chain": [intern(token["chain"]) for token in tokens],
+        "token_zrc20": [intern(token["zrc20"]) if token.get("zrc20") else NO_ADDRESS for token in tokens],
+        "token_decimals": [token["decimals"] for token in tokens],
+    }
+    columns.update(matcher.to_arrays(intern))
+
+    blob = bytearray()
+    offsets = [0]
+    for value in strings:
+        blob += value.encode("utf-8")
+        offsets.append(len(blob))
+    blob += b"\0" * (-len(blob) % 4)
+
+    payloads = [_u32_bytes(offsets), bytes(blob)] + [_u32_bytes(columns[name]) for name in SECTIONS[2:]]
+    position = _HEADER.size + _ENTRY.size * len(SECTIONS)
+    header = [_HEADER.pack(MAGIC, VERSION, len(SECTIONS))]
+    for payload in payloads:
+        header.append(_ENTRY.pack(position, len(payload)))
+        position += len(payload)
+    return b"".join(header + payloads)
+
+
+def compile_file(source_path: str = DEFAULT_SOURCE, output_path: str = DEFAULT_PATH) -> int:
+    """编译 JSON 源文件并原子地写出二进制文件，返回写出的字节数。"""
+    with open(source_path, encoding="utf-8") as handle:
+        data = compile_registry(json.load(handle))
+    temp_path = f"{output_path}.{os.getpid()}.tmp"
+    with open(temp_path, "wb") as handle:
+        handle.write(data)
+    os.replace(temp_path, output_path)
+    return len(data)
+
+
+class TokenRegistry:
+    """
+    只读的代币注册表，底层是 mmap 的二进制文件（也可以直接传入 bytes）。
+
+    各列是指向映射内存的 memoryview，按需读取；代币记录按 (symbol, chain)
+    排序，查找用二分。`matcher` 是可直接用于解析的别名匹配器。
+    """
+
+    def __init__(self, source: Union[str, bytes]):
+        self._mmap = None
+        if isinstance(source, (bytes, bytearray)):
+            buffer = memoryview(bytes(source))
+        else:
+            with open(source, "rb") as handle:
+                self._mmap = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+            buffer = memoryview(self._mmap)
+
+        if len(buffer) < _HEADER.size:
+            raise RegistryError("registry file is truncated")
+        magic, version, count = _HEADER.unpack_from(buffer, 0)
+        if magic != MAGIC or version != VERSION or count != len(SECTIONS):
+            raise RegistryError("not a token registry file or unsupported version")
+
+        sections = {}
+        for index, name in enumerate(SECTIONS):
+            offset, length = _ENTRY.unpack_from(buffer, _HEADER.size + _ENTRY.size * index)
+            if offset + length > len(buffer) or offset % 4 or length % 4:
+                raise RegistryError(f"registry section {name} is out of bounds")
+            section = buffer[offset:offset + length]
+            if name == "string_blob":
+                sections[name] = section
+            elif sys.byteorder == "little":
+                sections[name] = section.cast("I")
+            else:
+                column = array("I", section.tobytes())
+                column.byteswap()
+                sections[name] = column
+        self._columns = sections
+        self._offsets = sections["string_offsets"]
+        self._blob = sections["string_blob"]
+        self.matcher = ArrayAliasMatcher(sections, self.string)
+
+    def string(self, index: int) -> str:
+        return bytes(self._blob[self._offsets[index]:self._offsets[index + 1]]).decode("utf-8")
+
+    def __len__(self) -> int:
+        return len(self._columns["token_symbol"])
+
+    def _token_record(self, index: int) -> Dict[str, Any]:
+        columns = self._columns
+        zrc20 = columns["token_zrc20"][index]
+        return {
+            "symbol": self.string(columns["token_symbol"][index]),
+            "chain": self.string(columns["token_chain"][index]),
+            "zrc20": None if zrc20 == NO_ADDRESS else self.string(zrc20),
+            "decimals": columns["token_decimals"][index],
+        }
+
+    def tokens(self, symbol: str) -> List[Dict[str, Any]]:
+        """某个符号在所有链上的记录，按链名排序。"""
+        symbols = self._columns["token_symbol"]
+        symbol = symbol.upper()
+        index = bisect_left(range(len(symbols)), symbol, key=lambda i: self.string(symbols[i]))
+        records = []
+        while index < len(symbols) and self.string(symbols[index]) == symbol:
+            records.append(self._token_record(index))
+            index += 1
+        return records
+
+    def token(self, symbol: str, chain: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """
+        查找代币记录 {"symbol", "chain", "zrc20", "decimals"}。
+
+        不指定 chain 时返回按链名排序的第一条；找不到返回 None。
+        """
+        records = self.tokens(symbol)
+        if chain is None:
+            return records[0] if records else None
+        return next((record for record in records if record["chain"] == chain), None)
+
+    def chain(self, name: str) -> Optional[Dict[str, Any]]:
+        """查找链记录 {"name", "chain_id"}。"""
+        names, ids = self._columns["chain_name"], self._columns["chain_id"]
+        index = bisect_left(range(len(names)), name, key=lambda i: self.string(names[i]))
+        if index < len(names) and self.string(names[index]) == name:
+            return {"name": name, "chain_id": ids[index]}
+        return None
+
+
+def load_registry(path: Optional[str] = None, source_path: str = DEFAULT_SOURCE) -> TokenRegistry:
+    """
+    加载注册表，路径默认取环境变量 DEFI_TOKEN_REGISTRY，否则为 data/tokens.bin。
+
+    默认文件不存在或比 JSON 源文件旧时先重新编译（目录不可写时在内存中编译）；
+    显式指定的文件原样加载。
+    """
+    path = path or os.getenv("DEFI_TOKEN_REGISTRY") or DEFAULT_PATH
+    stale = path == DEFAULT_PATH and (
+        not os.path.exists(path) or os.path.getmtime(source_path) > os.path.getmtime(path)
+    )
+    if stale:
+        try:
+            compile_file(source_path, path)
+        except OSError:
+            with open(source_path, encoding="utf-8") as handle:
+                return TokenRegistry(compile_registry(json.load(handle)))
+    return TokenRegistry(path)
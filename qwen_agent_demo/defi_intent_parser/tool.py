@@ -4,6 +4,7 @@ from typing import Any
 from qwen_agent.tools.base import BaseTool, register_tool
 
 from .parser import parse_swap_intent
+from .plan import parse_swap_plan
 
 
 @register_tool("parse_swap_intent")
@@ -47,3 +48,42 @@ class ParseSwapIntentTool(BaseTool):
         return json.dumps(intent, ensure_ascii=False)
 
 
+@register_tool("parse_swap_plan")
+class ParseSwapPlanTool(BaseTool):
+    """把多步骤指令一次解析成执行计划的工具"""
+
+    description = (
+        "从包含多个步骤的自然语言指令（用“然后”“再”“and then”等连接）中一次解析出有序的执行计划，"
+        "每一步包含动作（swap / bridge / transfer）、链名、代币、金额、收款地址，以及对前面步骤产出的依赖"
+        "（例如“一半”“全部”）。"
+    )
+    parameters = [
+        {
+            "name": "text",
+            "type": "string",
+            "description": "用户的原始自然语言输入，例如：'swap 100 U for ETH on Base and then bridge half to Polygon'",
+            "required": True,
+        }
+    ]
+
+    def call(self, params: Any, **kwargs) -> str:
+        """
+        执行工具调用。
+
+        Args:
+            params: JSON 字符串或字典，包含 'text' 字段。
+
+        Returns:
+            字符串形式的 JSON：{"steps": [...]}。
+        """
+        if isinstance(params, str):
+            try:
+                params = json.loads(params)
+            except json.JSONDecodeError:
+                return json.dumps({"error": "参数解析失败，期望 JSON 字符串或字典。"}, ensure_ascii=False)
+
+        text = params.get("text", "")
+        if not text:
+            return json.dumps({"error": "缺少必需参数 text。"}, ensure_ascii=False)
+
+        return json.dumps({"steps": parse_swap_plan(text)}, ensure_ascii=False)
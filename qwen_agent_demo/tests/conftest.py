@@ -0,0 +1,5 @@
+import os
+import sys
+
+# 测试直接导入 qwen_agent_demo 下的包（defi_intent_parser）
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
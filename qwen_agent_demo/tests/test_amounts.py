@@ -0,0 +1,39 @@
+import pytest
+
+from defi_intent_parser.amounts import to_base_units, to_base_units_many
+from defi_intent_parser.parser import parse_swap_intent
+
+
+@pytest.mark.parametrize("amount, decimals, expected", [
+    ("10", 6, 10_000_000),
+    ("5.5", 18, 5_500_000_000_000_000_000),
+    ("0.1", 18, 10 ** 17),
+    ("0.000001", 6, 1),
+    ("1.50", 1, 15),
+    ("0", 0, 0),
+])
+def test_to_base_units_is_exact(amount, decimals, expected):
+    assert to_base_units(amount, decimals) == expected
+
+
+@pytest.mark.parametrize("amount, decimals", [
+    ("0.0000001", 6),
+    ("1e3", 18),
+    ("-1", 18),
+    ("1,000", 18),
+    ("", 18),
+])
+def test_to_base_units_rejects(amount, decimals):
+    assert to_base_units(amount, decimals) is None
+
+
+def test_many_matches_single():
+    amounts = ["10", None, "0.5", "0.1234567", "3.000"]
+    assert to_base_units_many(amounts, 6) == [to_base_units(a, 6) if a is not None else None for a in amounts]
+    assert to_base_units_many([], 18) == []
+
+
+def test_parser_attaches_base_units():
+    intent = parse_swap_intent("swap 100 U for ETH on Base")
+    assert intent["amount"] == "100"
+    assert intent["amountBaseUnits"] == 100 * 10 ** 6
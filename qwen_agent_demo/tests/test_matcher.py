@@ -0,0 +1,85 @@
+import random
+
+import pytest
+
+from defi_intent_parser.matcher import AliasMatch, AliasMatcher, ArrayAliasMatcher
+
+ENTRIES = [
+    ("base", "chain", "base"),
+    ("ethereum", "chain", "ethereum"),
+    ("以太坊", "chain", "ethereum"),
+    ("polygon", "chain", "polygon"),
+    ("eth", "token", "ETH"),
+    ("以太坊", "token", "ETH"),
+    ("usdc", "token", "USDC"),
+    ("usdt", "token", "USDT"),
+    ("u", "token", "USDT"),
+    ("matic", "token", "MATIC"),
+    ("Straße", "token", "SS"),
+]
+
+TEXTS = [
+    "swap 100 U for ETH on Base",
+    "把 50U 换成以太坊，然后跨链到 Polygon",
+    "usdc and usdt and bus",
+    "ETHEREUM eth Eth ethereumish",
+    "STRASSE Straße straße",
+    "",
+    "没有任何别名",
+]
+
+
+def _array_matcher(matcher: AliasMatcher) -> ArrayAliasMatcher:
+    strings = {}
+
+    def intern(value: str) -> int:
+        return strings.setdefault(value, len(strings))
+
+    columns = matcher.to_arrays(intern)
+    by_index = {index: value for value, index in strings.items()}
+    return ArrayAliasMatcher(columns, by_index.__getitem__)
+
+
+@pytest.fixture(scope="module")
+def matchers():
+    matcher = AliasMatcher(ENTRIES)
+    return matcher, _array_matcher(matcher)
+
+
+def test_word_boundaries_and_case_folding(matchers):
+    matcher, _ = matchers
+    assert matcher.find_all("swap 100 U for ETH on Base") == [
+        AliasMatch(9, 10, "token", "USDT"),
+        AliasMatch(15, 18, "token", "ETH"),
+        AliasMatch(22, 26, "chain", "base"),
+    ]
+    # "u" 不能命中 usdc / bus 里的字母
+    assert [match.value for match in matcher.find_all("usdc bus", "token")] == ["USDC"]
+
+
+def test_same_word_matches_every_kind(matchers):
+    matcher, _ = matchers
+    assert {(match.kind, match.value) for match in matcher.find_all("以太坊")} == {("chain", "ethereum"), ("token", "ETH")}
+
+
+@pytest.mark.parametrize("text", TEXTS)
+def test_array_matcher_agrees_on_samples(matchers, text):
+    matcher, array_matcher = matchers
+    assert array_matcher.find_all(text) == matcher.find_all(text)
+    for kind in ("chain", "token"):
+        assert array_matcher.find_all(text, kind) == matcher.find_all(text, kind)
+
+
+def test_array_matcher_agrees_on_random_aliases():
+    rng = random.Random(2024)
+    alphabet = "abcAB以太坊 -"
+    entries = [
+        ("".join(rng.choice(alphabet[:-2]) for _ in range(rng.randint(1, 4))), rng.choice(["chain", "token"]), f"V{i}")
+        for i in range(200)
+    ]
+    matcher = AliasMatcher(entries)
+    array_matcher = _array_matcher(matcher)
+    for _ in range(300):
+        text = "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 40)))
+        assert list(array_matcher.iter_matches(text)) == list(matcher.iter_matches(text))
+        assert array_matcher.find_all(text) == matcher.find_all(text)
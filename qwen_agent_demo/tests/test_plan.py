@@ -0,0 +1,53 @@
+import pytest
+
+from defi_intent_parser.parser import parse_swap_intent
+from defi_intent_parser.plan import parse_swap_plan, split_steps
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("swap 10 usdc and 20 usdt for eth", ["swap 10 usdc", "20 usdt for eth"]),
+    ("swap 10 usdc for eth then bridge it to polygon", ["swap 10 usdc for eth", "bridge it to polygon"]),
+    ("swap 10 usdc for eth, then bridge half to polygon", ["swap 10 usdc for eth", "bridge half to polygon"]),
+    ("swap 10 usdc for eth, and 20 usdt for matic", ["swap 10 usdc for eth", "20 usdt for matic"]),
+    ("swap 10 usdc for eth and bridge it to base", ["swap 10 usdc for eth", "bridge it to base"]),
+    ("用 10 USDC 换成 ETH，再跨链到 Polygon", ["用 10 USDC 换成 ETH", "跨链到 Polygon"]),
+])
+def test_split_steps(text, expected):
+    assert split_steps(text) == expected
+
+
+def test_and_between_tokens_is_not_a_step():
+    assert split_steps("swap usdc and eth") == ["swap usdc and eth"]
+
+
+def test_and_digit_legs_share_the_trailing_token_out():
+    steps = parse_swap_plan("swap 10 usdc and 20 usdt for eth on base")
+    assert [(step["tokenIn"], step["tokenOut"], step["chain"]) for step in steps] == [
+        ("USDC", "ETH", "base"),
+        ("USDT", "ETH", "base"),
+    ]
+    assert [step["amountBaseUnits"] for step in steps] == [10_000_000, 20_000_000]
+    assert all(step["dependsOn"] == [] for step in steps)
+
+
+def test_then_step_depends_on_the_previous_output():
+    steps = parse_swap_plan("swap 100 U for ETH on Base and then bridge half to Polygon")
+    assert steps[1]["action"] == "bridge"
+    assert steps[1]["tokenIn"] == "ETH"
+    assert (steps[1]["chain"], steps[1]["toChain"]) == ("base", "polygon")
+    assert steps[1]["amountFrom"] == {"step": 0, "fraction": "0.5"}
+    assert steps[1]["dependsOn"] == [0]
+
+
+def test_comma_then_split_keeps_recipient_and_percent():
+    recipient = "0x" + "ab" * 20
+    steps = parse_swap_plan(f"swap 10 usdc for eth, then send 30% to {recipient}")
+    assert steps[1]["action"] == "transfer"
+    assert steps[1]["recipient"] == recipient
+    assert steps[1]["tokenIn"] == "ETH"
+    assert steps[1]["amountFrom"] == {"step": 0, "fraction": "0.3"}
+
+
+def test_tail_token_equal_to_token_in_is_not_a_swap_target():
+    assert parse_swap_intent("swap 10 usdc")["tokenOut"] is None
+    assert parse_swap_intent("swap 10 usdc eth")["tokenOut"] == "ETH"
@@ -0,0 +1,96 @@
+import json
+
+import pytest
+
+from defi_intent_parser.matcher import AliasMatcher
+from defi_intent_parser.registry import (
+    DEFAULT_SOURCE, RegistryError, TokenRegistry, compile_file, compile_registry, load_registry,
+)
+
+SOURCE = {
+    "chains": [
+        {"name": "zetachain", "chain_id": 7000, "aliases": ["zeta chain"]},
+        {"name": "base", "chain_id": 8453, "aliases": []},
+    ],
+    "tokens": [
+        {"symbol": "usdc", "chain": "base", "decimals": 6, "zrc20": None, "aliases": ["美元币"]},
+        {"symbol": "USDC", "chain": "zetachain", "decimals": 6,
+         "zrc20": "0x0000000000000000000000000000000000000001", "aliases": []},
+        {"symbol": "ZETA", "chain": "zetachain", "decimals": 18, "zrc20": None, "aliases": ["泽塔"]},
+    ],
+}
+
+
+@pytest.fixture(scope="module")
+def registry():
+    return TokenRegistry(compile_registry(SOURCE))
+
+
+def test_round_trip_records(registry):
+    assert len(registry) == 3
+    assert registry.tokens("usdc") == [
+        {"symbol": "USDC", "chain": "base", "zrc20": None, "decimals": 6},
+        {"symbol": "USDC", "chain": "zetachain", "zrc20": "0x0000000000000000000000000000000000000001", "decimals": 6},
+    ]
+    assert registry.token("ZETA") == {"symbol": "ZETA", "chain": "zetachain", "zrc20": None, "decimals": 18}
+    assert registry.token("USDC", chain="zetachain")["zrc20"] == "0x0000000000000000000000000000000000000001"
+    assert registry.token("USDC", chain="polygon") is None
+    assert registry.token("DAI") is None
+    assert registry.chain("base") == {"name": "base", "chain_id": 8453}
+    assert registry.chain("solana") is None
+
+
+def test_round_trip_matcher(registry):
+    expected = AliasMatcher()
+    for chain in SOURCE["chains"]:
+        for alias in [chain["name"], *chain["aliases"]]:
+            expected.add(alias, "chain", chain["name"])
+    for token in SOURCE["tokens"]:
+        for alias in [token["symbol"], *token["aliases"]]:
+            expected.add(alias, "token", token["symbol"].upper())
+    expected.build()
+    for text in ["把 10 美元币 换成 泽塔", "bridge usdc from Base to zeta chain", "ZETA zetachain"]:
+        assert registry.matcher.find_all(text) == expected.find_all(text)
+
+
+def test_file_round_trip_matches_bytes(tmp_path):
+    source_path = tmp_path / "tokens.json"
+    source_path.write_text(json.dumps(SOURCE), encoding="utf-8")
+    output_path = tmp_path / "tokens.bin"
+    size = compile_file(str(source_path), str(output_path))
+    assert output_path.read_bytes() == compile_registry(SOURCE)
+    assert size == output_path.stat().st_size
+
+    loaded = load_registry(str(output_path))
+    assert loaded.tokens("USDC") == TokenRegistry(compile_registry(SOURCE)).tokens("USDC")
+
+
+def test_shipped_source_compiles():
+    with open(DEFAULT_SOURCE, encoding="utf-8") as handle:
+        registry = TokenRegistry(compile_registry(json.load(handle)))
+    assert registry.token("USDT")["decimals"] == 6
+    assert [match.value for match in registry.matcher.find_all("swap 100 U for ETH", "token")] == ["USDT", "ETH"]
+
+
+def test_rejects_unknown_chain():
+    source = {"chains": [], "tokens": [{"symbol": "ETH", "chain": "base", "decimals": 18}]}
+    with pytest.raises(RegistryError):
+        compile_registry(source)
+
+
+@pytest.mark.parametrize("decimals", [-1, 256, "18"])
+def test_rejects_invalid_decimals(decimals):
+    source = {"chains": [{"name": "base", "chain_id": 8453}],
+              "tokens": [{"symbol": "ETH", "chain": "base", "decimals": decimals}]}
+    with pytest.raises(RegistryError):
+        compile_registry(source)
+
+
+def test_rejects_corrupt_files():
+    data = compile_registry(SOURCE)
+    with pytest.raises(RegistryError):
+        TokenRegistry(b"NOPE" + data[4:])
+    with pytest.raises(RegistryError):
+        TokenRegistry(data[:8])
+    with pytest.raises(RegistryError):
+        TokenRegistry(data[:len(data) // 2])
@@ -0,0 +1,380 @@
+import json
+import os
+import time
+from http import HTTPStatus
+
+# Note: qwen-agent usage might vary slightly based on version, assuming standard usage for tool calling or generation
+# Since the requirement is "Agent output structured parameters", we can use a system prompt to enforce JSON output.
+import dashscope
+import httpx
+
+from few_shot import select_examples
+from intent_schema import extract_intent
+from metrics import LLM_ERRORS, LLM_LATENCY, LLM_TIME_TO_FIRST_TOKEN, PARSE_ERRORS, PARSE_LATENCY
+from token_usage import record_usage
+
+MODEL_NAME = os.getenv("LLM_MODEL", "qwen-turbo")
+
+# "dashscope" (SDK) or "openai": any OpenAI-compatible /chat/completions server at
+# LLM_BASE_URL, e.g. DashScope's compatible mode, a self-hosted model or mock_llm.py
+LLM_BACKEND = os.getenv("LLM_BACKEND", "dashscope").lower()
+LLM_BASE_URL = os.getenv("LLM_BASE_URL", "https://dashscope.aliyuncs.com/compatible-mode/v1")
+LLM_HTTP_TIMEOUT = float(os.getenv("LLM_TIMEOUT", "60"))
+
+# Ask DashScope for a guaranteed JSON object (response_format) where the model supports it
+LLM_JSON_MODE = os.getenv("LLM_JSON_MODE", "true").lower() in ("1", "true", "yes")
+
+# Add a new version whenever a prompt or the output schema changes so cached answers are not reused
+SYSTEM_PROMPT_VERSION = os.getenv("LLM_PROMPT_VERSION", "v3")
+
+# Few-shot examples (picked by similarity to the input) sent with prompts that take them
+LLM_FEW_SHOT = int(os.getenv("LLM_FEW_SHOT", "1"))
+
+# We want to extract: type, recipient, amount, token
+SYSTEM_PROMPTS = {
+    # Original verbose prompt with one fixed inline example
+    "v2": """You are a blockchain agent. Your goal is to extract transaction details from user input.
+    Output ONLY valid JSON with keys: "type" (must be "transfer"), "recipient" (address), "amount" (number), "token" (e.g. "ZETA").
+    If information is missing, try to infer or set null.
+    Example output: {"type": "transfer", "recipient": "0x123", "amount": 0.1, "token": "ZETA"}
+    """,
+    # Compact prompt; the examples come from few_shot.py as chat turns
+    # ("type" is implied; TransferIntent fills it in)
+    "v3": 'Extract the token transfer. JSON only: {"recipient":address|null,"amount":number|null,"token":symbol|null}',
+}
+PROMPT_FEW_SHOT = {"v2": 0, "v3": LLM_FEW_SHOT}
+SYSTEM_PROMPT = SYSTEM_PROMPTS[SYSTEM_PROMPT_VERSION]
+
+
+class AgentError(Exception):
+    """The LLM could not be reached or answered with an error status."""
+
+
+# Flipped off the first time the model rejects response_format
+_json_mode = {"enabled": LLM_JSON_MODE}
+# A 400 only means "no JSON mode here" when the error names it; content moderation
+# (DataInspectionFailed), bad prompts and the like are 400s too
+JSON_MODE_UNSUPPORTED_MARKERS = ("response_format", "json_object", "json mode")
+
+
+def _format_kwargs() -> dict:
+    if _json_mode["enabled"]:
+        return {"response_format": {"type": "json_object"}}
+    return {}
+
+
+def _error_text(response) -> str:
+    if isinstance(response, httpx.Response):
+        response.read()
+        return response.text
+    return f"{getattr(response, 'code', '')} {getattr(response, 'message', '')}"
+
+
+def _json_mode_rejected(response) -> bool:
+    if not _json_mode["enabled"] or response.status_code != HTTPStatus.BAD_REQUEST:
+        return False
+    message = _error_text(response).lower()
+    if not any(marker in message for marker in JSON_MODE_UNSUPPORTED_MARKERS):
+        return False
+    _json_mode["enabled"] = False
+    return True
+
+
+def _messages(prompt: str, prompt_version: str = SYSTEM_PROMPT_VERSION) -> list:
+    messages = [{'role': 'system', 'content': SYSTEM_PROMPTS[prompt_version]}]
+    for example, answer in select_examples(prompt, PROMPT_FEW_SHOT[prompt_version]):
+        messages.append({'role': 'user', 'content': example})
+        messages.append({'role': 'assistant', 'content': answer})
+    messages.append({'role': 'user', 'content': prompt})
+    return messages
+
+
+def _record_usage(usage):
+    """Account a call's usage, DashScope (input/output_tokens) or OpenAI style (prompt/completion_tokens)."""
+    if not usage:
+        return
+    input_tokens = usage.get("input_tokens", usage.get("prompt_tokens")) or 0
+    output_tokens = usage.get("output_tokens", usage.get("completion_tokens")) or 0
+    record_usage(int(input_tokens), int(output_tokens))
+
+
+def _api_key() -> str:
+    api_key = os.getenv("DASHSCOPE_API_KEY")
+    if not api_key:
+        raise AgentError("DASHSCOPE_API_KEY not found")
+    return api_key
+
+
+def _completion(response) -> str:
+    if response.status_code != HTTPStatus.OK:
+        raise AgentError(f"Request id: {response.request_id}, Status code: {response.status_code}, error code: {response.code}, error message: {response.message}")
+    return response.output.choices[0].message.content
+
+
+# HTTP clients for the "openai" backend, created on first use and closed by aclose_llm()
+_http = {"sync": None, "async": None}
+
+
+def _openai_client() -> httpx.Client:
+    if _http["sync"] is None:
+        _http["sync"] = httpx.Client(base_url=LLM_BASE_URL, headers=_openai_headers(), timeout=LLM_HTTP_TIMEOUT)
+    return _http["sync"]
+
+
+def _openai_async_client() -> httpx.AsyncClient:
+    if _http["async"] is None:
+        _http["async"] = httpx.AsyncClient(base_url=LLM_BASE_URL, headers=_openai_headers(), timeout=LLM_HTTP_TIMEOUT)
+    return _http["async"]
+
+
+async def aclose_llm():
+    """Close the backend's HTTP connection pools (a no-op for the DashScope SDK)."""
+    sync_client, async_client = _http["sync"], _http["async"]
+    _http["sync"] = _http["async"] = None
+    if sync_client is not None:
+        sync_client.close()
+    if async_client is not None:
+        await async_client.aclose()
+
+
+def _openai_headers() -> dict:
+    # Local stand-ins need no key
+    api_key = os.getenv("LLM_API_KEY") or os.getenv("DASHSCOPE_API_KEY")
+    return {"Authorization": f"Bearer {api_key}"} if api_key else {}
+
+
+def _openai_body(prompt: str, prompt_version: str, stream: bool = False) -> dict:
+    body = {"model": MODEL_NAME, "messages": _messages(prompt, prompt_version), **_format_kwargs()}
+    if stream:
+        body["stream"] = True
+        # Ask for a final chunk carrying the token usage
+        body["stream_options"] = {"include_usage": True}
+    return body
+
+
+def _openai_completion(response: httpx.Response) -> str:
+    if response.status_code != HTTPStatus.OK:
+        raise AgentError(f"Status code: {response.status_code}, error message: {response.text[:500]}")
+    data = response.json()
+    _record_usage(data.get("usage"))
+    return data["choices"][0]["message"]["content"]
+
+
+def _openai_chunk(line: str):
+    """The JSON chunk on an OpenAI-style SSE line: None for other lines, "[DONE]" at the end."""
+    if not line.startswith("data:"):
+        return None
+    data = line[len("data:"):].strip()
+    return data if data == "[DONE]" else json.loads(data)
+
+
+def _chunk_delta(chunk: dict):
+    choices = chunk.get("choices") or [{}]
+    return choices[0].get("delta", {}).get("content")
+
+
+def _openai_deltas(lines):
+    """Completion text pieces from an OpenAI-style SSE stream."""
+    usage = None
+    for line in lines:
+        chunk = _openai_chunk(line)
+        if chunk is None:
+            continue
+        if chunk == "[DONE]":
+            break
+        usage = chunk.get("usage") or usage
+        delta = _chunk_delta(chunk)
+        if delta:
+            yield delta
+    _record_usage(usage)
+
+
+async def _openai_adeltas(lines):
+    usage = None
+    async for line in lines:
+        chunk = _openai_chunk(line)
+        if chunk is None:
+            continue
+        if chunk == "[DONE]":
+            break
+        usage = chunk.get("usage") or usage
+        delta = _chunk_delta(chunk)
+        if delta:
+            yield delta
+    _record_usage(usage)
+
+
+def call_llm(prompt: str, prompt_version: str = SYSTEM_PROMPT_VERSION) -> str:
+    """Send `prompt` to the model and return the raw completion text."""
+    # Using dashscope directly as it's the core of qwen-agent for simple generation
+    # Or using qwen_agent.llm if strictly following qwen-agent wrapper
+    # Let's use dashscope for simplicity as qwen-agent wraps it but often adds complexity for multi-agent.
+    # But for a single turn extraction, simple generation is best.
+    with LLM_LATENCY.labels("sync").time(), LLM_ERRORS.labels("sync").count_exceptions():
+        if LLM_BACKEND == "openai":
+            response = _openai_client().post("/chat/completions", json=_openai_body(prompt, prompt_version))
+            if not _json_mode_rejected(response):
+                return _openai_completion(response)
+        else:
+            response = dashscope.Generation.call(
+                model=MODEL_NAME,
+                api_key=_api_key(),
+                messages=_messages(prompt, prompt_version),
+                result_format='message',  # set the result to be "message" format.
+                **_format_kwargs(),
+            )
+            if not _json_mode_rejected(response):
+                content = _completion(response)
+                _record_usage(response.usage)
+                return content
+    return call_llm(prompt, prompt_version)
+
+
+async def acall_llm(prompt: str, prompt_version: str = SYSTEM_PROMPT_VERSION) -> str:
+    """Async call_llm: awaits DashScope without holding a worker thread."""
+    with LLM_LATENCY.labels("async").time(), LLM_ERRORS.labels("async").count_exceptions():
+        if LLM_BACKEND == "openai":
+            response = await _openai_async_client().post("/chat/completions", json=_openai_body(prompt, prompt_version))
+            if not _json_mode_rejected(response):
+                return _openai_completion(response)
+        else:
+            response = await dashscope.AioGeneration.call(
+                model=MODEL_NAME,
+                api_key=_api_key(),
+                messages=_messages(prompt, prompt_version),
+                result_format='message',
+                **_format_kwargs(),
+            )
+            if not _json_mode_rejected(response):
+                content = _completion(response)
+                _record_usage(response.usage)
+                return content
+    return await acall_llm(prompt, prompt_version)
+
+
+def stream_llm(prompt: str, prompt_version: str = SYSTEM_PROMPT_VERSION):
+    """Yield the completion text piece by piece as the model produces it."""
+    started = time.perf_counter()
+    first = True
+    for delta in _stream_deltas(prompt, prompt_version):
+        if first:
+            LLM_TIME_TO_FIRST_TOKEN.labels(prompt_version).observe(time.perf_counter() - started)
+            first = False
+        yield delta
+
+
+def _stream_deltas(prompt: str, prompt_version: str):
+    if LLM_BACKEND == "openai":
+        yield from _openai_stream(prompt, prompt_version)
+        return
+    with LLM_LATENCY.labels("stream").time(), LLM_ERRORS.labels("stream").count_exceptions():
+        responses = dashscope.Generation.call(
+            model=MODEL_NAME,
+            api_key=_api_key(),
+            messages=_messages(prompt, prompt_version),
+            result_format='message',
+            stream=True,
+            incremental_output=True,  # each chunk carries only the new text
+            **_format_kwargs(),
+        )
+        usage = None
+        for response in responses:
+            if _json_mode_rejected(response):
+                break
+            delta = _completion(response)
+            # Every chunk carries the usage so far; the last one is the total
+            usage = response.usage or usage
+            if delta:
+                yield delta
+        else:
+            _record_usage(usage)
+            return
+    yield from _stream_deltas(prompt, prompt_version)
+
+
+def _openai_stream(prompt: str, prompt_version: str):
+    with LLM_LATENCY.labels("stream").time(), LLM_ERRORS.labels("stream").count_exceptions():
+        body = _openai_body(prompt, prompt_version, stream=True)
+        with _openai_client().stream("POST", "/chat/completions", json=body) as response:
+            if not _json_mode_rejected(response):
+                if response.status_code != HTTPStatus.OK:
+                    response.read()
+                    _openai_completion(response)
+                yield from _openai_deltas(response.iter_lines())
+                return
+    yield from _openai_stream(prompt, prompt_version)
+
+
+async def astream_llm(prompt: str, prompt_version: str = SYSTEM_PROMPT_VERSION):
+    """Async stream_llm: yields the completion text pieces without holding a worker thread."""
+    started = time.perf_counter()
+    first = True
+    async for delta in _astream_deltas(prompt, prompt_version):
+        if first:
+            LLM_TIME_TO_FIRST_TOKEN.labels(prompt_version).observe(time.perf_counter() - started)
+            first = False
+        yield delta
+
+
+async def _astream_deltas(prompt: str, prompt_version: str):
+    if LLM_BACKEND == "openai":
+        async for delta in _openai_astream(prompt, prompt_version):
+            yield delta
+        return
+    with LLM_LATENCY.labels("astream").time(), LLM_ERRORS.labels("astream").count_exceptions():
+        responses = await dashscope.AioGeneration.call(
+            model=MODEL_NAME,
+            api_key=_api_key(),
+            messages=_messages(prompt, prompt_version),
+            result_format='message',
+            stream=True,
+            incremental_output=True,
+            **_format_kwargs(),
+        )
+        usage = None
+        rejected = False
+        async for response in responses:
+            if _json_mode_rejected(response):
+                rejected = True
+                break
+            delta = _completion(response)
+            usage = response.usage or usage
+            if delta:
+                yield delta
+        if not rejected:
+            _record_usage(usage)
+            return
+    async for delta in _astream_deltas(prompt, prompt_version):
+        yield delta
+
+
+async def _openai_astream(prompt: str, prompt_version: str):
+    with LLM_LATENCY.labels("astream").time(), LLM_ERRORS.labels("astream").count_exceptions():
+        body = _openai_body(prompt, prompt_version, stream=True)
+        async with _openai_async_client().stream("POST", "/chat/completions", json=body) as response:
+            if response.status_code != HTTPStatus.OK:
+                await response.aread()
+            if not _json_mode_rejected(response):
+                if response.status_code != HTTPStatus.OK:
+                    _openai_completion(response)
+                async for delta in _openai_adeltas(response.aiter_lines()):
+                    yield delta
+                return
+    async for delta in _openai_astream(prompt, prompt_version):
+        yield delta
+
+
+def parse_agent_output(content: str) -> dict:
+    """
+    Turn the model's completion into the intent dict, or an error dict with the raw text.
+    Near-valid JSON is repaired locally instead of sending the user back to the model.
+    """
+    with PARSE_LATENCY.labels("llm_output").time():
+        data = extract_intent(content)
+    if "error" in data:
+        PARSE_ERRORS.inc()
+    return data
+
+
+def ask_agent(prompt: str) -> dict:
+    return parse_agent_output(call_llm(prompt))
@@ -0,0 +1,83 @@
+import os
+import re
+import sys
+from decimal import Decimal, DecimalException
+from typing import Optional, Union
+
+# Token decimals and the base-unit conversion come from the intent parser package
+# (qwen_agent_demo/defi_intent_parser), whose token registry is the single source of truth
+PARSER_ROOT = os.getenv("DEFI_PARSER_ROOT") or os.path.normpath(
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "qwen_agent_demo")
+)
+if PARSER_ROOT not in sys.path:
+    sys.path.append(PARSER_ROOT)
+
+from defi_intent_parser.amounts import to_base_units as _plain_to_base_units  # noqa: E402
+from defi_intent_parser.parser import token_decimals  # noqa: E402
+
+# Registry records for this chain win when a token is listed on several chains
+REGISTRY_CHAIN = "zetachain"
+
+AMOUNT_PATTERN = re.compile(r"-?\d[\d,，]*(?:\.\d+)?(?:[eE][-+]?\d+)?")
+# The only accepted use of commas: thousands grouping ("1,000.5"); "1,5" is ambiguous and rejected
+GROUPED_AMOUNT_PATTERN = re.compile(r"-?\d{1,3}(?:,\d{3})+(?:\.\d+)?")
+# Far beyond any token supply (2**256 has 78 digits); bounds Decimal work on "1e9999999"
+MAX_AMOUNT_EXPONENT = 80
+
+Amount = Union[str, int, float, Decimal]
+
+
+def decimals_for(token: str) -> int:
+    """Decimals of `token` from the token registry (cached per process); ValueError if unknown."""
+    decimals = token_decimals(token.upper(), REGISTRY_CHAIN)
+    if decimals is None:
+        raise ValueError(f"Unknown token {token!r}")
+    return decimals
+
+
+def normalize_amount(value: Optional[Amount]) -> Optional[str]:
+    """
+    Canonical decimal string for an amount ("0.10" -> "0.1", 1e-3 -> "0.001").
+
+    Strings may carry a unit or thousands separators ("1,000.5 ZETA"), but
+    any other comma ("1,5") makes the amount invalid rather than guessing.
+    Floats are read from their shortest repr, so 0.1 stays 0.1 instead of
+    0.1000000000000000055511151231257827. Returns None if there is no valid
+    number or its magnitude is absurd (exponent beyond MAX_AMOUNT_EXPONENT).
+    """
+    if value is None or isinstance(value, bool):
+        return None
+    if isinstance(value, str):
+        match = AMOUNT_PATTERN.search(value)
+        if not match:
+            return None
+        value = match.group().rstrip(",，")
+        if "," in value or "，" in value:
+            if not GROUPED_AMOUNT_PATTERN.fullmatch(value):
+                return None
+            value = value.replace(",", "")
+    elif isinstance(value, float):
+        value = repr(value)
+    try:
+        number = Decimal(value)
+        if not number.is_finite() or abs(number.adjusted()) > MAX_AMOUNT_EXPONENT:
+            return None
+        text = format(number.normalize(), "f")
+    except (DecimalException, ValueError, TypeError):
+        return None
+    return "0" if text == "-0" else text
+
+
+def to_base_units(amount: Amount, decimals: int) -> Optional[int]:
+    """
+    Exact integer amount in the token's smallest unit (wei for 18 decimals).
+
+    Same contract as defi_intent_parser.amounts.to_base_units, after
+    normalize_amount: None for unparseable or negative amounts and for
+    amounts with more fractional digits than the token has, instead of
+    rounding them away.
+    """
+    text = normalize_amount(amount)
+    if text is None:
+        return None
+    return _plain_to_base_units(text, decimals)
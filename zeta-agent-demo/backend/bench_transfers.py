@@ -0,0 +1,135 @@
+"""
+Offline transfer-throughput benchmark.
+
+Starts a stub JSON-RPC node (stub_rpc.py), points zetachain.py at it and
+drives N concurrent transfers through the FastAPI app in-process. Reports
+tx/s, p50/p99 latency and JSON-RPC calls per transfer, no testnet needed:
+
+    python bench_transfers.py --transfers 500 --concurrency 50 --rpc-latency 0.02
+    python bench_transfers.py --mode batch --batch-size 100 --json bench.json
+
+`--min-tps` / `--max-p99-ms` make the script exit non-zero on a regression,
+so it can gate CI.
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+
+from stub_rpc import StubRPCServer
+
+# Well-known throwaway key; it only ever signs for the stub node
+BENCH_PRIVATE_KEY = "0x4c0883a69102937d6231471b5dbb6204fe5129617082792ae468d01a3f362318"
+BENCH_RECIPIENT = "0x000000000000000000000000000000000000dEaD"
+
+
+def percentile(samples: list, fraction: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+async def run(args, app, stub) -> dict:
+    import httpx
+
+    transport = httpx.ASGITransport(app=app)
+    latencies = []
+    errors = 0
+    body = {"recipient": BENCH_RECIPIENT, "amount": 0.001, "token": "ZETA"}
+
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=60) as client:
+            # Warm-up transfer so one-off startup lookups are not billed to the run
+            await client.post("/api/execute", json=body)
+            stub.reset_counters()
+
+            if args.mode == "execute":
+                jobs = [[body]] * args.transfers
+            else:
+                jobs = [
+                    [body] * min(args.batch_size, args.transfers - start)
+                    for start in range(0, args.transfers, args.batch_size)
+                ]
+            semaphore = asyncio.Semaphore(args.concurrency)
+
+            async def one(items):
+                nonlocal errors
+                async with semaphore:
+                    started = time.perf_counter()
+                    if args.mode == "execute":
+                        response = await client.post("/api/execute", json=items[0])
+                        failed = int(response.status_code != 200)
+                    else:
+                        response = await client.post("/api/execute/batch", json=items)
+                        results = response.json().get("results", []) if response.status_code == 200 else []
+                        failed = len(items) - sum(item["status"] == "success" for item in results)
+                    latencies.append(time.perf_counter() - started)
+                    errors += failed
+
+            started = time.perf_counter()
+            await asyncio.gather(*(one(items) for items in jobs))
+            elapsed = time.perf_counter() - started
+
+    rpc_calls = sum(stub.calls.values())
+    return {
+        "mode": args.mode,
+        "async_web3": args.async_web3,
+        "transfers": args.transfers,
+        "concurrency": args.concurrency,
+        "rpc_latency_ms": args.rpc_latency * 1000,
+        "errors": errors,
+        "elapsed_s": round(elapsed, 3),
+        "tx_per_s": round(args.transfers / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 2),
+        "rpc_calls_per_transfer": round(rpc_calls / args.transfers, 2),
+        "http_requests_per_transfer": round(stub.requests / args.transfers, 2),
+        "rpc_calls_by_method": dict(stub.calls.most_common()),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark /api/execute against a stub JSON-RPC node")
+    parser.add_argument("--transfers", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--mode", choices=["execute", "batch"], default="execute")
+    parser.add_argument("--batch-size", type=int, default=50)
+    parser.add_argument("--rpc-latency", type=float, default=0.02, help="seconds the stub node adds per HTTP request")
+    parser.add_argument("--block-time", type=float, default=1.0)
+    parser.add_argument("--async-web3", action="store_true", help="benchmark the ASYNC_WEB3 mode")
+    parser.add_argument("--json", help="also write the report to this file")
+    parser.add_argument("--min-tps", type=float, help="fail if throughput drops below this")
+    parser.add_argument("--max-p99-ms", type=float, help="fail if p99 latency exceeds this")
+    args = parser.parse_args()
+
+    stub = StubRPCServer(latency=args.rpc_latency, block_time=args.block_time).start()
+    # zetachain.py reads its configuration at import time
+    os.environ.update({
+        "RPC_URLS": stub.url,
+        "PRIVATE_KEY": BENCH_PRIVATE_KEY,
+        "ASYNC_WEB3": "true" if args.async_web3 else "false",
+        "TX_QUEUE_DEPTH": str(max(1000, args.transfers)),
+    })
+    from main import app
+
+    report = asyncio.run(run(args, app, stub))
+    stub.stop()
+
+    print(json.dumps(report, indent=2))
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+
+    failed = report["errors"] > 0
+    if args.min_tps is not None and report["tx_per_s"] < args.min_tps:
+        print(f"Throughput {report['tx_per_s']} tx/s is below {args.min_tps}", file=sys.stderr)
+        failed = True
+    if args.max_p99_ms is not None and report["p99_ms"] > args.max_p99_ms:
+        print(f"p99 {report['p99_ms']} ms is above {args.max_p99_ms}", file=sys.stderr)
+        failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
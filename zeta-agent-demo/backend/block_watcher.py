@@ -0,0 +1,54 @@
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+class BlockWatcher:
+    """
+    Polls `eth_blockNumber` on a daemon thread and calls every subscriber once
+    per new block. Components that only need fresh data per block (receipts,
+    fee history) subscribe here instead of running their own poll loops.
+    """
+
+    def __init__(self, w3, poll_interval: float = 1.0):
+        self.w3 = w3
+        self.poll_interval = poll_interval
+        self.latest = None
+        self._subscribers = []
+        self._thread = None
+        self._stop = threading.Event()
+
+    def subscribe(self, callback):
+        """Register `callback(block_number)`; it runs on the watcher thread."""
+        self._subscribers.append(callback)
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="block-watcher", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread = None
+
+    def poll(self):
+        block_number = self.w3.eth.block_number
+        if self.latest is not None and block_number <= self.latest:
+            return
+        self.latest = block_number
+        for callback in list(self._subscribers):
+            try:
+                callback(block_number)
+            except Exception:
+                logger.exception("Block subscriber failed at block %s", block_number)
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.poll()
+            except Exception as e:
+                logger.warning("Block poll failed: %s", e)
+            self._stop.wait(self.poll_interval)
@@ -0,0 +1,117 @@
+import threading
+import time
+
+from fee_oracle import FeeOracle, GasEstimator
+from nonce_manager import NonceManager
+
+
+class GasPriceCache:
+    """
+    Keeps the last `eth_gasPrice` answer for `ttl` seconds.
+
+    Once started, a daemon thread refreshes the value before it expires, so
+    the send path normally reads it from memory; if the refresher falls
+    behind (or was never started), `get()` fetches synchronously.
+    """
+
+    def __init__(self, w3, ttl: float = 10.0):
+        self.w3 = w3
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._value = None
+        self._fetched_at = 0.0
+        self._thread = None
+        self._stop = threading.Event()
+
+    def refresh(self) -> int:
+        value = self.w3.eth.gas_price
+        with self._lock:
+            self._value = value
+            self._fetched_at = time.monotonic()
+        return value
+
+    def get(self) -> int:
+        with self._lock:
+            if self._value is not None and time.monotonic() - self._fetched_at < self.ttl:
+                return self._value
+        return self.refresh()
+
+    def start(self):
+        with self._lock:
+            if self._thread is not None:
+                return
+            # A fresh event per thread, so a restart cannot revive a poller that is still stopping
+            self._stop = threading.Event()
+            self._thread = threading.Thread(target=self._run, args=(self._stop,), name="gas-price-refresh", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        with self._lock:
+            thread, self._thread = self._thread, None
+            self._stop.set()
+        if thread is not None:
+            thread.join(timeout=1.0)
+
+    def _run(self, stop: threading.Event):
+        # Refresh at half the TTL so readers never see an expired value
+        while not stop.wait(self.ttl / 2):
+            try:
+                self.refresh()
+            except Exception:
+                # Transient RPC failure: readers fall back to a synchronous fetch
+                pass
+
+
+class ChainContext:
+    """
+    Everything `send_zeta` needs that does not change between transfers:
+    the signing account, the chain id, the nonce allocator, the fee oracle,
+    the gas limit cache and the legacy gas price cache.
+    Built once per process instead of once per request.
+    """
+
+    def __init__(self, w3, private_key: str, gas_price_ttl: float = 10.0):
+        self.w3 = w3
+        self.account = w3.eth.account.from_key(private_key)
+        self.address = self.account.address
+        self.nonces = NonceManager(w3, self.address)
+        self.gas_price = GasPriceCache(w3, ttl=gas_price_ttl)
+        self.fees = FeeOracle(w3)
+        self.gas = GasEstimator(w3, self.address)
+        self._chain_id = None
+        # The gas price poller only runs once a legacy fee was needed, never on EIP-1559 chains
+        self._running = False
+
+    @property
+    def chain_id(self) -> int:
+        if self._chain_id is None:
+            self._chain_id = self.w3.eth.chain_id
+        return self._chain_id
+
+    def warm_up(self):
+        """Load the nonce, chain id and gas price so the first transfer skips every lookup."""
+        if self.nonces.needs_sync:
+            self.nonces.resync()
+        self.chain_id
+        if self.fees.quote() is None:
+            self._legacy_fees_needed()
+            self.gas_price.get()
+
+    def fee_fields(self, urgency: str) -> dict:
+        """Type-2 fee fields for `urgency`, or a legacy gasPrice if the chain has no base fee."""
+        quote = self.fees.quote(urgency)
+        if quote is None:
+            self._legacy_fees_needed()
+            return {"gasPrice": self.gas_price.get()}
+        return dict(quote, type=2)
+
+    def _legacy_fees_needed(self):
+        if self._running:
+            self.gas_price.start()
+
+    def start(self):
+        self._running = True
+
+    def stop(self):
+        self._running = False
+        self.gas_price.stop()
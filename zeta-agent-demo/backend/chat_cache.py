@@ -0,0 +1,143 @@
+import asyncio
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+
+WHITESPACE_PATTERN = re.compile(r"\s+")
+
+
+def normalize_prompt(prompt: str) -> str:
+    """
+    Canonical form of a prompt for cache lookups: full-width characters
+    folded (NFKC), case folded (which also canonicalizes 0x addresses) and
+    whitespace collapsed.
+    """
+    text = unicodedata.normalize("NFKC", prompt).casefold()
+    return WHITESPACE_PATTERN.sub(" ", text).strip()
+
+
+def cache_key(prompt: str, prompt_version: str, model: str) -> str:
+    material = "\x00".join((prompt_version, model, normalize_prompt(prompt)))
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+class ChatCache:
+    """
+    LRU + TTL cache for parsed LLM answers, keyed by `cache_key()`.
+
+    The in-memory tier holds at most `max_entries` answers. With `path` set,
+    answers are also written to a SQLite file that is consulted on a memory
+    miss, so the cache survives restarts. Async callers use `aget()` /
+    `aput()`, which keep the SQLite I/O off the event loop.
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl: float = 3600.0, path: str = None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._db = None
+        # SQLite work has its own lock so memory hits never wait on the disk
+        self._db_lock = threading.Lock()
+        if path:
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS chat_cache (key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+            self._db.execute("DELETE FROM chat_cache WHERE expires_at < ?", (time.time(),))
+            self._db.commit()
+
+    def get(self, key: str):
+        value = self._get_memory(key)
+        if value is None and self._db is not None:
+            value = self._get_disk(key)
+        self._count(value)
+        return value
+
+    async def aget(self, key: str):
+        """get() for the event loop: memory hits answer inline, SQLite reads run in a worker thread."""
+        value = self._get_memory(key)
+        if value is None and self._db is not None:
+            value = await asyncio.to_thread(self._get_disk, key)
+        self._count(value)
+        return value
+
+    def put(self, key: str, value):
+        expires_at = time.time() + self.ttl
+        with self._lock:
+            self._remember(key, value, expires_at)
+        if self._db is not None:
+            self._write(key, value, expires_at)
+
+    async def aput(self, key: str, value):
+        """put() for the event loop: the SQLite write runs in a worker thread."""
+        expires_at = time.time() + self.ttl
+        with self._lock:
+            self._remember(key, value, expires_at)
+        if self._db is not None:
+            await asyncio.to_thread(self._write, key, value, expires_at)
+
+    def _get_memory(self, key: str):
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at >= now:
+                self._entries.move_to_end(key)
+                return value
+            del self._entries[key]
+            return None
+
+    def _get_disk(self, key: str):
+        with self._db_lock:
+            row = self._db.execute(
+                "SELECT value, expires_at FROM chat_cache WHERE key = ? AND expires_at >= ?", (key, time.time())
+            ).fetchone()
+        if row is None:
+            return None
+        value = json.loads(row[0])
+        with self._lock:
+            self._remember(key, value, row[1])
+        return value
+
+    def _write(self, key: str, value, expires_at: float):
+        with self._db_lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO chat_cache (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, json.dumps(value), expires_at),
+            )
+            self._db.commit()
+
+    def _count(self, value):
+        with self._lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+
+    def _remember(self, key: str, value, expires_at: float):
+        self._entries[key] = (value, expires_at)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else None,
+                "disk": self._db is not None,
+            }
@@ -0,0 +1,201 @@
+import threading
+import time
+from collections import OrderedDict
+
+from rpc_pool import batch_slices
+
+# Priority-fee percentile of recent blocks paid for each urgency level
+URGENCY_PERCENTILES = {"low": 10, "standard": 50, "fast": 90}
+DEFAULT_URGENCY = "standard"
+
+# Headroom over eth_estimateGas so small state changes between estimate and inclusion don't run out of gas
+GAS_LIMIT_MARGIN = 1.2
+
+
+class FeeOracle:
+    """
+    EIP-1559 fee quotes from a cached `eth_feeHistory`.
+
+    One fee history (all urgency percentiles at once) is fetched per block and
+    shared by every transfer; `on_new_block()` invalidates it, and `ttl` bounds
+    its age when nobody reports new blocks. If the node returns no base fee the
+    chain is treated as legacy and `quote()` returns None.
+    """
+
+    def __init__(self, w3, block_count: int = 10, ttl: float = 6.0):
+        self.w3 = w3
+        self.block_count = block_count
+        self.ttl = ttl
+        self._percentiles = sorted(URGENCY_PERCENTILES.values())
+        self._lock = threading.Lock()
+        self._history = None
+        self._block = None
+        self._fetched_at = 0.0
+
+    def on_new_block(self, block_number: int):
+        with self._lock:
+            if self._block is not None and block_number > self._block:
+                self._history = None
+
+    def _fee_history(self):
+        with self._lock:
+            if self._history is not None and time.monotonic() - self._fetched_at < self.ttl:
+                return self._history
+        history = self.w3.eth.fee_history(self.block_count, "latest", self._percentiles)
+        with self._lock:
+            self._history = history
+            self._block = history["oldestBlock"] + len(history["gasUsedRatio"]) - 1
+            self._fetched_at = time.monotonic()
+        return history
+
+    def quote(self, urgency: str = DEFAULT_URGENCY):
+        """Return {"maxFeePerGas", "maxPriorityFeePerGas"} for `urgency`, or None on legacy chains."""
+        if urgency not in URGENCY_PERCENTILES:
+            raise ValueError(f"Unknown urgency {urgency!r}, expected one of {list(URGENCY_PERCENTILES)}")
+        history = self._fee_history()
+        base_fees = history.get("baseFeePerGas") or []
+        if not base_fees or not any(base_fees):
+            return None
+
+        column = self._percentiles.index(URGENCY_PERCENTILES[urgency])
+        rewards = sorted(block[column] for block in history.get("reward") or [] if block)
+        priority_fee = rewards[len(rewards) // 2] if rewards else 0
+        # The last entry is the base fee of the next block; doubling it survives several full blocks
+        next_base_fee = base_fees[-1]
+        return {
+            "maxFeePerGas": 2 * next_base_fee + priority_fee,
+            "maxPriorityFeePerGas": priority_fee,
+        }
+
+
+class GasEstimator:
+    """
+    Gas limits cached per transaction shape.
+
+    A plain value transfer to an account without code costs the same whoever
+    receives it, so all of those share one shape (no code, no selector, no
+    calldata). Anything that runs code (calldata, or value sent to a contract's
+    receive function) is keyed on (recipient, selector, calldata size). Whether
+    a recipient has code is looked up once with `eth_getCode` and cached.
+
+    A shape is estimated with `eth_estimateGas` the first time it is seen and
+    reused afterwards, instead of reserving a flat 2,000,000 gas per transfer.
+    """
+
+    def __init__(self, w3, sender: str, max_entries: int = 4096):
+        self.w3 = w3
+        self.sender = sender
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._cache = OrderedDict()
+        self._has_code = OrderedDict()
+
+    @staticmethod
+    def _calldata(tx: dict) -> str:
+        data = tx.get("data") or "0x"
+        return "0x" + data.hex() if isinstance(data, bytes) else data
+
+    def shape(self, tx: dict):
+        data = self._calldata(tx)
+        # Unknown (evicted) recipients count as contracts: keyed per address, never under-estimated
+        if data == "0x" and not self._has_code.get(tx["to"], True):
+            return (False, "0x", len(data))
+        return (tx["to"], data[:10], len(data))
+
+    def _remember_code(self, address: str, code) -> None:
+        with self._lock:
+            self._has_code[address] = len(code) > 0 and code not in ("0x", b"")
+            while len(self._has_code) > self.max_entries:
+                self._has_code.popitem(last=False)
+
+    def _look_up_code(self, txs: list):
+        """Fetch code presence for the plain-transfer recipients not seen yet, in batches."""
+        with self._lock:
+            unknown = list(dict.fromkeys(
+                tx["to"] for tx in txs if self._calldata(tx) == "0x" and tx["to"] not in self._has_code
+            ))
+        if not unknown:
+            return
+        if len(unknown) == 1:
+            self._remember_code(unknown[0], self.w3.eth.get_code(unknown[0]))
+            return
+        for _, addresses in batch_slices(unknown):
+            responses = self.w3.provider.make_batch_request([("eth_getCode", [address, "latest"]) for address in addresses])
+            if not isinstance(responses, list):
+                raise ValueError(f"Batch request failed: {responses.get('error', responses)}")
+            for address, response in zip(addresses, responses):
+                if "error" in response:
+                    raise ValueError(response["error"].get("message", str(response["error"])))
+                self._remember_code(address, response["result"])
+
+    def _get(self, key):
+        with self._lock:
+            gas = self._cache.get(key)
+            if gas is not None:
+                self._cache.move_to_end(key)
+            return gas
+
+    def _put(self, key, estimate: int) -> int:
+        gas = int(estimate * GAS_LIMIT_MARGIN)
+        with self._lock:
+            self._cache[key] = gas
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.max_entries:
+                self._cache.popitem(last=False)
+        return gas
+
+    def _call(self, tx: dict) -> dict:
+        call = {"from": self.sender, "to": tx["to"], "value": tx.get("value", 0)}
+        if tx.get("data"):
+            call["data"] = tx["data"]
+        return call
+
+    def estimate(self, tx: dict) -> int:
+        self._look_up_code([tx])
+        key = self.shape(tx)
+        gas = self._get(key)
+        if gas is None:
+            gas = self._put(key, self.w3.eth.estimate_gas(self._call(tx)))
+        return gas
+
+    def estimate_many(self, txs: list) -> list:
+        """
+        Gas limits for many transactions; shapes not cached yet are estimated
+        together in JSON-RPC batches. Failed estimates come back as exceptions.
+        """
+        self._look_up_code(txs)
+        keys = [self.shape(tx) for tx in txs]
+        known = {}
+        missing = {}
+        for key, tx in zip(keys, txs):
+            if key in known or key in missing:
+                continue
+            gas = self._get(key)
+            if gas is None:
+                missing[key] = tx
+            else:
+                known[key] = gas
+
+        for _, shapes in batch_slices(list(missing.items())):
+            responses = self.w3.provider.make_batch_request([
+                ("eth_estimateGas", [_json_call(self._call(tx))]) for _, tx in shapes
+            ])
+            if not isinstance(responses, list):
+                message = responses.get("error", responses)
+                responses = [{"error": {"message": f"Batch request failed: {message}"}}] * len(shapes)
+            for (key, _), response in zip(shapes, responses):
+                if "error" in response:
+                    known[key] = ValueError(response["error"].get("message", str(response["error"])))
+                else:
+                    known[key] = self._put(key, int(response["result"], 16))
+
+        return [known[key] for key in keys]
+
+
+def _json_call(call: dict) -> dict:
+    """Encode an eth_call-style dict for a raw JSON-RPC request."""
+    encoded = {"from": call["from"], "to": call["to"], "value": hex(call.get("value", 0))}
+    if call.get("data"):
+        data = call["data"]
+        encoded["data"] = data if isinstance(data, str) else "0x" + data.hex()
+    return encoded
@@ -0,0 +1,48 @@
+import re
+
+from chat_cache import normalize_prompt
+
+ADDRESS_PATTERN = re.compile(r"0x[0-9a-f]{40}")
+
+# (user input, expected JSON answer); kept short, they are sent with every LLM call
+EXAMPLES = [
+    ("send 0.1 zeta to 0x2c7536E3605D9C16a7a3D7b1898e529396a65c23",
+     '{"recipient":"0x2c7536E3605D9C16a7a3D7b1898e529396a65c23","amount":0.1,"token":"ZETA"}'),
+    ("pay bob 5 zeta",
+     '{"recipient":null,"amount":5,"token":"ZETA"}'),
+    ("move a tenth of a zeta over to 0x000000000000000000000000000000000000dEaD",
+     '{"recipient":"0x000000000000000000000000000000000000dEaD","amount":0.1,"token":"ZETA"}'),
+    ("tip 0x000000000000000000000000000000000000dEaD two usdc",
+     '{"recipient":"0x000000000000000000000000000000000000dEaD","amount":2,"token":"USDC"}'),
+    ("transfer some ZETA to 0x2c7536E3605D9C16a7a3D7b1898e529396a65c23",
+     '{"recipient":"0x2c7536E3605D9C16a7a3D7b1898e529396a65c23","amount":null,"token":"ZETA"}'),
+    ("给0x2c7536E3605D9C16a7a3D7b1898e529396a65c23转0.5个ZETA",
+     '{"recipient":"0x2c7536E3605D9C16a7a3D7b1898e529396a65c23","amount":0.5,"token":"ZETA"}'),
+    ("帮我给 0x000000000000000000000000000000000000dEaD 打三个 zeta",
+     '{"recipient":"0x000000000000000000000000000000000000dEaD","amount":3,"token":"ZETA"}'),
+    ("转一点ZETA给朋友",
+     '{"recipient":null,"amount":null,"token":"ZETA"}'),
+]
+
+
+def _shingles(text: str) -> set:
+    # Addresses all look alike to the model; do not let their hex digits drive similarity
+    text = ADDRESS_PATTERN.sub("0x", normalize_prompt(text))
+    if len(text) < 3:
+        return {text}
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+_EXAMPLE_SHINGLES = [(_shingles(prompt), prompt, answer) for prompt, answer in EXAMPLES]
+
+
+def select_examples(prompt: str, k: int = 2) -> list:
+    """The `k` examples most similar to `prompt` (character-trigram Jaccard), most similar last."""
+    if k <= 0:
+        return []
+    shingles = _shingles(prompt)
+    scored = sorted(
+        _EXAMPLE_SHINGLES,
+        key=lambda example: len(shingles & example[0]) / len(shingles | example[0]),
+    )
+    return [(example_prompt, answer) for _, example_prompt, answer in scored[-k:]]
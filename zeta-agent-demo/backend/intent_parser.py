@@ -0,0 +1,83 @@
+import re
+import unicodedata
+from typing import Any, Dict
+
+from amounts import decimals_for, normalize_amount, to_base_units
+
+# Tokens the fast path is allowed to recognise; anything else goes to the LLM
+KNOWN_TOKENS = {"ZETA", "ETH", "BTC", "BNB", "USDC", "USDT", "MATIC"}
+
+TRANSFER_KEYWORDS = ("send", "transfer", "pay", "发送", "转账", "转", "打给", "给")
+
+ADDRESS_PATTERN = re.compile(r"(?<![0-9a-zA-Z])0x[0-9a-fA-F]{40}(?![0-9a-zA-Z])")
+# "0.1 ZETA", "0.1ZETA", "5 usdt"
+AMOUNT_TOKEN_PATTERN = re.compile(r"(?<![\w.])(\d+(?:\.\d+)?)\s*([A-Za-z]{2,10})(?![A-Za-z])")
+# A bare number that is not part of an address
+NUMBER_PATTERN = re.compile(r"(?<![\w.])\d+(?:\.\d+)?(?![\w.])")
+
+# Confidence needed before /api/chat answers without calling the LLM
+FAST_PATH_MIN_CONFIDENCE = 0.9
+
+
+def _normalize(text: str) -> str:
+    # NFKC folds full-width digits, letters and punctuation (０．１ ＺＥＴＡ -> 0.1 ZETA)
+    return unicodedata.normalize("NFKC", text)
+
+
+def parse_transfer_intent(text: str) -> Dict[str, Any]:
+    """
+    Extract a transfer intent without the LLM.
+
+    Returns the same shape as the LLM output plus a confidence score:
+    {"type": "transfer", "recipient": "0x...", "amount": "0.1", "token": "ZETA",
+     "base_units": 100000000000000000, "confidence": 1.0}
+
+    Confidence is 1.0 only when the text has a transfer keyword, exactly one
+    address and exactly one amount with a known token; missing or ambiguous
+    fields lower it so the caller can fall back to the LLM.
+    """
+    if not isinstance(text, str):
+        raise TypeError("text must be a string")
+
+    normalized = _normalize(text)
+    lowered = normalized.lower()
+
+    addresses = {address.lower(): address for address in ADDRESS_PATTERN.findall(normalized)}
+    without_addresses = ADDRESS_PATTERN.sub(" ", normalized)
+    amounts = [
+        (amount, token.upper())
+        for amount, token in AMOUNT_TOKEN_PATTERN.findall(without_addresses)
+        if token.upper() in KNOWN_TOKENS
+    ]
+    numbers = NUMBER_PATTERN.findall(without_addresses)
+    has_keyword = any(keyword in lowered for keyword in TRANSFER_KEYWORDS)
+
+    recipient = next(iter(addresses.values())) if len(addresses) == 1 else None
+    amount, token = amounts[0] if len(amounts) == 1 else (None, None)
+    base_units = None
+    if amount is not None:
+        amount = normalize_amount(amount)
+        base_units = to_base_units(amount, decimals_for(token))
+        if base_units is None:
+            # More decimals than the token has: leave it to the LLM path
+            amount = None
+
+    confidence = 1.0
+    if recipient is None:
+        confidence -= 0.5
+    if amount is None:
+        confidence -= 0.5
+    if len(numbers) > len(amounts):
+        # A stray number ("send 0.1 ZETA to 0x.. 3 times") may change the meaning
+        confidence -= 0.3
+    if not has_keyword:
+        confidence -= 0.2
+
+    return {
+        "type": "transfer",
+        "recipient": recipient,
+        "amount": amount,
+        "token": token,
+        "base_units": base_units,
+        "confidence": round(max(confidence, 0.0), 2),
+    }
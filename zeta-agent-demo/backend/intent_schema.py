@@ -0,0 +1,137 @@
+import json
+import re
+import unicodedata
+from decimal import Decimal
+from typing import Literal, Optional
+
+from pydantic import BaseModel, ConfigDict, ValidationError, field_validator, model_validator
+
+from amounts import decimals_for, normalize_amount, to_base_units
+
+FENCE_PATTERN = re.compile(r"```(?:json|JSON)?")
+UNQUOTED_KEY_PATTERN = re.compile(r'([{,]\s*)([A-Za-z_][A-Za-z0-9_]*)(\s*:)')
+TRAILING_COMMA_PATTERN = re.compile(r",(\s*[}\]])")
+LINE_COMMENT_PATTERN = re.compile(r"^\s*//.*$", re.MULTILINE)
+PYTHON_LITERALS = {"None": "null", "True": "true", "False": "false"}
+PYTHON_LITERAL_PATTERN = re.compile(r"\b(None|True|False)\b")
+
+
+class TransferIntent(BaseModel):
+    """
+    The structured intent /api/chat returns; unknown keys from the model are dropped.
+
+    `amount` is a canonical decimal string and `base_units` the same amount
+    as an exact integer in the token's smallest unit (None when the token is
+    unknown or the amount has more decimals than the token).
+    """
+
+    model_config = ConfigDict(extra="ignore")
+
+    type: Literal["transfer"] = "transfer"
+    recipient: Optional[str] = None
+    amount: Optional[str] = None
+    token: Optional[str] = None
+    base_units: Optional[int] = None
+
+    @field_validator("type", mode="before")
+    @classmethod
+    def _lower_type(cls, value):
+        return value.lower() if isinstance(value, str) else value
+
+    @field_validator("amount", mode="before")
+    @classmethod
+    def _parse_amount(cls, value):
+        # Models like to answer "0.1 ZETA" or "0.1" instead of 0.1
+        return normalize_amount(value)
+
+    @field_validator("token", mode="before")
+    @classmethod
+    def _upper_token(cls, value):
+        return value.strip().upper() if isinstance(value, str) and value.strip() else None
+
+    @field_validator("recipient", mode="before")
+    @classmethod
+    def _strip_recipient(cls, value):
+        return value.strip() if isinstance(value, str) and value.strip() else None
+
+    @model_validator(mode="after")
+    def _compute_base_units(self):
+        # Always derived from amount, never taken from the model's output
+        self.base_units = None
+        if self.amount is not None and self.token is not None:
+            try:
+                self.base_units = to_base_units(self.amount, decimals_for(self.token))
+            except ValueError:
+                # Token missing from the registry
+                pass
+        return self
+
+
+def _object_span(text: str) -> str:
+    """The first {...} object in `text`, closing it if the completion was cut off."""
+    start = text.find("{")
+    if start < 0:
+        raise ValueError("No JSON object in agent output")
+    depth = 0
+    in_string = False
+    escape = False
+    for index in range(start, len(text)):
+        char = text[index]
+        if in_string:
+            if escape:
+                escape = False
+            elif char == "\\":
+                escape = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char == "{":
+            depth += 1
+        elif char == "}":
+            depth -= 1
+            if depth == 0:
+                return text[start:index + 1]
+    return text[start:] + ('"' if in_string else "") + "}" * depth
+
+
+def repair_json(text: str) -> dict:
+    """
+    Parse near-valid JSON from a model completion without asking the model again.
+
+    Handles code fences and chatter around the object, truncated output,
+    full-width punctuation, single quotes, unquoted keys, Python literals,
+    trailing commas and // comments. Raises ValueError if nothing parses.
+    """
+    text = FENCE_PATTERN.sub("", text)
+    try:
+        # Decimal keeps the digits the model wrote ("0.3" is not 0.299999...)
+        data = json.loads(_object_span(text), parse_float=Decimal)
+        if isinstance(data, dict):
+            return data
+    except ValueError:
+        pass
+
+    fixed = _object_span(unicodedata.normalize("NFKC", text))
+    fixed = fixed.replace("“", '"').replace("”", '"').replace("‘", "'").replace("’", "'")
+    if '"' not in fixed:
+        fixed = fixed.replace("'", '"')
+    fixed = LINE_COMMENT_PATTERN.sub("", fixed)
+    fixed = PYTHON_LITERAL_PATTERN.sub(lambda match: PYTHON_LITERALS[match.group()], fixed)
+    fixed = UNQUOTED_KEY_PATTERN.sub(r'\1"\2"\3', fixed)
+    fixed = TRAILING_COMMA_PATTERN.sub(r"\1", fixed)
+    try:
+        data = json.loads(fixed, parse_float=Decimal)
+    except json.JSONDecodeError as e:
+        raise ValueError(f"Agent output is not valid JSON: {e}")
+    if not isinstance(data, dict):
+        raise ValueError("Agent output is not a JSON object")
+    return data
+
+
+def extract_intent(content: str) -> dict:
+    """Validate a model completion against TransferIntent, repairing it locally if needed."""
+    try:
+        return TransferIntent.model_validate(repair_json(content)).model_dump()
+    except (ValueError, ValidationError) as e:
+        return {"error": "Failed to parse JSON from agent", "detail": str(e), "raw": content}
@@ -0,0 +1,112 @@
+import asyncio
+
+
+class LLMBusyError(Exception):
+    """No LLM slot freed up within the queue timeout."""
+
+
+class AsyncLLMClient:
+    """
+    Async front for the LLM with a cap on concurrent upstream calls.
+
+    At most `max_concurrency` calls run at once; further requests wait up to
+    `queue_timeout` seconds for a slot and then fail with LLMBusyError.
+    Requests with the same `key` that arrive while a call for that key is in
+    flight share its result instead of issuing their own call. `stream()`
+    takes slots from the same semaphore.
+    """
+
+    def __init__(self, call, max_concurrency: int = 8, queue_timeout: float = 10.0, call_timeout: float = 60.0,
+                 stream_call=None):
+        # `call` is an async function: prompt -> completion text;
+        # `stream_call` an async generator: prompt -> completion text pieces
+        self.call = call
+        self.stream_call = stream_call
+        self.max_concurrency = max_concurrency
+        self.queue_timeout = queue_timeout
+        self.call_timeout = call_timeout
+        self.upstream_calls = 0
+        self.coalesced = 0
+        self.rejected = 0
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._inflight = {}
+        self._waiting = 0
+        self._streaming = 0
+
+    async def complete(self, prompt: str, key: str = None) -> str:
+        key = prompt if key is None else key
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._run(prompt))
+            self._inflight[key] = task
+            task.add_done_callback(lambda done, key=key: self._forget(key, done))
+        else:
+            self.coalesced += 1
+        # Shielded so one caller going away does not cancel the call others share
+        return await asyncio.shield(task)
+
+    def _forget(self, key: str, task: asyncio.Future):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            # Mark the exception as retrieved even if every waiter has gone
+            task.exception()
+
+    async def stream(self, prompt: str, key: str = None):
+        """
+        Completion text pieces as the model writes them, under the same cap
+        and queue timeout as complete(); `call_timeout` bounds the wait for
+        each piece. If a complete() call for `key` is in flight, its result is
+        yielded as a single piece instead of starting a second call. Streams
+        are not shared with each other.
+        """
+        key = prompt if key is None else key
+        task = self._inflight.get(key)
+        if task is not None:
+            self.coalesced += 1
+            yield await asyncio.shield(task)
+            return
+        await self._acquire()
+        self._streaming += 1
+        pieces = self.stream_call(prompt)
+        try:
+            self.upstream_calls += 1
+            while True:
+                try:
+                    piece = await asyncio.wait_for(pieces.__anext__(), self.call_timeout)
+                except StopAsyncIteration:
+                    return
+                yield piece
+        finally:
+            self._streaming -= 1
+            self._semaphore.release()
+            await pieces.aclose()
+
+    async def _acquire(self):
+        self._waiting += 1
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), self.queue_timeout)
+        except asyncio.TimeoutError:
+            self.rejected += 1
+            raise LLMBusyError(f"LLM is busy, no slot within {self.queue_timeout}s")
+        finally:
+            self._waiting -= 1
+
+    async def _run(self, prompt: str) -> str:
+        await self._acquire()
+        try:
+            self.upstream_calls += 1
+            return await asyncio.wait_for(self.call(prompt), self.call_timeout)
+        finally:
+            self._semaphore.release()
+
+    def stats(self) -> dict:
+        return {
+            "max_concurrency": self.max_concurrency,
+            "in_flight": len(self._inflight),
+            "streaming": self._streaming,
+            "waiting": self._waiting,
+            "upstream_calls": self.upstream_calls,
+            "coalesced": self.coalesced,
+            "rejected": self.rejected,
+        }
@@ -0,0 +1,154 @@
+"""
+Load generator for /api/chat.
+
+Sends prompts at increasing concurrency levels and reports throughput, tail
+latency and error rate per level. By default it runs the FastAPI app
+in-process against mock_llm.py (and stub_rpc.py for the chain side), so the
+numbers do not depend on DashScope quota or its latency on the day:
+
+    python load_chat.py --levels 1,4,16,64 --requests 200 --latency lognormal:0.5,0.6
+    python load_chat.py --url http://localhost:8000 --levels 8,32   # a running backend
+
+Prompts are made unique per request so every one reaches the LLM; pass
+--allow-cache to replay them verbatim and measure the cached path instead.
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from collections import Counter
+
+from bench_transfers import BENCH_PRIVATE_KEY, percentile
+from mock_llm import DEFAULT_RECORDINGS, MockLLMServer, load_recordings
+from stub_rpc import StubRPCServer
+
+
+async def run_level(client, prompts: list, concurrency: int, requests: int, allow_cache: bool, offset: int) -> dict:
+    latencies = []
+    statuses = Counter()
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(i: int):
+        prompt = prompts[i % len(prompts)]
+        if not allow_cache:
+            prompt = f"{prompt} (#{offset + i})"
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                response = await client.post("/api/chat", json={"prompt": prompt})
+                status = response.status_code
+                if status == 200 and "error" in response.json():
+                    status = "parse_error"
+            except Exception as e:
+                status = type(e).__name__
+            latencies.append(time.perf_counter() - started)
+            statuses[str(status)] += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(requests)))
+    elapsed = time.perf_counter() - started
+
+    errors = requests - statuses["200"]
+    return {
+        "concurrency": concurrency,
+        "requests": requests,
+        "elapsed_s": round(elapsed, 3),
+        "req_per_s": round(requests / elapsed, 1),
+        "error_rate": round(errors / requests, 4),
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 1),
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 1),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 1),
+        "max_ms": round(max(latencies) * 1000, 1),
+        "statuses": dict(statuses),
+    }
+
+
+async def run(args, prompts: list, app=None) -> list:
+    import httpx
+
+    if app is not None:
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://load", timeout=120)
+    else:
+        limits = httpx.Limits(max_connections=max(args.levels), max_keepalive_connections=max(args.levels))
+        client = httpx.AsyncClient(base_url=args.url, timeout=120, limits=limits)
+
+    report = []
+    async with client:
+        offset = 0
+        for concurrency in args.levels:
+            level = await run_level(client, prompts, concurrency, args.requests, args.allow_cache, offset)
+            offset += args.requests
+            report.append(level)
+            print(
+                f"c={level['concurrency']:<4} {level['req_per_s']:>8} req/s  "
+                f"p50 {level['p50_ms']:>8} ms  p95 {level['p95_ms']:>8} ms  p99 {level['p99_ms']:>8} ms  "
+                f"errors {level['error_rate']:.2%}  {level['statuses']}",
+                file=sys.stderr,
+            )
+    return report
+
+
+async def run_in_process(args, prompts: list) -> list:
+    from main import app
+
+    async with app.router.lifespan_context(app):
+        return await run(args, prompts, app)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test /api/chat at increasing concurrency")
+    parser.add_argument("--url", help="base URL of a running backend; default runs the app in-process against the mock LLM")
+    parser.add_argument("--levels", default="1,2,4,8,16,32", help="comma-separated concurrency levels")
+    parser.add_argument("--requests", type=int, default=200, help="requests per level")
+    parser.add_argument("--recordings", help="JSONL recordings for the mock LLM (and the prompts to send)")
+    parser.add_argument("--latency", default="lognormal:0.5,0.6", help="mock LLM latency distribution, see mock_llm.py")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of mock LLM calls that fail")
+    parser.add_argument("--allow-cache", action="store_true", help="repeat prompts verbatim so the response cache can answer")
+    parser.add_argument("--json", help="also write the report to this file")
+    parser.add_argument("--max-error-rate", type=float, help="fail if any level exceeds this error rate")
+    parser.add_argument("--max-p99-ms", type=float, help="fail if any level's p99 latency exceeds this")
+    args = parser.parse_args()
+    args.levels = [int(level) for level in args.levels.split(",")]
+
+    recordings = load_recordings(args.recordings) if args.recordings else DEFAULT_RECORDINGS
+    prompts = [item["prompt"] for item in recordings]
+
+    if args.url:
+        report = asyncio.run(run(args, prompts))
+        mock_stats = None
+    else:
+        mock = MockLLMServer(recordings=recordings, latency=args.latency, error_rate=args.error_rate).start()
+        stub = StubRPCServer().start()
+        # agent.py and zetachain.py read their configuration at import time
+        os.environ.update({
+            "LLM_BACKEND": "openai",
+            "LLM_BASE_URL": mock.url + "/v1",
+            "RPC_URLS": stub.url,
+            "PRIVATE_KEY": BENCH_PRIVATE_KEY,
+        })
+        report = asyncio.run(run_in_process(args, prompts))
+        mock_stats = mock.stats()
+        mock.stop()
+        stub.stop()
+
+    result = {"latency": None if args.url else args.latency, "levels": report, "mock_llm": mock_stats}
+    print(json.dumps(result, indent=2))
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(result, f, indent=2)
+
+    failed = False
+    for level in report:
+        if args.max_error_rate is not None and level["error_rate"] > args.max_error_rate:
+            print(f"c={level['concurrency']}: error rate {level['error_rate']} is above {args.max_error_rate}", file=sys.stderr)
+            failed = True
+        if args.max_p99_ms is not None and level["p99_ms"] > args.max_p99_ms:
+            print(f"c={level['concurrency']}: p99 {level['p99_ms']} ms is above {args.max_p99_ms}", file=sys.stderr)
+            failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,21 +1,111 @@
 import os
+import re
 import json
-from fastapi import FastAPI, HTTPException
+import asyncio
+import logging
+import time
+from contextlib import asynccontextmanager
+from typing import List, Optional
+from fastapi import FastAPI, Header, HTTPException, Request, Response
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, ValidationError, field_validator, model_validator
 from dotenv import load_dotenv
 
-# Import qwen-agent related modules
-# Note: qwen-agent usage might vary slightly based on version, assuming standard usage for tool calling or generation
-# Since the requirement is "Agent output structured parameters", we can use a system prompt to enforce JSON output.
-import dashscope
-from http import HTTPStatus
-
-from zetachain import send_zeta, get_address
+from amounts import decimals_for, normalize_amount, to_base_units
+from agent import MODEL_NAME, SYSTEM_PROMPT_VERSION, acall_llm, aclose_llm, astream_llm, parse_agent_output
+from chat_cache import ChatCache, cache_key
+from fee_oracle import DEFAULT_URGENCY, URGENCY_PERCENTILES
+from intent_parser import FAST_PATH_MIN_CONFIDENCE, parse_transfer_intent
+from llm_client import AsyncLLMClient, LLMBusyError
+from metrics import CHAT_RESOLUTIONS, HTTP_LATENCY, PARSE_LATENCY, render as render_metrics
+from prepared import PreparedTransfer, PreparedTransferStore
+from streaming_json import IncrementalJSONParser
+from token_usage import current_endpoint, new_request_usage, usage_totals
+from tx_queue import IdempotencyConflictError, QueueFullError, SubmissionQueue
+from zetachain import (
+    ASYNC_WEB3,
+    BroadcastUnknownError,
+    async_send_prepared,
+    async_send_zeta,
+    close_async_web3,
+    get_status as get_chain_status,
+    open_async_web3,
+    prepare_transfer,
+    receipt_tracker,
+    send_prepared,
+    send_zeta,
+    send_zeta_batch,
+    start_background,
+    stop_background,
+    warm_up,
+)
 
 load_dotenv()
 
-app = FastAPI()
+logger = logging.getLogger(__name__)
+
+TX_QUEUE_DEPTH = int(os.getenv("TX_QUEUE_DEPTH", "1000"))
+TX_SUBMIT_CONCURRENCY = int(os.getenv("TX_SUBMIT_CONCURRENCY", "8"))
+IDEMPOTENCY_TTL = float(os.getenv("IDEMPOTENCY_TTL", "3600"))
+
+chat_cache = ChatCache(
+    max_entries=int(os.getenv("CHAT_CACHE_SIZE", "1024")),
+    ttl=float(os.getenv("CHAT_CACHE_TTL", "3600")),
+    # Optional SQLite file so cached answers survive restarts
+    path=os.getenv("CHAT_CACHE_PATH") or None,
+)
+
+llm_client = AsyncLLMClient(
+    acall_llm,
+    max_concurrency=int(os.getenv("LLM_MAX_CONCURRENCY", "8")),
+    queue_timeout=float(os.getenv("LLM_QUEUE_TIMEOUT", "10")),
+    call_timeout=float(os.getenv("LLM_TIMEOUT", "60")),
+    stream_call=astream_llm,
+)
+
+prepared_transfers = PreparedTransferStore(ttl=float(os.getenv("PREPARE_TTL", "60")))
+
+async def submit_transfer(request):
+    if isinstance(request, list):
+        # A batch from /api/execute/batch: (recipient, base_units, urgency) tuples
+        return await run_in_threadpool(send_zeta_batch, request)
+    if isinstance(request, PreparedTransfer):
+        if ASYNC_WEB3:
+            return await async_send_prepared(request.tx)
+        return await run_in_threadpool(send_prepared, request.tx)
+    if ASYNC_WEB3:
+        return await async_send_zeta(request.recipient, request.base_units, request.urgency)
+    return await run_in_threadpool(send_zeta, request.recipient, request.base_units, request.urgency)
+
+submission_queue = SubmissionQueue(
+    submit_transfer,
+    max_depth=TX_QUEUE_DEPTH,
+    concurrency=TX_SUBMIT_CONCURRENCY,
+    idempotency_ttl=IDEMPOTENCY_TTL,
+    # The transfer may be in the mempool: a retry must not send it again
+    is_retryable=lambda error: not isinstance(error, BroadcastUnknownError),
+)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    try:
+        await run_in_threadpool(warm_up)
+    except Exception as e:
+        # The node may be unreachable at boot; the first transfer will sync instead
+        logger.warning("Chain warm-up failed: %s", e)
+    start_background()
+    if ASYNC_WEB3:
+        await open_async_web3()
+    await submission_queue.start()
+    yield
+    await submission_queue.stop()
+    stop_background()
+    await close_async_web3()
+    await aclose_llm()
+
+app = FastAPI(lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -23,88 +113,414 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Lets the browser read the 429 backoff hint
+    expose_headers=["Retry-After"],
 )
 
+@app.middleware("http")
+async def time_requests(request: Request, call_next):
+    started = time.perf_counter()
+    current_endpoint.set(request.url.path)
+    usage = new_request_usage()
+    response = await call_next(request)
+    if usage["calls"]:
+        # Streamed responses send headers before the model finishes; those show up in /metrics only
+        response.headers["X-LLM-Input-Tokens"] = str(usage["input_tokens"])
+        response.headers["X-LLM-Output-Tokens"] = str(usage["output_tokens"])
+    # Label by route template, not the raw path, so /api/tx/{tx_hash} stays one series
+    route = request.scope.get("route")
+    HTTP_LATENCY.labels(
+        request.method, route.path if route is not None else "unmatched", str(response.status_code)
+    ).observe(time.perf_counter() - started)
+    return response
+
 class ChatRequest(BaseModel):
     prompt: str
 
+class ChatBatchRequest(BaseModel):
+    prompts: List[str]
+    # Emit NDJSON lines as items finish instead of one JSON body at the end
+    stream: bool = False
+
+class PrepareRequest(BaseModel):
+    prompt: str
+    urgency: str = DEFAULT_URGENCY
+
+class ConfirmRequest(BaseModel):
+    confirmation_token: str
+
+class TxStatusRequest(BaseModel):
+    hashes: List[str]
+
 class ExecuteRequest(BaseModel):
     recipient: str
-    amount: float
+    # Decimal string ("0.1"); JSON numbers are accepted and read from their shortest repr
+    amount: Optional[str] = None
     token: str
+    # Exact integer in the token's smallest unit (wei for ZETA); derived from amount when omitted
+    base_units: Optional[int] = None
+    urgency: str = DEFAULT_URGENCY
+
+    @field_validator("amount", mode="before")
+    @classmethod
+    def _normalize_amount(cls, value):
+        amount = normalize_amount(value)
+        if value is not None and amount is None:
+            raise ValueError(f"Invalid amount {value!r}")
+        return amount
+
+    @model_validator(mode="after")
+    def _check_base_units(self):
+        if self.amount is None and self.base_units is None:
+            raise ValueError("amount or base_units is required")
+        try:
+            decimals = decimals_for(self.token)
+        except ValueError:
+            # Unsupported tokens are rejected by the endpoints
+            return self
+        if self.amount is not None:
+            base_units = to_base_units(self.amount, decimals)
+            if base_units is None:
+                raise ValueError(f"amount must be non-negative with at most {decimals} decimal places")
+            if self.base_units is not None and self.base_units != base_units:
+                raise ValueError(f"base_units {self.base_units} does not match amount {self.amount} {self.token}")
+            self.base_units = base_units
+        if self.base_units <= 0:
+            raise ValueError("amount must be positive")
+        return self
+
+EXPLORER_TX_URL = "https://athens3.explorer.zetachain.com/tx/{}"
 
 @app.get("/api/status")
-def get_status():
-    address = get_address()
-    return {"status": "ok", "address": address}
+async def get_status():
+    return {"status": "ok", **get_chain_status()}
 
 @app.post("/api/chat")
-def chat_to_agent(request: ChatRequest):
+async def chat_to_agent(request: ChatRequest):
     """
     Simulate Agent behavior: Input Natural Language -> Output Structured Intent
     We use Qwen via DashScope SDK or Qwen-Agent if installed.
     Since we need struct output, we will prompt Qwen to return JSON.
+    Unambiguous transfers ("send 0.1 ZETA to 0x...") are answered by the
+    local rule-based parser and repeated prompts by the response cache;
+    only the rest reach the LLM, through the concurrency-limited client
+    that also merges identical in-flight prompts into one call.
     """
-    api_key = os.getenv("DASHSCOPE_API_KEY")
-    if not api_key:
-        raise HTTPException(status_code=500, detail="DASHSCOPE_API_KEY not found")
-    
-    # Simple prompt for the agent
-    # We want to extract: type, recipient, amount, token
-    system_prompt = """You are a blockchain agent. Your goal is to extract transaction details from user input.
-    Output ONLY valid JSON with keys: "type" (must be "transfer"), "recipient" (address), "amount" (number), "token" (e.g. "ZETA").
-    If information is missing, try to infer or set null.
-    Example output: {"type": "transfer", "recipient": "0x123", "amount": 0.1, "token": "ZETA"}
+    try:
+        data, _ = await resolve_intent(request.prompt)
+    except LLMBusyError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": str(int(llm_client.queue_timeout))})
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    return _public_intent(data)
+
+def _public_value(key: str, value):
+    # base_units can exceed 2**53, which a JavaScript client would round as a JSON number
+    return str(value) if key == "base_units" and isinstance(value, int) else value
+
+def _public_intent(intent: dict) -> dict:
+    """`intent` as sent to clients: base_units as a decimal string."""
+    return {key: _public_value(key, value) for key, value in intent.items()}
+
+async def resolve_intent(prompt: str, rule_intent: Optional[dict] = None):
     """
-    
-    # Using dashscope directly as it's the core of qwen-agent for simple generation
-    # Or using qwen_agent.llm if strictly following qwen-agent wrapper
-    # Let's use dashscope for simplicity as qwen-agent wraps it but often adds complexity for multi-agent.
-    # User asked for "qwen agent", let's try to use the library concepts if possible.
-    # But for a single turn extraction, simple generation is best.
-    
+    Intent for `prompt` and where it came from: "rule" (local parser),
+    "cache" or "llm". Pass `rule_intent` when the local parser already ran on
+    `prompt`. LLM errors propagate to the caller.
+    """
+    intent = rule_intent if rule_intent is not None else _rule_intent(prompt)
+    if intent["confidence"] >= FAST_PATH_MIN_CONFIDENCE:
+        CHAT_RESOLUTIONS.labels("rule").inc()
+        return intent, "rule"
+
+    key = cache_key(prompt, SYSTEM_PROMPT_VERSION, MODEL_NAME)
+    cached = await chat_cache.aget(key)
+    if cached is not None:
+        CHAT_RESOLUTIONS.labels("cache").inc()
+        return cached, "cache"
+
+    CHAT_RESOLUTIONS.labels("llm").inc()
+    content = await llm_client.complete(prompt, key=key)
+    data = parse_agent_output(content)
+    if "error" not in data:
+        await chat_cache.aput(key, data)
+    return data, "llm"
+
+def _rule_intent(prompt: str) -> dict:
+    with PARSE_LATENCY.labels("rule").time():
+        return parse_transfer_intent(prompt)
+
+CHAT_BATCH_MAX = int(os.getenv("CHAT_BATCH_MAX", "1000"))
+CHAT_BATCH_CONCURRENCY = int(os.getenv("CHAT_BATCH_CONCURRENCY", os.getenv("LLM_MAX_CONCURRENCY", "8")))
+
+async def _batch_item(index: int, prompt: str, semaphore: asyncio.Semaphore) -> dict:
+    intent = _rule_intent(prompt)
+    if intent["confidence"] >= FAST_PATH_MIN_CONFIDENCE:
+        # Resolved locally: no need to queue behind LLM-bound items
+        CHAT_RESOLUTIONS.labels("rule").inc()
+        return {"index": index, "status": "ok", "source": "rule", "intent": _public_intent(intent)}
     try:
-        response = dashscope.Generation.call(
-            model='qwen-turbo',
-            api_key=api_key,
-            messages=[
-                {'role': 'system', 'content': system_prompt},
-                {'role': 'user', 'content': request.prompt}
-            ],
-            result_format='message',  # set the result to be "message" format.
-        )
-        
-        if response.status_code == HTTPStatus.OK:
-            content = response.output.choices[0].message.content
-            # Clean up content to ensure it's JSON
-            content = content.strip()
-            if content.startswith("```json"):
-                content = content[7:-3]
-            elif content.startswith("```"):
-                content = content[3:-3]
-            
-            try:
-                data = json.loads(content)
-                return data
-            except json.JSONDecodeError:
-                 return {"error": "Failed to parse JSON from agent", "raw": content}
-        else:
-            raise HTTPException(status_code=500, detail=f"Request id: {response.request_id}, Status code: {response.status_code}, error code: {response.code}, error message: {response.message}")
+        async with semaphore:
+            data, source = await resolve_intent(prompt, rule_intent=intent)
+    except Exception as e:
+        return {"index": index, "status": "error", "error": str(e)}
+    if "error" in data:
+        return {"index": index, "status": "error", "source": source, "error": data["error"], "raw": data.get("raw")}
+    return {"index": index, "status": "ok", "source": source, "intent": _public_intent(data)}
+
+@app.post("/api/chat/batch")
+async def chat_batch(request: ChatBatchRequest):
+    """
+    Resolve many natural-language instructions at once. Prompts the local
+    parser understands are answered immediately; the rest fan out to the LLM
+    at most CHAT_BATCH_CONCURRENCY at a time. Results come back in input order
+    with a status per item, or with `stream: true` as NDJSON lines (carrying
+    their `index`) in completion order.
+    """
+    if len(request.prompts) > CHAT_BATCH_MAX:
+        raise HTTPException(status_code=413, detail=f"At most {CHAT_BATCH_MAX} prompts per batch")
+    semaphore = asyncio.Semaphore(CHAT_BATCH_CONCURRENCY)
+    tasks = [asyncio.ensure_future(_batch_item(i, prompt, semaphore)) for i, prompt in enumerate(request.prompts)]
 
+    if not request.stream:
+        return {"results": await asyncio.gather(*tasks)}
+
+    async def lines():
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield json.dumps(await next_done, ensure_ascii=False) + "\n"
+        finally:
+            # Client went away: stop the remaining LLM work
+            for task in tasks:
+                task.cancel()
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+def _sse(event: str, data) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+async def _chat_events(prompt: str):
+    """
+    Server-Sent Events for /api/chat/stream:
+    `token` (raw model text), `field` (each intent field once complete),
+    `done` (the full intent) or `error`.
+    """
+    intent = _rule_intent(prompt)
+    source = "rule"
+    if intent["confidence"] < FAST_PATH_MIN_CONFIDENCE:
+        key = cache_key(prompt, SYSTEM_PROMPT_VERSION, MODEL_NAME)
+        intent = await chat_cache.aget(key)
+        source = "cache" if intent is not None else "llm"
+    CHAT_RESOLUTIONS.labels(source).inc()
+    if intent is not None:
+        intent = _public_intent(intent)
+        for field, value in intent.items():
+            yield _sse("field", {"key": field, "value": value})
+        yield _sse("done", intent)
+        return
+
+    parser = IncrementalJSONParser()
+    chunks = []
+    try:
+        async for delta in llm_client.stream(prompt, key=key):
+            chunks.append(delta)
+            yield _sse("token", {"text": delta})
+            for field, value in parser.feed(delta):
+                yield _sse("field", {"key": field, "value": _public_value(field, value)})
+    except Exception as e:
+        yield _sse("error", {"detail": str(e)})
+        return
+
+    data = parse_agent_output("".join(chunks))
+    if "error" not in data:
+        await chat_cache.aput(key, data)
+    yield _sse("done", _public_intent(data))
+
+@app.post("/api/chat/stream")
+async def chat_stream(request: ChatRequest):
+    """Streaming variant of /api/chat: intent fields arrive as SSE events while the model is still writing."""
+    return StreamingResponse(
+        _chat_events(request.prompt),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@app.post("/api/chat/prepare")
+async def chat_and_prepare(request: PrepareRequest):
+    """
+    /api/chat plus the RPC work of /api/execute, done while the user reads the
+    plan: for a complete ZETA transfer the gas limit, fee fields and chain id
+    are fetched and the nonce manager synced. The returned confirmation token
+    lets /api/execute/confirm go straight to sign-and-send. The nonce itself is
+    only taken at confirmation, so an abandoned plan never leaves a gap.
+    """
+    if request.urgency not in URGENCY_PERCENTILES:
+        raise HTTPException(status_code=400, detail=f"urgency must be one of {list(URGENCY_PERCENTILES)}")
+    try:
+        intent, _ = await resolve_intent(request.prompt)
+    except LLMBusyError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": str(int(llm_client.queue_timeout))})
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+    if "error" in intent:
+        return intent
+
+    result = {**_public_intent(intent), "confirmation": None}
+    if not (intent.get("recipient") and intent.get("base_units") and (intent.get("token") or "").upper() == "ZETA"):
+        result["prepare_error"] = "Intent is not a complete ZETA transfer"
+        return result
+    try:
+        tx = await run_in_threadpool(prepare_transfer, intent["recipient"], intent["base_units"], request.urgency)
+    except Exception as e:
+        result["prepare_error"] = str(e)
+        return result
+
+    prepared = prepared_transfers.put(intent, tx)
+    result["confirmation"] = {
+        "token": prepared.token,
+        "expires_in": prepared_transfers.ttl,
+        "urgency": request.urgency,
+        "gas": tx["gas"],
+        "max_fee_wei": str(tx["gas"] * tx.get("maxFeePerGas", tx.get("gasPrice", 0))),
+    }
+    return result
+
+@app.post("/api/execute/confirm")
+async def execute_confirmed(request: ConfirmRequest):
+    """
+    Send a transfer prepared by /api/chat/prepare. The confirmation token is
+    also the idempotency key: confirming twice returns the same tx hash.
+    """
+    prepared = prepared_transfers.get(request.confirmation_token)
+    if prepared is None:
+        raise HTTPException(status_code=410, detail="Confirmation expired or unknown, prepare the transfer again")
+    try:
+        future = submission_queue.enqueue(prepared, prepared.token, fingerprint=prepared.token)
+    except QueueFullError as e:
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": str(e.retry_after)})
+
+    return await _submission_result(future)
+
+@app.get("/metrics")
+def get_metrics():
+    """Stage latency histograms and error / cache counters in Prometheus text format."""
+    body, content_type = render_metrics()
+    return Response(content=body, media_type=content_type)
+
+@app.get("/api/llm/usage")
+async def get_llm_usage():
+    """LLM token totals per endpoint since startup."""
+    return {"prompt_version": SYSTEM_PROMPT_VERSION, "endpoints": usage_totals.stats()}
+
+@app.get("/api/chat/cache")
+async def get_chat_cache_stats():
+    return {**chat_cache.stats(), "llm": llm_client.stats()}
 
 @app.post("/api/execute")
-def execute_transaction(request: ExecuteRequest):
+async def execute_transaction(request: ExecuteRequest, idempotency_key: Optional[str] = Header(None)):
+    """
+    Queue a ZETA transfer. Retries carrying the same Idempotency-Key header
+    return the original tx hash instead of sending twice; a full queue
+    answers 429 with Retry-After.
+    """
     if request.token.upper() != "ZETA":
          raise HTTPException(status_code=400, detail="Only ZETA token supported")
+    if request.urgency not in URGENCY_PERCENTILES:
+         raise HTTPException(status_code=400, detail=f"urgency must be one of {list(URGENCY_PERCENTILES)}")
     
     try:
-        tx_hash = send_zeta(request.recipient, request.amount)
-        return {"status": "success", "tx_hash": tx_hash, "explorer_url": f"https://athens3.explorer.zetachain.com/tx/{tx_hash}"}
+        future = submission_queue.enqueue(request, idempotency_key, fingerprint=request.model_dump_json())
+    except QueueFullError as e:
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": str(e.retry_after)})
+    except IdempotencyConflictError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+    return await _submission_result(future)
+
+async def _submission_result(future: asyncio.Future) -> dict:
+    try:
+        # Shielded: a client disconnect must not cancel a transfer other retries are waiting on
+        tx_hash = await asyncio.shield(future)
+        return {"status": "success", "tx_hash": tx_hash, "explorer_url": EXPLORER_TX_URL.format(tx_hash)}
+    except BroadcastUnknownError as e:
+        # The transfer may still land: hand out its hash to poll instead of inviting a resend
+        raise HTTPException(status_code=504, detail={"message": str(e), "tx_hash": e.tx_hash})
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+EXECUTE_BATCH_MAX = int(os.getenv("EXECUTE_BATCH_MAX", "1000"))
+
+@app.post("/api/execute/batch")
+async def execute_batch(requests: List[dict], idempotency_key: Optional[str] = Header(None)):
+    """
+    Send many ZETA transfers at once: consecutive nonces, batched JSON-RPC.
+    Each item reports its own tx hash or error (an invalid amount included),
+    in request order. The batch goes through the submission queue as one job,
+    so Idempotency-Key and the 429 backpressure work as for /api/execute.
+    """
+    if len(requests) > EXECUTE_BATCH_MAX:
+        raise HTTPException(status_code=422, detail=f"At most {EXECUTE_BATCH_MAX} transfers per batch")
+    results = [None] * len(requests)
+    transfers = []
+    indexes = []
+    for i, body in enumerate(requests):
+        try:
+            item = ExecuteRequest.model_validate(body)
+        except ValidationError as e:
+            results[i] = {"status": "error", "error": "; ".join(error["msg"] for error in e.errors())}
+            continue
+        if item.token.upper() != "ZETA":
+            results[i] = {"status": "error", "error": "Only ZETA token supported"}
+            continue
+        if item.urgency not in URGENCY_PERCENTILES:
+            results[i] = {"status": "error", "error": f"urgency must be one of {list(URGENCY_PERCENTILES)}"}
+            continue
+        transfers.append((item.recipient, item.base_units, item.urgency))
+        indexes.append(i)
+
+    if transfers:
+        try:
+            future = submission_queue.enqueue(transfers, idempotency_key, fingerprint=json.dumps(transfers))
+        except QueueFullError as e:
+            raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": str(e.retry_after)})
+        except IdempotencyConflictError as e:
+            raise HTTPException(status_code=422, detail=str(e))
+        try:
+            sent = await asyncio.shield(future)
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
+    else:
+        sent = []
+
+    for i, outcome in zip(indexes, sent):
+        if outcome.get("unknown"):
+            results[i] = {"status": "unknown", "error": outcome["error"], "tx_hash": outcome["tx_hash"]}
+        elif "error" in outcome:
+            results[i] = {"status": "error", "error": outcome["error"]}
+        else:
+            tx_hash = outcome["tx_hash"]
+            results[i] = {"status": "success", "tx_hash": tx_hash, "explorer_url": EXPLORER_TX_URL.format(tx_hash)}
+    return {"status": "success", "results": results}
+
+TX_HASH_PATTERN = re.compile(r"^0x[0-9a-fA-F]{64}$")
+
+@app.get("/api/tx/{tx_hash}")
+async def get_tx_status(tx_hash: str):
+    """
+    Outcome of a transaction this backend submitted, served from the shared
+    receipt tracker. Hashes it did not submit (or has forgotten) are "unknown".
+    """
+    if not TX_HASH_PATTERN.match(tx_hash):
+        raise HTTPException(status_code=400, detail="Invalid transaction hash")
+    return receipt_tracker.status(tx_hash)
+
+@app.post("/api/tx/status")
+async def get_tx_statuses(request: TxStatusRequest):
+    invalid = [tx_hash for tx_hash in request.hashes if not TX_HASH_PATTERN.match(tx_hash)]
+    if invalid:
+        raise HTTPException(status_code=400, detail=f"Invalid transaction hashes: {invalid}")
+    return {"results": receipt_tracker.statuses(request.hashes)}
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
@@ -0,0 +1,82 @@
+from prometheus_client import CONTENT_TYPE_LATEST, Counter, Histogram, generate_latest
+
+# Buckets from sub-millisecond (local parsing, signing) up to slow LLM calls
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+HTTP_LATENCY = Histogram(
+    "zeta_http_request_seconds",
+    "Time spent in an HTTP handler, until response headers are sent.",
+    ["method", "route", "status"],
+    buckets=LATENCY_BUCKETS,
+)
+
+RPC_LATENCY = Histogram(
+    "zeta_rpc_request_seconds",
+    "JSON-RPC round trip through the endpoint pool, including hedging and failover.",
+    ["method"],
+    buckets=LATENCY_BUCKETS,
+)
+RPC_ERRORS = Counter(
+    "zeta_rpc_errors_total",
+    "JSON-RPC requests that raised or returned an error object.",
+    ["method"],
+)
+
+SEND_STAGE_LATENCY = Histogram(
+    "zeta_send_stage_seconds",
+    "Time per stage of sending a transfer: nonce, gas, fees, sign, broadcast.",
+    ["stage"],
+    buckets=LATENCY_BUCKETS,
+)
+
+LLM_LATENCY = Histogram(
+    "zeta_llm_call_seconds",
+    "Upstream LLM call, from request to the last completion token.",
+    ["mode"],
+    buckets=LATENCY_BUCKETS,
+)
+LLM_ERRORS = Counter(
+    "zeta_llm_errors_total",
+    "LLM calls that failed.",
+    ["mode"],
+)
+
+LLM_TIME_TO_FIRST_TOKEN = Histogram(
+    "zeta_llm_time_to_first_token_seconds",
+    "Streaming LLM calls: time until the first completion text arrives.",
+    ["prompt_version"],
+    buckets=LATENCY_BUCKETS,
+)
+LLM_TOKENS = Counter(
+    "zeta_llm_tokens_total",
+    "Tokens billed by the LLM, by the HTTP endpoint that triggered the call.",
+    ["endpoint", "kind"],
+)
+LLM_REQUEST_TOKENS = Histogram(
+    "zeta_llm_request_tokens",
+    "Tokens per LLM call.",
+    ["kind"],
+    buckets=(16, 32, 64, 128, 256, 512, 1024, 2048, 4096),
+)
+
+PARSE_LATENCY = Histogram(
+    "zeta_intent_parse_seconds",
+    "Turning text into an intent: the local rule parser or LLM output validation.",
+    ["parser"],
+    buckets=LATENCY_BUCKETS,
+)
+PARSE_ERRORS = Counter(
+    "zeta_intent_parse_errors_total",
+    "LLM completions that could not be turned into an intent.",
+)
+
+CHAT_RESOLUTIONS = Counter(
+    "zeta_chat_resolutions_total",
+    "Chat prompts by where the answer came from: rule, cache or llm.",
+    ["source"],
+)
+
+
+def render():
+    """Current metrics in the Prometheus text exposition format, with its content type."""
+    return generate_latest(), CONTENT_TYPE_LATEST
@@ -0,0 +1,267 @@
+"""
+Local stand-in for the LLM, for load-testing /api/chat without DashScope quota.
+
+Speaks the OpenAI-compatible /chat/completions API (plain and streaming), so
+the backend uses it with LLM_BACKEND=openai and LLM_BASE_URL=<url>/v1. Each
+request is answered with a recorded completion after a delay drawn from a
+latency distribution:
+
+    fixed:0.4             always 400 ms
+    uniform:0.2,1.5       anywhere between 200 ms and 1.5 s
+    lognormal:0.5,0.6     median 500 ms, sigma 0.6 (long right tail, like real LLMs)
+    recorded              the latency measured when the completion was recorded
+
+Responses carry an approximate token `usage`; with --prefill-ms-per-1k-tokens
+the first token is also delayed in proportion to the prompt length, so prompt
+compaction shows up in time-to-first-token.
+
+Recordings are JSONL lines {"prompt", "completion", "latency_s"}. Prompts
+that were not recorded get a recording picked by hash, so load tests with
+unique prompts still receive realistic answers. Record real completions with
+
+    python mock_llm.py record prompts.txt -o recordings.jsonl
+
+and serve them with
+
+    python mock_llm.py serve --port 8600 --recordings recordings.jsonl --latency lognormal:0.5,0.6
+"""
+import argparse
+import hashlib
+import json
+import math
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from chat_cache import normalize_prompt
+
+# Used when no recordings file is given; prompts the local rule parser cannot answer
+DEFAULT_RECORDINGS = [
+    {"prompt": "pay bob 5 zeta", "latency_s": 0.62,
+     "completion": '{"type": "transfer", "recipient": null, "amount": 5, "token": "ZETA"}'},
+    {"prompt": "帮我给 0x2c7536E3605D9C16a7a3D7b1898e529396a65c23 转一点 ZETA", "latency_s": 0.81,
+     "completion": '{"type": "transfer", "recipient": "0x2c7536E3605D9C16a7a3D7b1898e529396a65c23", "amount": null, "token": "ZETA"}'},
+    {"prompt": "move a tenth of a zeta over to 0x000000000000000000000000000000000000dEaD please", "latency_s": 0.74,
+     "completion": '{"type": "transfer", "recipient": "0x000000000000000000000000000000000000dEaD", "amount": 0.1, "token": "ZETA"}'},
+    {"prompt": "I want to tip 0x2c7536E3605D9C16a7a3D7b1898e529396a65c23 two ZETA for the help", "latency_s": 0.93,
+     "completion": '```json\n{"type": "transfer", "recipient": "0x2c7536E3605D9C16a7a3D7b1898e529396a65c23", "amount": 2, "token": "ZETA"}\n```'},
+    {"prompt": "给0x000000000000000000000000000000000000dEaD打0.5个zeta", "latency_s": 0.55,
+     "completion": '{"type": "transfer", "recipient": "0x000000000000000000000000000000000000dEaD", "amount": 0.5, "token": "ZETA"}'},
+]
+
+
+CJK_PATTERN = re.compile(r"[\u3000-\u9fff\uff00-\uffef]")
+
+
+def approx_tokens(text: str) -> int:
+    """Rough BPE token count: one per CJK character, one per ~4 other characters."""
+    cjk = len(CJK_PATTERN.findall(text))
+    return cjk + math.ceil((len(text) - cjk) / 4)
+
+
+def parse_latency(spec: str):
+    """A function (recording) -> seconds for a distribution spec such as "lognormal:0.5,0.6"."""
+    name, _, args = spec.partition(":")
+    values = [float(value) for value in args.split(",") if value]
+    if name == "fixed":
+        return lambda recording: values[0]
+    if name == "uniform":
+        low, high = values
+        return lambda recording: random.uniform(low, high)
+    if name == "lognormal":
+        median, sigma = values
+        return lambda recording: random.lognormvariate(math.log(median), sigma)
+    if name == "recorded":
+        return lambda recording: recording.get("latency_s", 0.0)
+    raise ValueError(f"Unknown latency distribution: {spec}")
+
+
+def load_recordings(path: str) -> list:
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+class MockLLMServer:
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, recordings: list = None,
+                 latency: str = "fixed:0.5", error_rate: float = 0.0, chunk_interval: float = 0.01,
+                 prefill_per_token: float = 0.0):
+        self.recordings = recordings or DEFAULT_RECORDINGS
+        self.latency = latency
+        self.error_rate = error_rate
+        # Gap between streamed chunks; the first chunk arrives after the sampled latency
+        self.chunk_interval = chunk_interval
+        # Extra delay per prompt token before the first token
+        self.prefill_per_token = prefill_per_token
+        self.requests = 0
+        self.errors = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._sample = parse_latency(latency)
+        self._by_prompt = {normalize_prompt(item["prompt"]): item for item in self.recordings}
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, name="mock-llm", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def recording_for(self, prompt: str) -> dict:
+        recording = self._by_prompt.get(normalize_prompt(prompt))
+        if recording is None:
+            digest = hashlib.sha256(prompt.encode("utf-8")).digest()
+            recording = self.recordings[int.from_bytes(digest[:4], "big") % len(self.recordings)]
+        return recording
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "errors": self.errors,
+                "in_flight": self.in_flight,
+                "max_in_flight": self.max_in_flight,
+            }
+
+    def _handler(self):
+        mock = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+                if not self.path.rstrip("/").endswith("/chat/completions"):
+                    self._send(404, {"error": {"message": f"Unknown path {self.path}"}})
+                    return
+                with mock._lock:
+                    mock.requests += 1
+                    mock.in_flight += 1
+                    mock.max_in_flight = max(mock.max_in_flight, mock.in_flight)
+                try:
+                    self._complete(body)
+                finally:
+                    with mock._lock:
+                        mock.in_flight -= 1
+
+            def _complete(self, body: dict):
+                prompt = next(
+                    (message["content"] for message in reversed(body.get("messages", [])) if message.get("role") == "user"),
+                    "",
+                )
+                recording = mock.recording_for(prompt)
+                prompt_tokens = sum(approx_tokens(message.get("content", "")) + 4 for message in body.get("messages", []))
+                time.sleep(max(0.0, mock._sample(recording)) + prompt_tokens * mock.prefill_per_token)
+                if mock.error_rate and random.random() < mock.error_rate:
+                    with mock._lock:
+                        mock.errors += 1
+                    self._send(503, {"error": {"message": "mock overload", "type": "server_error"}})
+                    return
+
+                model = body.get("model", "mock")
+                completion = recording["completion"]
+                completion_tokens = approx_tokens(completion)
+                usage = {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                         "total_tokens": prompt_tokens + completion_tokens}
+                if not body.get("stream"):
+                    self._send(200, {
+                        "id": "mock-" + hashlib.sha1(prompt.encode("utf-8")).hexdigest()[:12],
+                        "object": "chat.completion",
+                        "model": model,
+                        "choices": [{"index": 0, "finish_reason": "stop",
+                                     "message": {"role": "assistant", "content": completion}}],
+                        "usage": usage,
+                    })
+                    return
+
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Connection", "close")
+                self.end_headers()
+                # Roughly token-sized pieces
+                for start in range(0, len(completion), 4):
+                    chunk = {"object": "chat.completion.chunk", "model": model,
+                             "choices": [{"index": 0, "delta": {"content": completion[start:start + 4]}}]}
+                    self.wfile.write(f"data: {json.dumps(chunk, ensure_ascii=False)}\n\n".encode("utf-8"))
+                    self.wfile.flush()
+                    if mock.chunk_interval:
+                        time.sleep(mock.chunk_interval)
+                if (body.get("stream_options") or {}).get("include_usage"):
+                    chunk = {"object": "chat.completion.chunk", "model": model, "choices": [], "usage": usage}
+                    self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+                self.wfile.write(b"data: [DONE]\n\n")
+                self.close_connection = True
+
+            def _send(self, status: int, payload: dict):
+                data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+
+def record(prompts_path: str, output_path: str):
+    """Send each prompt (one per line) to the configured LLM backend and save the completions."""
+    from agent import call_llm
+
+    with open(prompts_path, encoding="utf-8") as prompts, open(output_path, "a", encoding="utf-8") as out:
+        for prompt in (line.strip() for line in prompts):
+            if not prompt:
+                continue
+            started = time.perf_counter()
+            completion = call_llm(prompt)
+            latency = round(time.perf_counter() - started, 3)
+            out.write(json.dumps({"prompt": prompt, "completion": completion, "latency_s": latency}, ensure_ascii=False) + "\n")
+            print(f"{latency:6.2f}s  {prompt}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="OpenAI-compatible mock LLM that replays recorded completions")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    serve = commands.add_parser("serve", help="serve recorded completions")
+    serve.add_argument("--host", default="127.0.0.1")
+    serve.add_argument("--port", type=int, default=8600)
+    serve.add_argument("--recordings", help="JSONL file written by the record command")
+    serve.add_argument("--latency", default="lognormal:0.5,0.6", help="fixed:S | uniform:LO,HI | lognormal:MEDIAN,SIGMA | recorded")
+    serve.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests answered with HTTP 503")
+    serve.add_argument("--chunk-interval", type=float, default=0.01, help="seconds between streamed chunks")
+    serve.add_argument("--prefill-ms-per-1k-tokens", type=float, default=0.0, help="first-token delay per 1000 prompt tokens")
+
+    rec = commands.add_parser("record", help="record completions from the real LLM backend")
+    rec.add_argument("prompts", help="text file with one prompt per line")
+    rec.add_argument("-o", "--output", default="recordings.jsonl")
+
+    args = parser.parse_args()
+    if args.command == "record":
+        record(args.prompts, args.output)
+    else:
+        mock = MockLLMServer(
+            args.host, args.port,
+            recordings=load_recordings(args.recordings) if args.recordings else None,
+            latency=args.latency, error_rate=args.error_rate, chunk_interval=args.chunk_interval,
+            prefill_per_token=args.prefill_ms_per_1k_tokens / 1e6,
+        )
+        print(f"Mock LLM listening on {mock.url}/v1 ({args.latency}, {len(mock.recordings)} recordings)")
+        try:
+            mock._server.serve_forever()
+        except KeyboardInterrupt:
+            pass
@@ -0,0 +1,108 @@
+import threading
+
+# Substrings of node errors that mean our local view of the nonce is stale
+NONCE_TOO_LOW_ERRORS = ("nonce too low", "invalid nonce")
+NONCE_GAP_ERRORS = ("nonce too high", "nonce gap")
+# The node already has this exact signed transaction: it was sent, not rejected
+ALREADY_KNOWN_ERRORS = ("already known", "known transaction", "already imported")
+
+
+def is_nonce_too_low(error) -> bool:
+    message = str(error).lower()
+    return any(marker in message for marker in NONCE_TOO_LOW_ERRORS)
+
+
+def is_nonce_gap(error) -> bool:
+    message = str(error).lower()
+    return any(marker in message for marker in NONCE_GAP_ERRORS)
+
+
+def is_already_known(error) -> bool:
+    message = str(error).lower()
+    return any(marker in message for marker in ALREADY_KNOWN_ERRORS)
+
+
+class NonceManager:
+    """
+    Hands out nonces for a single sender from memory.
+
+    The chain is only asked for the pending transaction count on first use,
+    after `resync()` (nonce too low / gap) and never on the happy path, so
+    concurrent transfers get distinct, consecutive nonces without an RPC each.
+    Nonces of transactions that never reached the node are given back with
+    `release()` and handed out again before new ones. When a broadcast fails
+    without telling whether the node got the transaction (timeout, reset),
+    the nonce must not be released: call `resync()` instead.
+    """
+
+    def __init__(self, w3, address: str):
+        self.w3 = w3
+        self.address = address
+        self._lock = threading.Lock()
+        self._next_nonce = None
+        self._released = set()
+
+    def _fetch_chain_nonce(self) -> int:
+        return self.w3.eth.get_transaction_count(self.address, "pending")
+
+    def resync(self):
+        """Drop local state and reload the pending nonce from the chain."""
+        nonce = self._fetch_chain_nonce()
+        with self._lock:
+            self._next_nonce = nonce
+            self._released = set()
+
+    def invalidate(self):
+        """Forget local state; the next allocate() reloads the pending nonce."""
+        with self._lock:
+            self._next_nonce = None
+            self._released = set()
+
+    @property
+    def needs_sync(self) -> bool:
+        return self._next_nonce is None
+
+    def allocate(self) -> int:
+        with self._lock:
+            if self._next_nonce is None:
+                self._next_nonce = self._fetch_chain_nonce()
+            if self._released:
+                nonce = min(self._released)
+                self._released.discard(nonce)
+                return nonce
+            nonce = self._next_nonce
+            self._next_nonce += 1
+            return nonce
+
+    def allocate_many(self, count: int) -> list:
+        """
+        Reserve `count` nonces in ascending order, e.g. for a batch of transfers.
+
+        Released nonces are handed out first, like allocate() does, so a batch
+        fills the holes left by earlier failures instead of queueing behind them.
+        """
+        with self._lock:
+            if self._next_nonce is None:
+                self._next_nonce = self._fetch_chain_nonce()
+            reused = sorted(self._released)[:count]
+            self._released.difference_update(reused)
+            start = self._next_nonce
+            self._next_nonce += count - len(reused)
+            return reused + list(range(start, self._next_nonce))
+
+    def release(self, nonce: int):
+        """Give back a nonce whose transaction was never broadcast."""
+        with self._lock:
+            if self._next_nonce is None or nonce >= self._next_nonce:
+                return
+            self._released.add(nonce)
+            # Fold released nonces at the tip back so no hole is left behind
+            while self._next_nonce - 1 in self._released:
+                self._next_nonce -= 1
+                self._released.discard(self._next_nonce)
+
+    @property
+    def pending_gaps(self) -> int:
+        """Number of released nonces waiting to be reused (holes in the sequence)."""
+        with self._lock:
+            return len(self._released)
@@ -0,0 +1,59 @@
+import secrets
+import threading
+import time
+from collections import OrderedDict
+
+
+class PreparedTransfer:
+    """A transfer whose lookups are done; only a nonce, a signature and the broadcast are left."""
+
+    __slots__ = ("token", "intent", "tx", "expires_at")
+
+    def __init__(self, token: str, intent: dict, tx: dict, expires_at: float):
+        self.token = token
+        self.intent = intent
+        self.tx = tx
+        self.expires_at = expires_at
+
+
+class PreparedTransferStore:
+    """
+    Prepared transfers waiting for the user to confirm, by confirmation token.
+
+    Entries expire after `ttl` seconds, which also bounds how stale the
+    prefetched fee fields can get; at most `max_entries` are kept, oldest
+    dropped first.
+    """
+
+    def __init__(self, ttl: float = 60.0, max_entries: int = 10000):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+
+    def put(self, intent: dict, tx: dict) -> PreparedTransfer:
+        token = secrets.token_urlsafe(24)
+        prepared = PreparedTransfer(token, intent, tx, time.monotonic() + self.ttl)
+        with self._lock:
+            self._expire()
+            self._entries[token] = prepared
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return prepared
+
+    def get(self, token: str):
+        with self._lock:
+            self._expire()
+            return self._entries.get(token)
+
+    def _expire(self):
+        now = time.monotonic()
+        while self._entries:
+            token, prepared = next(iter(self._entries.items()))
+            if prepared.expires_at >= now:
+                break
+            del self._entries[token]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
@@ -0,0 +1,101 @@
+"""
+Token and time-to-first-token comparison between system prompt versions.
+
+Streams every prompt through agent.stream_llm once per prompt version and
+reports average input/output tokens, TTFT and total latency percentiles, parse
+success and the savings of each version relative to the first one:
+
+    python prompt_report.py --versions v2,v3                 # against mock_llm.py
+    python prompt_report.py --live --prompts prompts.txt     # the configured LLM backend
+
+By default the mock delays the first token by --prefill-ms-per-1k-tokens, so
+TTFT follows prompt length the way a real model's prefill does.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+from bench_transfers import percentile
+from mock_llm import DEFAULT_RECORDINGS, MockLLMServer
+
+
+def measure(prompts: list, version: str) -> dict:
+    from agent import parse_agent_output, stream_llm
+    from token_usage import new_request_usage
+
+    ttfts, totals, inputs, outputs = [], [], [], []
+    parsed = 0
+    for prompt in prompts:
+        usage = new_request_usage()
+        started = time.perf_counter()
+        first = None
+        chunks = []
+        for delta in stream_llm(prompt, prompt_version=version):
+            if first is None:
+                first = time.perf_counter() - started
+            chunks.append(delta)
+        totals.append(time.perf_counter() - started)
+        ttfts.append(first if first is not None else totals[-1])
+        inputs.append(usage["input_tokens"])
+        outputs.append(usage["output_tokens"])
+        parsed += "error" not in parse_agent_output("".join(chunks))
+
+    return {
+        "version": version,
+        "prompts": len(prompts),
+        "avg_input_tokens": round(sum(inputs) / len(inputs), 1),
+        "avg_output_tokens": round(sum(outputs) / len(outputs), 1),
+        "ttft_p50_ms": round(percentile(ttfts, 0.50) * 1000, 1),
+        "ttft_p95_ms": round(percentile(ttfts, 0.95) * 1000, 1),
+        "total_p50_ms": round(percentile(totals, 0.50) * 1000, 1),
+        "parse_success": round(parsed / len(prompts), 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare token usage and TTFT across system prompt versions")
+    parser.add_argument("--versions", default="v2,v3", help="comma-separated prompt versions; the first is the baseline")
+    parser.add_argument("--prompts", help="text file with one prompt per line (default: the mock's recorded prompts)")
+    parser.add_argument("--live", action="store_true", help="use the LLM backend configured in the environment")
+    parser.add_argument("--latency", default="fixed:0.2", help="mock LLM latency distribution")
+    parser.add_argument("--prefill-ms-per-1k-tokens", type=float, default=100.0, help="mock first-token delay per 1000 prompt tokens")
+    parser.add_argument("--json", help="also write the report to this file")
+    args = parser.parse_args()
+
+    if args.prompts:
+        with open(args.prompts, encoding="utf-8") as f:
+            prompts = [line.strip() for line in f if line.strip()]
+    else:
+        prompts = [item["prompt"] for item in DEFAULT_RECORDINGS]
+
+    mock = None
+    if not args.live:
+        mock = MockLLMServer(latency=args.latency, prefill_per_token=args.prefill_ms_per_1k_tokens / 1e6).start()
+        # agent.py reads its configuration at import time
+        os.environ.update({"LLM_BACKEND": "openai", "LLM_BASE_URL": mock.url + "/v1"})
+
+    report = [measure(prompts, version) for version in args.versions.split(",")]
+    if mock is not None:
+        mock.stop()
+
+    baseline = report[0]
+    for row in report[1:]:
+        row["input_token_savings"] = round(1 - row["avg_input_tokens"] / baseline["avg_input_tokens"], 3)
+        row["ttft_p50_savings"] = round(1 - row["ttft_p50_ms"] / baseline["ttft_p50_ms"], 3)
+
+    for row in report:
+        print(
+            f"{row['version']:<4} in {row['avg_input_tokens']:>7} tok  out {row['avg_output_tokens']:>6} tok  "
+            f"TTFT p50 {row['ttft_p50_ms']:>8} ms  p95 {row['ttft_p95_ms']:>8} ms  parsed {row['parse_success']:.0%}",
+            file=sys.stderr,
+        )
+    print(json.dumps(report, indent=2))
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
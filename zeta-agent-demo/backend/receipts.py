@@ -0,0 +1,103 @@
+import threading
+import time
+from collections import OrderedDict
+
+# Keep each eth_getTransactionReceipt batch below common node limits
+RECEIPT_BATCH_SIZE = 500
+
+
+def summarize_receipt(tx_hash: str, receipt: dict) -> dict:
+    """Reduce a raw JSON-RPC receipt to what the frontend shows."""
+    return {
+        "tx_hash": tx_hash,
+        "status": "success" if int(receipt["status"], 16) == 1 else "failed",
+        "block_number": int(receipt["blockNumber"], 16),
+        "gas_used": int(receipt["gasUsed"], 16),
+        "effective_gas_price": int(receipt["effectiveGasPrice"], 16) if receipt.get("effectiveGasPrice") else None,
+    }
+
+
+class ReceiptTracker:
+    """
+    Tracks submitted transactions until they are mined.
+
+    Pending hashes are checked together, once per new block (`on_new_block`
+    is subscribed to the BlockWatcher), with batched `eth_getTransactionReceipt`
+    requests, so thousands of in-flight transfers cost a few RPCs per block.
+    Final receipts are kept in an LRU cache and served from memory.
+    Hashes still unmined after `pending_timeout` seconds are reported as dropped.
+    Only hashes passed to `track()` (transactions this process broadcast) are
+    polled; asking about any other hash answers "unknown", so clients cannot
+    grow the pending set.
+    """
+
+    def __init__(self, w3, max_receipts: int = 10000, pending_timeout: float = 600.0):
+        self.w3 = w3
+        self.max_receipts = max_receipts
+        self.pending_timeout = pending_timeout
+        self._lock = threading.Lock()
+        self._pending = {}
+        self._receipts = OrderedDict()
+        self._dropped = OrderedDict()
+
+    def track(self, tx_hash: str):
+        tx_hash = tx_hash.lower()
+        with self._lock:
+            if tx_hash not in self._receipts and tx_hash not in self._pending:
+                self._pending[tx_hash] = time.monotonic()
+                self._dropped.pop(tx_hash, None)
+
+    def status(self, tx_hash: str) -> dict:
+        """Current status of `tx_hash`: a receipt summary, "pending", "dropped" or "unknown"."""
+        tx_hash = tx_hash.lower()
+        with self._lock:
+            receipt = self._receipts.get(tx_hash)
+            if receipt is not None:
+                self._receipts.move_to_end(tx_hash)
+                return receipt
+            if tx_hash in self._pending:
+                return {"tx_hash": tx_hash, "status": "pending"}
+            if tx_hash in self._dropped:
+                return {"tx_hash": tx_hash, "status": "dropped"}
+        return {"tx_hash": tx_hash, "status": "unknown"}
+
+    def statuses(self, tx_hashes: list) -> list:
+        return [self.status(tx_hash) for tx_hash in tx_hashes]
+
+    @property
+    def pending_count(self) -> int:
+        with self._lock:
+            return len(self._pending)
+
+    def on_new_block(self, block_number: int):
+        with self._lock:
+            hashes = list(self._pending)
+        for start in range(0, len(hashes), RECEIPT_BATCH_SIZE):
+            chunk = hashes[start:start + RECEIPT_BATCH_SIZE]
+            responses = self.w3.provider.make_batch_request([
+                ("eth_getTransactionReceipt", [tx_hash]) for tx_hash in chunk
+            ])
+            if not isinstance(responses, list):
+                continue
+            for tx_hash, response in zip(chunk, responses):
+                receipt = response.get("result")
+                if receipt:
+                    self._finalize(tx_hash, summarize_receipt(tx_hash, receipt))
+        self._expire()
+
+    def _finalize(self, tx_hash: str, receipt: dict):
+        with self._lock:
+            self._pending.pop(tx_hash, None)
+            self._receipts[tx_hash] = receipt
+            while len(self._receipts) > self.max_receipts:
+                self._receipts.popitem(last=False)
+
+    def _expire(self):
+        deadline = time.monotonic() - self.pending_timeout
+        with self._lock:
+            for tx_hash, seen_at in list(self._pending.items()):
+                if seen_at < deadline:
+                    del self._pending[tx_hash]
+                    self._dropped[tx_hash] = True
+            while len(self._dropped) > self.max_receipts:
+                self._dropped.popitem(last=False)
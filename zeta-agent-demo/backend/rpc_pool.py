@@ -0,0 +1,352 @@
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import aiohttp
+import requests
+from urllib3.exceptions import NewConnectionError
+from web3 import AsyncHTTPProvider, Web3
+from web3.providers import JSONBaseProvider
+from web3.providers.async_base import AsyncJSONBaseProvider
+
+from metrics import RPC_ERRORS, RPC_LATENCY
+
+logger = logging.getLogger(__name__)
+
+# Reads that are safe to send to two nodes at once
+HEDGED_METHODS = {
+    "eth_blockNumber",
+    "eth_call",
+    "eth_chainId",
+    "eth_estimateGas",
+    "eth_feeHistory",
+    "eth_gasPrice",
+    "eth_getBalance",
+    "eth_getBlockByNumber",
+    "eth_getTransactionCount",
+    "eth_getTransactionReceipt",
+}
+# Writes a node may have applied even if its answer never arrived; these only
+# fail over when the request surely did not reach the node
+SEND_METHODS = {"eth_sendRawTransaction", "eth_sendTransaction"}
+# Nodes cap the length of a JSON-RPC batch (often at 1000); larger batches are sent in slices
+RPC_BATCH_SIZE = 500
+
+
+def batch_slices(items: list, size: int = RPC_BATCH_SIZE):
+    """Consecutive (start, slice) pairs of at most `size` items."""
+    for start in range(0, len(items), size):
+        yield start, items[start:start + size]
+
+
+def is_connect_error(error) -> bool:
+    """True if the request never reached the node (connection refused or connect timeout)."""
+    if isinstance(error, (requests.exceptions.ConnectTimeout, aiohttp.ClientConnectorError)):
+        return True
+    if isinstance(error, requests.exceptions.ConnectionError) and error.args:
+        return isinstance(getattr(error.args[0], "reason", None), NewConnectionError)
+    return False
+
+
+def _batch_label(requests: list) -> str:
+    # One sample per batch, labelled e.g. "batch:eth_sendRawTransaction"
+    methods = {method for method, _ in requests}
+    return "batch:" + next(iter(methods)) if len(methods) == 1 else "batch"
+
+
+def _count_batch_errors(label: str, requests: list, responses):
+    if not isinstance(responses, list):
+        RPC_ERRORS.labels(label).inc()
+        return
+    for (method, _), response in zip(requests, responses):
+        if "error" in response:
+            RPC_ERRORS.labels(method).inc()
+
+
+class Endpoint:
+    """One RPC node plus the latency samples and health flags the pool routes on."""
+
+    def __init__(self, url: str, timeout: float, sample_size: int = 100):
+        self.url = url
+        # No per-provider retries: failing over to another node is faster than backing off
+        self.provider = Web3.HTTPProvider(
+            url, request_kwargs={"timeout": timeout}, exception_retry_configuration=None
+        )
+        self.healthy = True
+        self.block_number = None
+        self.last_error = None
+        self._samples = deque(maxlen=sample_size)
+        self._lock = threading.Lock()
+
+    def record(self, latency: float):
+        with self._lock:
+            self._samples.append(latency)
+
+    @property
+    def latency(self):
+        """Median latency of recent calls, or None before the first sample."""
+        with self._lock:
+            if not self._samples:
+                return None
+            ordered = sorted(self._samples)
+        return ordered[len(ordered) // 2]
+
+    def p95(self, default: float) -> float:
+        with self._lock:
+            if not self._samples:
+                return default
+            ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+
+    def to_dict(self) -> dict:
+        return {
+            "url": self.url,
+            "healthy": self.healthy,
+            "latency_ms": None if self.latency is None else round(self.latency * 1000, 1),
+            "block_number": self.block_number,
+            "last_error": self.last_error,
+        }
+
+
+class RPCPool(JSONBaseProvider):
+    """
+    web3 provider that spreads calls over several JSON-RPC endpoints.
+
+    Every request goes to the healthy endpoint with the lowest recent latency
+    and fails over to the next one on errors (for `SEND_METHODS`, only on
+    connect errors, so a timed-out broadcast is not repeated). Idempotent reads
+    (`HEDGED_METHODS`) are hedged: if the first node has not answered after its
+    own p95 latency, the same request is sent to the runner-up and whichever
+    answers first wins. A daemon thread health-checks every endpoint with
+    `eth_blockNumber` and benches nodes that error or lag behind the best head.
+    """
+
+    def __init__(
+        self,
+        urls: list,
+        health_interval: float = 5.0,
+        max_block_lag: int = 5,
+        request_timeout: float = 10.0,
+        default_hedge_delay: float = 0.3,
+    ):
+        super().__init__()
+        if not urls:
+            raise ValueError("RPCPool needs at least one endpoint")
+        self.endpoints = [Endpoint(url, request_timeout) for url in urls]
+        self.health_interval = health_interval
+        self.max_block_lag = max_block_lag
+        self.default_hedge_delay = default_hedge_delay
+        self._executor = ThreadPoolExecutor(max_workers=max(4, 4 * len(self.endpoints)), thread_name_prefix="rpc-pool")
+        self._thread = None
+        self._stop = threading.Event()
+
+    def __str__(self) -> str:
+        return f"RPC pool {[endpoint.url for endpoint in self.endpoints]}"
+
+    def ranked(self) -> list:
+        """Healthy endpoints fastest first; all endpoints if none is healthy."""
+        candidates = [endpoint for endpoint in self.endpoints if endpoint.healthy] or list(self.endpoints)
+        # Endpoints without samples yet sort first so they get measured
+        return sorted(candidates, key=lambda endpoint: endpoint.latency or 0.0)
+
+    @property
+    def current(self) -> Endpoint:
+        return self.ranked()[0]
+
+    def _call(self, endpoint: Endpoint, method, params):
+        started = time.monotonic()
+        try:
+            response = endpoint.provider.make_request(method, params)
+        except Exception as e:
+            endpoint.healthy = False
+            endpoint.last_error = str(e)
+            raise
+        endpoint.record(time.monotonic() - started)
+        return response
+
+    def _call_with_failover(self, call, ranked: list, sends: bool = False):
+        error = None
+        for endpoint in ranked:
+            try:
+                return call(endpoint)
+            except Exception as e:
+                error = e
+                logger.warning("RPC endpoint %s failed: %s", endpoint.url, e)
+                if sends and not is_connect_error(e):
+                    # The node may have the transaction; let the caller decide instead of resending
+                    break
+        raise error
+
+    def _hedged(self, method, params, ranked: list):
+        primary, backup = ranked[0], ranked[1]
+        first = self._executor.submit(self._call, primary, method, params)
+        done, _ = wait([first], timeout=primary.p95(self.default_hedge_delay))
+        if done and first.exception() is None:
+            return first.result()
+
+        futures = [first, self._executor.submit(self._call, backup, method, params)]
+        error = None
+        while futures:
+            done, _ = wait(futures, return_when=FIRST_COMPLETED)
+            for future in done:
+                futures.remove(future)
+                if future.exception() is None:
+                    return future.result()
+                error = future.exception()
+        if len(ranked) > 2:
+            # Both hedges failed; try whoever is left
+            return self._call_with_failover(lambda endpoint: self._call(endpoint, method, params), ranked[2:])
+        raise error
+
+    def make_request(self, method, params):
+        with RPC_LATENCY.labels(method).time(), RPC_ERRORS.labels(method).count_exceptions():
+            ranked = self.ranked()
+            if method in HEDGED_METHODS and len(ranked) > 1:
+                response = self._hedged(method, params, ranked)
+            else:
+                response = self._call_with_failover(
+                    lambda endpoint: self._call(endpoint, method, params), ranked, sends=method in SEND_METHODS
+                )
+        if "error" in response:
+            RPC_ERRORS.labels(method).inc()
+        return response
+
+    def make_batch_request(self, requests):
+        requests = list(requests)
+
+        def call(endpoint: Endpoint):
+            started = time.monotonic()
+            try:
+                response = endpoint.provider.make_batch_request(requests)
+            except Exception as e:
+                endpoint.healthy = False
+                endpoint.last_error = str(e)
+                raise
+            endpoint.record(time.monotonic() - started)
+            return response
+
+        label = _batch_label(requests)
+        sends = any(method in SEND_METHODS for method, _ in requests)
+        with RPC_LATENCY.labels(label).time(), RPC_ERRORS.labels(label).count_exceptions():
+            responses = self._call_with_failover(call, self.ranked(), sends=sends)
+        _count_batch_errors(label, requests, responses)
+        return responses
+
+    def is_connected(self, show_traceback: bool = False) -> bool:
+        return any(endpoint.provider.is_connected(show_traceback) for endpoint in self.endpoints)
+
+    def check_health(self):
+        """Probe every endpoint once and update its health flag."""
+        futures = {
+            endpoint: self._executor.submit(self._call, endpoint, "eth_blockNumber", [])
+            for endpoint in self.endpoints
+        }
+        for endpoint, future in futures.items():
+            try:
+                response = future.result()
+                if "error" in response:
+                    raise ValueError(response["error"])
+                endpoint.block_number = int(response["result"], 16)
+                endpoint.last_error = None
+            except Exception as e:
+                endpoint.block_number = None
+                endpoint.last_error = str(e)
+
+        heads = [endpoint.block_number for endpoint in self.endpoints if endpoint.block_number is not None]
+        best = max(heads) if heads else None
+        for endpoint in self.endpoints:
+            endpoint.healthy = (
+                endpoint.block_number is not None and best - endpoint.block_number <= self.max_block_lag
+            )
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="rpc-health", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread = None
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.check_health()
+            except Exception:
+                logger.exception("RPC health check failed")
+            self._stop.wait(self.health_interval)
+
+
+class AsyncRPCPool(AsyncJSONBaseProvider):
+    """
+    AsyncWeb3 provider over the endpoints of an `RPCPool`.
+
+    Ranking, health flags and latency samples are shared with the sync pool
+    (its health thread keeps them fresh), so async calls also go to the fastest
+    healthy endpoint, fail over the same way and feed the same metrics. Reads
+    are not hedged. Every endpoint uses the aiohttp session given to
+    `cache_async_session()`.
+    """
+
+    def __init__(self, pool: RPCPool):
+        super().__init__()
+        self.pool = pool
+        self._providers = {
+            endpoint.url: AsyncHTTPProvider(endpoint.url, exception_retry_configuration=None)
+            for endpoint in pool.endpoints
+        }
+
+    def __str__(self) -> str:
+        return f"Async {self.pool}"
+
+    async def cache_async_session(self, session):
+        for provider in self._providers.values():
+            await provider.cache_async_session(session)
+
+    async def _call_with_failover(self, call, sends: bool):
+        error = None
+        for endpoint in self.pool.ranked():
+            started = time.monotonic()
+            try:
+                response = await call(self._providers[endpoint.url])
+            except Exception as e:
+                endpoint.healthy = False
+                endpoint.last_error = str(e)
+                error = e
+                logger.warning("RPC endpoint %s failed: %s", endpoint.url, e)
+                if sends and not is_connect_error(e):
+                    break
+                continue
+            endpoint.record(time.monotonic() - started)
+            return response
+        raise error
+
+    async def make_request(self, method, params):
+        with RPC_LATENCY.labels(method).time(), RPC_ERRORS.labels(method).count_exceptions():
+            response = await self._call_with_failover(
+                lambda provider: provider.make_request(method, params), sends=method in SEND_METHODS
+            )
+        if "error" in response:
+            RPC_ERRORS.labels(method).inc()
+        return response
+
+    async def make_batch_request(self, requests):
+        requests = list(requests)
+        label = _batch_label(requests)
+        sends = any(method in SEND_METHODS for method, _ in requests)
+        with RPC_LATENCY.labels(label).time(), RPC_ERRORS.labels(label).count_exceptions():
+            responses = await self._call_with_failover(
+                lambda provider: provider.make_batch_request(requests), sends=sends
+            )
+        _count_batch_errors(label, requests, responses)
+        return responses
+
+    async def is_connected(self, show_traceback: bool = False) -> bool:
+        for provider in self._providers.values():
+            if await provider.is_connected(show_traceback):
+                return True
+        return False
@@ -0,0 +1,53 @@
+import threading
+import time
+
+from web3 import Web3
+
+
+class StatusSnapshot:
+    """
+    Account and chain-head summary served by `/api/status`.
+
+    Refreshed once per block by the BlockWatcher with a single batched
+    `eth_getBalance` + `eth_getTransactionCount` request, so the endpoint
+    itself is an in-memory read no matter how many clients poll it.
+    """
+
+    def __init__(self, w3, address: str, endpoint_url):
+        self.w3 = w3
+        self.address = address
+        # Callable returning the URL of the RPC endpoint currently in use
+        self.endpoint_url = endpoint_url
+        self._lock = threading.Lock()
+        self._snapshot = {
+            "address": address,
+            "balance": None,
+            "balance_wei": None,
+            "pending_nonce": None,
+            "latest_block": None,
+            "rpc_endpoint": endpoint_url(),
+            "updated_at": None,
+        }
+
+    def on_new_block(self, block_number: int):
+        responses = self.w3.provider.make_batch_request([
+            ("eth_getBalance", [self.address, "latest"]),
+            ("eth_getTransactionCount", [self.address, "pending"]),
+        ])
+        if not isinstance(responses, list) or any("error" in response for response in responses):
+            return
+        balance_wei = int(responses[0]["result"], 16)
+        with self._lock:
+            self._snapshot = {
+                "address": self.address,
+                "balance": str(Web3.from_wei(balance_wei, "ether")),
+                "balance_wei": str(balance_wei),
+                "pending_nonce": int(responses[1]["result"], 16),
+                "latest_block": block_number,
+                "rpc_endpoint": self.endpoint_url(),
+                "updated_at": time.time(),
+            }
+
+    def get(self) -> dict:
+        with self._lock:
+            return dict(self._snapshot)
@@ -0,0 +1,119 @@
+import json
+
+
+class IncrementalJSONParser:
+    """
+    Emits the top-level fields of a JSON object while it is still being streamed.
+
+    Feed it completion chunks as they arrive; `feed()` returns the
+    `(key, value)` pairs that became complete in that chunk, so the first
+    field can be shown before the model has written the last one. Text before
+    the opening brace (e.g. a ```json fence) and after the closing brace is
+    ignored. Values that do not parse as JSON are returned as raw strings.
+    """
+
+    def __init__(self):
+        self.fields = {}
+        self.done = False
+        self._state = "seek"
+        self._buffer = []
+        self._key = None
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+
+    def feed(self, chunk: str) -> list:
+        completed = []
+        for char in chunk:
+            if self.done:
+                break
+            self._step(char, completed)
+        return completed
+
+    def _emit(self, completed: list):
+        raw = "".join(self._buffer).strip()
+        try:
+            value = json.loads(raw)
+        except json.JSONDecodeError:
+            value = raw
+        self.fields[self._key] = value
+        completed.append((self._key, value))
+        self._buffer = []
+        self._key = None
+
+    def _step(self, char: str, completed: list):
+        state = self._state
+        if state == "seek":
+            if char == "{":
+                self._state = "key_start"
+        elif state == "key_start":
+            if char == '"':
+                self._state = "key"
+                self._buffer = []
+            elif char == "}":
+                self.done = True
+        elif state == "key":
+            if self._escape:
+                self._escape = False
+                self._buffer.append(char)
+            elif char == "\\":
+                self._escape = True
+                self._buffer.append(char)
+            elif char == '"':
+                self._key = json.loads('"' + "".join(self._buffer) + '"')
+                self._buffer = []
+                self._state = "colon"
+            else:
+                self._buffer.append(char)
+        elif state == "colon":
+            if char == ":":
+                self._state = "value_start"
+        elif state == "value_start":
+            if not char.isspace():
+                self._state = "value"
+                self._value_char(char, completed)
+        elif state == "value":
+            self._value_char(char, completed)
+        elif state == "after_value":
+            if char == ",":
+                self._state = "key_start"
+            elif char == "}":
+                self.done = True
+
+    def _value_char(self, char: str, completed: list):
+        if self._in_string:
+            self._buffer.append(char)
+            if self._escape:
+                self._escape = False
+            elif char == "\\":
+                self._escape = True
+            elif char == '"':
+                self._in_string = False
+                if self._depth == 0:
+                    # A top-level string value is complete at its closing quote
+                    self._emit(completed)
+                    self._state = "after_value"
+            return
+
+        if char == '"':
+            self._in_string = True
+            self._buffer.append(char)
+        elif char in "{[":
+            self._depth += 1
+            self._buffer.append(char)
+        elif char in "}]":
+            if self._depth == 0:
+                # End of the whole object right after a number / literal
+                self._emit(completed)
+                self.done = True
+                return
+            self._depth -= 1
+            self._buffer.append(char)
+            if self._depth == 0:
+                self._emit(completed)
+                self._state = "after_value"
+        elif char == "," and self._depth == 0:
+            self._emit(completed)
+            self._state = "key_start"
+        else:
+            self._buffer.append(char)
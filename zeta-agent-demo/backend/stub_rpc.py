@@ -0,0 +1,183 @@
+"""
+Minimal in-process JSON-RPC node for exercising the backend without a testnet.
+
+It answers the handful of methods zetachain.py uses, mines a new block every
+`block_time` seconds (receipts appear one block after submission), sleeps
+`latency` seconds per HTTP request and counts calls per method. Run it
+standalone with `python stub_rpc.py --port 8545` or start it from code:
+
+    stub = StubRPCServer(latency=0.05).start()
+    os.environ["RPC_URLS"] = stub.url
+"""
+import argparse
+import json
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from eth_utils import keccak
+
+STUB_CHAIN_ID = 7001  # ZetaChain Athens testnet
+
+
+class StubRPCError(Exception):
+    """Answered as a JSON-RPC error object, like a node rejecting a call."""
+
+    def __init__(self, code: int, message: str):
+        super().__init__(message)
+        self.code = code
+
+
+class StubRPCServer:
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, latency: float = 0.0,
+                 block_time: float = 1.0, chain_id: int = STUB_CHAIN_ID):
+        self.latency = latency
+        self.block_time = block_time
+        self.chain_id = chain_id
+        self.base_fee = 10 ** 10
+        self.priority_fee = 10 ** 9
+        self.balance = 10 ** 24
+        # Set to make the node answer every request with an HTTP 503
+        self.failing = False
+        self.calls = Counter()
+        self.requests = 0
+        self._lock = threading.Lock()
+        self._started_at = time.monotonic()
+        self._nonce = 0
+        self._sent = {}
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def block_number(self) -> int:
+        return 100 + int((time.monotonic() - self._started_at) / self.block_time)
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, name="stub-rpc", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def reset_counters(self):
+        with self._lock:
+            self.calls.clear()
+            self.requests = 0
+
+    def _result(self, method: str, params: list):
+        if method == "eth_chainId":
+            return hex(self.chain_id)
+        if method == "eth_blockNumber":
+            return hex(self.block_number)
+        if method == "eth_gasPrice":
+            return hex(self.base_fee + self.priority_fee)
+        if method == "eth_getTransactionCount":
+            return hex(self._nonce)
+        if method == "eth_getBalance":
+            return hex(self.balance)
+        if method == "eth_getCode":
+            return "0x"
+        if method == "eth_estimateGas":
+            return hex(21000)
+        if method == "eth_feeHistory":
+            count = int(params[0], 16) if isinstance(params[0], str) else int(params[0])
+            percentiles = params[2] if len(params) > 2 else []
+            newest = self.block_number
+            return {
+                "oldestBlock": hex(newest - count + 1),
+                "baseFeePerGas": [hex(self.base_fee)] * (count + 1),
+                "gasUsedRatio": [0.5] * count,
+                "reward": [[hex(self.priority_fee)] * len(percentiles)] * count,
+            }
+        if method == "eth_sendRawTransaction":
+            tx_hash = "0x" + keccak(hexstr=params[0]).hex()
+            if tx_hash in self._sent:
+                raise StubRPCError(-32000, "already known")
+            self._nonce += 1
+            self._sent[tx_hash] = self.block_number
+            return tx_hash
+        if method == "eth_getTransactionReceipt":
+            sent_at = self._sent.get(params[0])
+            if sent_at is None or self.block_number <= sent_at:
+                return None
+            return {
+                "transactionHash": params[0],
+                "status": "0x1",
+                "blockNumber": hex(sent_at + 1),
+                "gasUsed": hex(21000),
+                "effectiveGasPrice": hex(self.base_fee + self.priority_fee),
+            }
+        if method == "web3_clientVersion":
+            return "stub-rpc/0.1"
+        raise KeyError(method)
+
+    def _answer(self, request: dict) -> dict:
+        method = request.get("method")
+        with self._lock:
+            self.calls[method] += 1
+            try:
+                result = self._result(method, request.get("params") or [])
+            except KeyError:
+                return {"jsonrpc": "2.0", "id": request.get("id"),
+                        "error": {"code": -32601, "message": f"Method {method} not found"}}
+            except StubRPCError as e:
+                return {"jsonrpc": "2.0", "id": request.get("id"), "error": {"code": e.code, "message": str(e)}}
+        return {"jsonrpc": "2.0", "id": request.get("id"), "result": result}
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                with stub._lock:
+                    stub.requests += 1
+                if stub.latency:
+                    time.sleep(stub.latency)
+                if stub.failing:
+                    self.send_response(503)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                request = json.loads(body)
+                if isinstance(request, list):
+                    response = [stub._answer(item) for item in request]
+                else:
+                    response = stub._answer(request)
+                data = json.dumps(response).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run a stub JSON-RPC node")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8545)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every request")
+    parser.add_argument("--block-time", type=float, default=1.0)
+    args = parser.parse_args()
+    stub = StubRPCServer(args.host, args.port, latency=args.latency, block_time=args.block_time)
+    print(f"Stub JSON-RPC node listening on {stub.url}")
+    try:
+        stub._server.serve_forever()
+    except KeyboardInterrupt:
+        pass
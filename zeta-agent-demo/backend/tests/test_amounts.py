@@ -0,0 +1,71 @@
+from decimal import Decimal
+
+import pytest
+
+from amounts import decimals_for, normalize_amount, to_base_units
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("0.10", "0.1"),
+    ("1,000.5 ZETA", "1000.5"),
+    (0.1, "0.1"),
+    (1e-3, "0.001"),
+    (Decimal("2.500"), "2.5"),
+    (10, "10"),
+    ("1e3", "1000"),
+    ("-0", "0"),
+    ("1,000,000", "1000000"),
+    ("1,5", None),
+    ("12,34 ZETA", None),
+    ("1e9999999", None),
+    ("1e-9999999", None),
+    ("zero", None),
+    (None, None),
+    (True, None),
+    (float("nan"), None),
+])
+def test_normalize_amount(value, expected):
+    assert normalize_amount(value) == expected
+
+
+@pytest.mark.parametrize("amount, decimals, expected", [
+    ("0.1", 18, 10 ** 17),
+    (0.1, 18, 10 ** 17),
+    ("1", 6, 10 ** 6),
+    ("123456789.123456789123456789", 18, 123456789123456789123456789),
+    ("0.000001", 6, 1),
+    ("5.50", 1, 55),
+    ("0", 18, 0),
+])
+def test_to_base_units_is_exact(amount, decimals, expected):
+    assert to_base_units(amount, decimals) == expected
+
+
+def test_to_base_units_avoids_float_rounding():
+    # float(0.1) * 10**18 would be 100000000000000005.55...
+    assert to_base_units(0.1, 18) == 100000000000000000
+    assert to_base_units("0.3", 18) == 3 * 10 ** 17
+
+
+@pytest.mark.parametrize("amount, decimals", [
+    ("0.0000001", 6),
+    ("-1", 18),
+    ("abc", 18),
+    (None, 18),
+])
+def test_to_base_units_rejects(amount, decimals):
+    assert to_base_units(amount, decimals) is None
+
+
+def test_decimals_for():
+    assert decimals_for("zeta") == 18
+    assert decimals_for("USDC") == 6
+    with pytest.raises(ValueError):
+        decimals_for("NOPE")
+
+
+def test_decimals_come_from_the_token_registry():
+    from defi_intent_parser.parser import token_decimals
+
+    for token in ("ZETA", "ETH", "BTC", "BNB", "USDC", "USDT", "MATIC"):
+        assert decimals_for(token) == token_decimals(token, "zetachain")
@@ -0,0 +1,54 @@
+from decimal import Decimal
+
+import pytest
+
+from intent_schema import extract_intent, repair_json
+
+RECIPIENT = "0x2c7536E3605D9C16a7a3D7b1898e529396a65c23"
+
+
+@pytest.mark.parametrize("text", [
+    '{"type": "transfer", "amount": 0.1, "token": "ZETA"}',
+    'Sure! Here is the intent:\n```json\n{"type": "transfer", "amount": 0.1, "token": "ZETA"}\n```',
+    '{"type": "transfer", "amount": 0.1, "token": "ZETA",}',
+    "{'type': 'transfer', 'amount': 0.1, 'token': 'ZETA'}",
+    '{type: "transfer", amount: 0.1, token: "ZETA"}',
+    '｛"type"："transfer"，"amount"：0.1，"token"："ZETA"｝',
+    '{\n  // the model explains itself\n  "type": "transfer", "amount": 0.1, "token": "ZETA"\n}',
+    '{"type": "transfer", "amount": 0.1, "token": "ZETA"',
+])
+def test_repairs_near_valid_json(text):
+    data = repair_json(text)
+    assert data["type"] == "transfer"
+    assert data["amount"] == Decimal("0.1")
+    assert data["token"] == "ZETA"
+
+
+def test_python_literals_and_truncated_strings():
+    assert repair_json("{'recipient': None, 'confirmed': True}") == {"recipient": None, "confirmed": True}
+    assert repair_json('{"token": "ZE') == {"token": "ZE"}
+
+
+def test_floats_keep_the_written_digits():
+    assert repair_json('{"amount": 0.30000000000000004}')["amount"] == Decimal("0.30000000000000004")
+    assert repair_json('{"amount": 0.3}')["amount"] == Decimal("0.3")
+
+
+@pytest.mark.parametrize("text", ["no json here", "[1, 2, 3]", "{\"a\": [1, 2}"])
+def test_rejects_non_objects(text):
+    with pytest.raises(ValueError):
+        repair_json(text)
+
+
+def test_extract_intent_derives_exact_base_units():
+    intent = extract_intent(f'{{"type": "Transfer", "amount": "0.1 ZETA", "token": "zeta", "recipient": " {RECIPIENT} ",'
+                            f' "base_units": 1}}')
+    assert intent == {
+        "type": "transfer", "recipient": RECIPIENT, "amount": "0.1", "token": "ZETA", "base_units": 10 ** 17,
+    }
+
+
+def test_extract_intent_reports_unparseable_output():
+    intent = extract_intent("I cannot help with that")
+    assert intent["error"] == "Failed to parse JSON from agent"
+    assert intent["raw"] == "I cannot help with that"
@@ -0,0 +1,127 @@
+import threading
+
+import pytest
+
+from nonce_manager import NonceManager, is_already_known, is_nonce_gap, is_nonce_too_low
+
+
+class FakeEth:
+    def __init__(self, pending: int):
+        self.pending = pending
+        self.calls = 0
+
+    def get_transaction_count(self, address, block_identifier):
+        assert block_identifier == "pending"
+        self.calls += 1
+        return self.pending
+
+
+class FakeWeb3:
+    def __init__(self, pending: int = 7):
+        self.eth = FakeEth(pending)
+
+
+@pytest.fixture
+def w3():
+    return FakeWeb3()
+
+
+def test_allocate_fetches_once_then_counts_in_memory(w3):
+    nonces = NonceManager(w3, "0xabc")
+    assert nonces.needs_sync
+    assert [nonces.allocate() for _ in range(3)] == [7, 8, 9]
+    assert w3.eth.calls == 1
+
+
+def test_concurrent_allocations_are_distinct(w3):
+    nonces = NonceManager(w3, "0xabc")
+    allocated = []
+    lock = threading.Lock()
+
+    def worker():
+        for _ in range(100):
+            nonce = nonces.allocate()
+            with lock:
+                allocated.append(nonce)
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert sorted(allocated) == list(range(7, 7 + 800))
+
+
+def test_released_nonce_is_reused_first(w3):
+    nonces = NonceManager(w3, "0xabc")
+    first, second, third = nonces.allocate(), nonces.allocate(), nonces.allocate()
+    nonces.release(second)
+    assert nonces.pending_gaps == 1
+    assert nonces.allocate() == second
+    assert nonces.allocate() == third + 1
+
+
+def test_release_at_tip_folds_back(w3):
+    nonces = NonceManager(w3, "0xabc")
+    allocated = [nonces.allocate() for _ in range(3)]
+    nonces.release(allocated[2])
+    nonces.release(allocated[1])
+    assert nonces.pending_gaps == 0
+    assert nonces.allocate() == allocated[1]
+
+
+def test_release_ignores_unallocated_nonces(w3):
+    nonces = NonceManager(w3, "0xabc")
+    nonces.release(3)
+    nonces.allocate()
+    nonces.release(100)
+    assert nonces.pending_gaps == 0
+
+
+def test_allocate_many_reuses_released_nonces(w3):
+    nonces = NonceManager(w3, "0xabc")
+    assert nonces.allocate_many(5) == [7, 8, 9, 10, 11]
+    nonces.release(8)
+    nonces.release(10)
+    assert nonces.allocate_many(3) == [8, 10, 12]
+    assert nonces.pending_gaps == 0
+    assert nonces.allocate() == 13
+
+
+def test_resync_drops_local_state(w3):
+    nonces = NonceManager(w3, "0xabc")
+    nonces.allocate()
+    nonces.allocate()
+    nonces.release(7)
+    w3.eth.pending = 20
+    nonces.resync()
+    assert nonces.pending_gaps == 0
+    assert nonces.allocate() == 20
+
+
+def test_invalidate_reloads_on_next_allocate(w3):
+    nonces = NonceManager(w3, "0xabc")
+    nonces.allocate()
+    w3.eth.pending = 30
+    nonces.invalidate()
+    assert nonces.needs_sync
+    assert nonces.allocate() == 30
+    assert w3.eth.calls == 2
+
+
+@pytest.mark.parametrize("message", ["nonce too low: next nonce 5, tx nonce 4", "Invalid nonce"])
+def test_nonce_too_low_errors(message):
+    assert is_nonce_too_low(ValueError(message))
+    assert not is_already_known(message)
+
+
+def test_already_known_is_not_a_stale_nonce():
+    assert is_already_known("already known")
+    assert is_already_known({"code": -32000, "message": "Known transaction: 0xabc"})
+    assert not is_nonce_too_low("already known")
+    assert not is_nonce_gap("already known")
+
+
+def test_nonce_gap_errors():
+    assert is_nonce_gap("nonce too high")
+    assert not is_nonce_too_low("nonce too high")
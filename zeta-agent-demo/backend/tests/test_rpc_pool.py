@@ -0,0 +1,79 @@
+import pytest
+import requests
+
+from rpc_pool import RPCPool, batch_slices
+
+
+class FakeProvider:
+    """Stands in for an endpoint's HTTPProvider: answers with `result` or raises `error`."""
+
+    def __init__(self, result=None, error=None):
+        self.result = result
+        self.error = error
+        self.calls = []
+
+    def make_request(self, method, params):
+        self.calls.append(method)
+        if self.error is not None:
+            raise self.error
+        return {"jsonrpc": "2.0", "id": 1, "result": self.result}
+
+    def make_batch_request(self, requests):
+        self.calls.append([method for method, _ in requests])
+        if self.error is not None:
+            raise self.error
+        return [{"jsonrpc": "2.0", "id": i, "result": self.result} for i, _ in enumerate(requests)]
+
+
+def make_pool(*providers):
+    pool = RPCPool([f"http://node-{i}" for i in range(len(providers))])
+    for endpoint, provider in zip(pool.endpoints, providers):
+        endpoint.provider = provider
+    return pool
+
+
+def test_send_fails_over_when_the_node_was_not_reached():
+    down = FakeProvider(error=requests.exceptions.ConnectTimeout("connect timeout"))
+    up = FakeProvider(result="0xhash")
+    pool = make_pool(down, up)
+
+    assert pool.make_request("eth_sendRawTransaction", ["0x01"])["result"] == "0xhash"
+    assert down.calls == up.calls == ["eth_sendRawTransaction"]
+    assert not pool.endpoints[0].healthy
+
+
+def test_send_is_not_repeated_after_a_read_timeout():
+    slow = FakeProvider(error=requests.exceptions.ReadTimeout("read timeout"))
+    other = FakeProvider(result="0xhash")
+    pool = make_pool(slow, other)
+
+    with pytest.raises(requests.exceptions.ReadTimeout):
+        pool.make_request("eth_sendRawTransaction", ["0x01"])
+    # The first node may have the transaction: a second broadcast would be a double send
+    assert other.calls == []
+
+
+def test_batch_send_follows_the_same_rule():
+    slow = FakeProvider(error=requests.exceptions.ReadTimeout("read timeout"))
+    other = FakeProvider(result="0xhash")
+    with pytest.raises(requests.exceptions.ReadTimeout):
+        make_pool(slow, other).make_batch_request([("eth_sendRawTransaction", ["0x01"])])
+    assert other.calls == []
+
+    down = FakeProvider(error=requests.exceptions.ConnectTimeout("connect timeout"))
+    responses = make_pool(down, other).make_batch_request([("eth_sendRawTransaction", ["0x01"])] * 2)
+    assert [response["result"] for response in responses] == ["0xhash", "0xhash"]
+
+
+def test_reads_fail_over_on_any_error():
+    broken = FakeProvider(error=requests.exceptions.ReadTimeout("read timeout"))
+    working = FakeProvider(result="0x")
+    pool = make_pool(broken, working)
+
+    assert pool.make_request("eth_getCode", ["0xabc", "latest"])["result"] == "0x"
+    assert working.calls == ["eth_getCode"]
+
+
+def test_batch_slices():
+    assert list(batch_slices(list(range(5)), size=2)) == [(0, [0, 1]), (2, [2, 3]), (4, [4])]
+    assert list(batch_slices([], size=2)) == []
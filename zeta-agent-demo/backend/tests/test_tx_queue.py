@@ -0,0 +1,130 @@
+import asyncio
+
+import pytest
+
+from tx_queue import IdempotencyConflictError, QueueFullError, SubmissionQueue
+
+
+class UnknownOutcome(Exception):
+    pass
+
+
+def run(scenario):
+    """Run `scenario(queue_factory)` on a fresh event loop, stopping every queue it started."""
+    queues = []
+
+    async def main():
+        async def make(submit, **kwargs):
+            queue = SubmissionQueue(submit, **kwargs)
+            await queue.start()
+            queues.append(queue)
+            return queue
+
+        try:
+            return await scenario(make)
+        finally:
+            for queue in queues:
+                await queue.stop()
+
+    return asyncio.run(main())
+
+
+def test_same_key_returns_the_original_result():
+    calls = []
+
+    async def submit(job):
+        calls.append(job)
+        return f"0xhash{len(calls)}"
+
+    async def scenario(make):
+        queue = await make(submit)
+        first = await queue.enqueue("a", "key-1", fingerprint="a")
+        second = await queue.enqueue("a", "key-1", fingerprint="a")
+        return first, second
+
+    assert run(scenario) == ("0xhash1", "0xhash1")
+    assert calls == ["a"]
+
+
+def test_key_reused_for_another_request_is_rejected():
+    async def submit(job):
+        return job
+
+    async def scenario(make):
+        queue = await make(submit)
+        await queue.enqueue("a", "key-1", fingerprint="a")
+        with pytest.raises(IdempotencyConflictError):
+            queue.enqueue("b", "key-1", fingerprint="b")
+
+    run(scenario)
+
+
+def test_retryable_failure_forgets_the_key():
+    calls = []
+
+    async def submit(job):
+        calls.append(job)
+        if len(calls) == 1:
+            raise ConnectionError("node unreachable")
+        return "0xhash"
+
+    async def scenario(make):
+        queue = await make(submit)
+        with pytest.raises(ConnectionError):
+            await queue.enqueue("a", "key-1", fingerprint="a")
+        return await queue.enqueue("a", "key-1", fingerprint="a")
+
+    assert run(scenario) == "0xhash"
+    assert calls == ["a", "a"]
+
+
+def test_unknown_outcome_keeps_the_key_and_replays_the_error():
+    calls = []
+
+    async def submit(job):
+        calls.append(job)
+        raise UnknownOutcome("0xmaybe")
+
+    async def scenario(make):
+        queue = await make(submit, is_retryable=lambda error: not isinstance(error, UnknownOutcome))
+        errors = []
+        for _ in range(2):
+            with pytest.raises(UnknownOutcome) as excinfo:
+                await queue.enqueue("a", "key-1", fingerprint="a")
+            errors.append(excinfo.value)
+        return errors
+
+    first, second = run(scenario)
+    assert first is second
+    assert calls == ["a"]
+
+
+def test_full_queue_raises_with_retry_after():
+    async def scenario(make):
+        release = asyncio.Event()
+
+        async def submit(job):
+            await release.wait()
+            return job
+
+        queue = await make(submit, max_depth=1, concurrency=1)
+        running = queue.enqueue("a")
+        # Let the worker take "a", so "b" is the one waiting
+        await asyncio.sleep(0)
+        waiting = queue.enqueue("b")
+        with pytest.raises(QueueFullError) as excinfo:
+            queue.enqueue("c", "key-c", fingerprint="c")
+        assert excinfo.value.retry_after >= 1
+        release.set()
+        results = await asyncio.gather(running, waiting)
+        # A rejected submission does not hold on to its key
+        assert await queue.enqueue("c", "key-c", fingerprint="c") == "c"
+        return results
+
+    assert run(scenario) == ["a", "b"]
+
+
+def test_enqueue_before_start_fails():
+    queue = SubmissionQueue(lambda job: job)
+    with pytest.raises(RuntimeError):
+        queue.enqueue("a")
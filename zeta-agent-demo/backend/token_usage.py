@@ -0,0 +1,60 @@
+import threading
+from contextvars import ContextVar
+
+from metrics import LLM_REQUEST_TOKENS, LLM_TOKENS
+
+# Set per HTTP request by main.py so LLM calls are billed to the endpoint that made them
+current_endpoint = ContextVar("llm_endpoint", default="other")
+# Per-request {"calls", "input_tokens", "output_tokens"}, or None outside a request
+request_usage = ContextVar("llm_request_usage", default=None)
+
+
+class TokenUsage:
+    """Running token totals per endpoint."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._totals = {}
+
+    def record(self, endpoint: str, input_tokens: int, output_tokens: int):
+        with self._lock:
+            totals = self._totals.setdefault(endpoint, {"calls": 0, "input_tokens": 0, "output_tokens": 0})
+            totals["calls"] += 1
+            totals["input_tokens"] += input_tokens
+            totals["output_tokens"] += output_tokens
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                endpoint: dict(
+                    totals,
+                    avg_input_tokens=round(totals["input_tokens"] / totals["calls"], 1),
+                    avg_output_tokens=round(totals["output_tokens"] / totals["calls"], 1),
+                )
+                for endpoint, totals in self._totals.items()
+            }
+
+
+usage_totals = TokenUsage()
+
+
+def new_request_usage() -> dict:
+    """Start accounting for one request; LLM calls made under it add to the returned dict."""
+    usage = {"calls": 0, "input_tokens": 0, "output_tokens": 0}
+    request_usage.set(usage)
+    return usage
+
+
+def record_usage(input_tokens: int, output_tokens: int):
+    """Account one LLM call's usage to the current endpoint and request."""
+    endpoint = current_endpoint.get()
+    usage_totals.record(endpoint, input_tokens, output_tokens)
+    LLM_TOKENS.labels(endpoint, "input").inc(input_tokens)
+    LLM_TOKENS.labels(endpoint, "output").inc(output_tokens)
+    LLM_REQUEST_TOKENS.labels("input").observe(input_tokens)
+    LLM_REQUEST_TOKENS.labels("output").observe(output_tokens)
+    usage = request_usage.get()
+    if usage is not None:
+        usage["calls"] += 1
+        usage["input_tokens"] += input_tokens
+        usage["output_tokens"] += output_tokens
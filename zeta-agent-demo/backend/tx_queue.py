@@ -0,0 +1,120 @@
+import asyncio
+import math
+import time
+from collections import OrderedDict
+
+
+class QueueFullError(Exception):
+    """Raised when the submission queue is at capacity; carries a Retry-After hint in seconds."""
+
+    def __init__(self, retry_after: int):
+        super().__init__(f"Submission queue is full, retry after {retry_after}s")
+        self.retry_after = retry_after
+
+
+class IdempotencyConflictError(Exception):
+    """Raised when an idempotency key is reused with a different request body."""
+
+
+class SubmissionQueue:
+    """
+    Bounded queue in front of the transaction signer.
+
+    At most `max_depth` submissions wait and `concurrency` workers run
+    `submit(job)` at once; when the queue is full `enqueue()` raises
+    QueueFullError instead of piling more work on the RPC node. Submissions
+    carrying an idempotency key are remembered for `idempotency_ttl` seconds
+    and a retry with the same key gets the original result (the same tx hash)
+    instead of a second transfer. Failed submissions forget their key so the
+    client can retry them, unless `is_retryable(error)` says the failure may
+    have had an effect (a broadcast with an unknown outcome): those keep the
+    key and every retry gets the same error back.
+    """
+
+    def __init__(self, submit, max_depth: int = 1000, concurrency: int = 8,
+                 idempotency_ttl: float = 3600.0, max_keys: int = 100000, is_retryable=None):
+        self.submit = submit
+        self.is_retryable = is_retryable or (lambda error: True)
+        self.max_depth = max_depth
+        self.concurrency = concurrency
+        self.idempotency_ttl = idempotency_ttl
+        self.max_keys = max_keys
+        self._queue = None
+        self._workers = []
+        self._keys = OrderedDict()
+        # Moving average of submit duration, used for the Retry-After hint
+        self._avg_duration = 0.5
+
+    async def start(self):
+        if self._workers:
+            return
+        self._queue = asyncio.Queue(maxsize=self.max_depth)
+        self._workers = [asyncio.create_task(self._worker()) for _ in range(self.concurrency)]
+
+    async def stop(self):
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    @property
+    def depth(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    def retry_after(self) -> int:
+        return max(1, math.ceil(self.depth * self._avg_duration / self.concurrency))
+
+    def enqueue(self, job, idempotency_key: str = None, fingerprint=None) -> asyncio.Future:
+        """
+        Queue `job` and return a future for its result. `fingerprint` identifies
+        the request body so a key reused for a different request is rejected.
+        """
+        if self._queue is None:
+            raise RuntimeError("SubmissionQueue is not started")
+        if idempotency_key is not None:
+            self._expire_keys()
+            entry = self._keys.get(idempotency_key)
+            if entry is not None:
+                seen_fingerprint, future, _ = entry
+                if seen_fingerprint != fingerprint:
+                    raise IdempotencyConflictError(f"Idempotency key {idempotency_key!r} was used for a different request")
+                return future
+
+        if self._queue.full():
+            raise QueueFullError(self.retry_after())
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((job, future))
+        if idempotency_key is not None:
+            self._keys[idempotency_key] = (fingerprint, future, time.monotonic())
+            future.add_done_callback(lambda f, key=idempotency_key: self._forget_failed(key, f))
+        return future
+
+    def _forget_failed(self, key: str, future: asyncio.Future):
+        if future.cancelled() or (future.exception() is not None and self.is_retryable(future.exception())):
+            entry = self._keys.get(key)
+            if entry is not None and entry[1] is future:
+                del self._keys[key]
+
+    def _expire_keys(self):
+        deadline = time.monotonic() - self.idempotency_ttl
+        while self._keys:
+            key, (_, _, created_at) = next(iter(self._keys.items()))
+            if created_at >= deadline and len(self._keys) <= self.max_keys:
+                break
+            self._keys.popitem(last=False)
+
+    async def _worker(self):
+        while True:
+            job, future = await self._queue.get()
+            started = time.monotonic()
+            try:
+                result = await self.submit(job)
+            except Exception as e:
+                if not future.done():
+                    future.set_exception(e)
+            else:
+                if not future.done():
+                    future.set_result(result)
+            finally:
+                self._avg_duration = 0.9 * self._avg_duration + 0.1 * (time.monotonic() - started)
+                self._queue.task_done()
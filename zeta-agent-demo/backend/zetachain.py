@@ -1,51 +1,439 @@
+import asyncio
 import os
-from web3 import Web3
+import threading
+import aiohttp
+from eth_utils import keccak
+from web3 import AsyncWeb3, Web3
+from web3.exceptions import Web3RPCError
 from dotenv import load_dotenv
 
+from block_watcher import BlockWatcher
+from chain_context import ChainContext
+from fee_oracle import DEFAULT_URGENCY
+from metrics import SEND_STAGE_LATENCY
+from nonce_manager import is_already_known, is_nonce_gap, is_nonce_too_low
+from receipts import ReceiptTracker
+from rpc_pool import AsyncRPCPool, RPCPool, batch_slices, is_connect_error
+from status_snapshot import StatusSnapshot
+
 load_dotenv()
 
 PRIVATE_KEY = os.getenv("PRIVATE_KEY")
 RPC_URL = os.getenv("RPC_URL", "https://zetachain-athens-evm.blockpi.network/v1/rpc/public")
+# Comma-separated list of endpoints; calls are routed to the fastest healthy one
+RPC_URLS = [url.strip() for url in os.getenv("RPC_URLS", RPC_URL).split(",") if url.strip()]
+RPC_HEALTH_INTERVAL = float(os.getenv("RPC_HEALTH_INTERVAL", "5"))
+GAS_PRICE_TTL = float(os.getenv("GAS_PRICE_TTL", "10"))
+BLOCK_POLL_INTERVAL = float(os.getenv("BLOCK_POLL_INTERVAL", "1"))
+
+# Async mode: AsyncWeb3 over one shared keep-alive connection pool
+ASYNC_WEB3 = os.getenv("ASYNC_WEB3", "false").lower() in ("1", "true", "yes")
+RPC_POOL_SIZE = int(os.getenv("RPC_POOL_SIZE", "100"))
+RPC_KEEPALIVE_TIMEOUT = float(os.getenv("RPC_KEEPALIVE_TIMEOUT", "30"))
+RPC_TIMEOUT = float(os.getenv("RPC_TIMEOUT", "30"))
+
+class BroadcastUnknownError(Exception):
+    """
+    A broadcast failed without telling whether the node got the transaction
+    (read timeout, connection reset). The transaction may still be mined, so
+    its nonce is kept and `tx_hash` is tracked like any other.
+    """
+
+    def __init__(self, tx_hash: str, error: Exception):
+        super().__init__(f"Broadcast outcome unknown, transaction {tx_hash} may still be mined: {error}")
+        self.tx_hash = tx_hash
 
 if not PRIVATE_KEY:
     # Handle missing private key gracefully for demo purposes or raise error
     pass
 
-w3 = Web3(Web3.HTTPProvider(RPC_URL))
+rpc_pool = RPCPool(RPC_URLS, health_interval=RPC_HEALTH_INTERVAL, request_timeout=RPC_TIMEOUT)
+w3 = Web3(rpc_pool)
 
-def get_address():
+# One block poll loop drives every per-block refresh
+block_watcher = BlockWatcher(w3, poll_interval=BLOCK_POLL_INTERVAL)
+receipt_tracker = ReceiptTracker(w3)
+block_watcher.subscribe(receipt_tracker.on_new_block)
+
+_context = None
+_status = None
+_context_lock = threading.Lock()
+
+_async_w3 = None
+_async_session = None
+
+def get_context():
+    """Return the process-wide ChainContext, building it on first use."""
+    global _context, _status
     if not PRIVATE_KEY:
         return None
-    account = w3.eth.account.from_key(PRIVATE_KEY)
-    return account.address
+    with _context_lock:
+        if _context is None:
+            _context = ChainContext(w3, PRIVATE_KEY, gas_price_ttl=GAS_PRICE_TTL)
+            _status = StatusSnapshot(w3, _context.address, lambda: rpc_pool.current.url)
+            block_watcher.subscribe(_context.fees.on_new_block)
+            block_watcher.subscribe(_status.on_new_block)
+            _context.start()
+    return _context
 
-def send_zeta(to_address: str, amount: float):
-    if not PRIVATE_KEY:
+def get_status():
+    """Latest per-block account snapshot (address, balance, pending nonce, head, endpoint)."""
+    if get_context() is None:
+        return {"address": None}
+    return _status.get()
+
+def warm_up():
+    """Resync the nonce and prime chain constants; called once at startup."""
+    context = get_context()
+    if context is not None:
+        context.warm_up()
+
+def start_background():
+    rpc_pool.start()
+    block_watcher.start()
+
+def stop_background():
+    block_watcher.stop()
+    rpc_pool.stop()
+    if _context is not None:
+        _context.stop()
+
+async def open_async_web3():
+    """Create the shared AsyncWeb3 and its pooled HTTP session (must run inside the event loop)."""
+    global _async_w3, _async_session
+    if _async_w3 is not None:
+        return _async_w3
+    _async_session = aiohttp.ClientSession(
+        connector=aiohttp.TCPConnector(limit=RPC_POOL_SIZE, keepalive_timeout=RPC_KEEPALIVE_TIMEOUT),
+        timeout=aiohttp.ClientTimeout(total=RPC_TIMEOUT),
+    )
+    # Same endpoints, ranking, failover and metrics as the sync pool
+    provider = AsyncRPCPool(rpc_pool)
+    await provider.cache_async_session(_async_session)
+    _async_w3 = AsyncWeb3(provider)
+    return _async_w3
+
+async def close_async_web3():
+    global _async_w3, _async_session
+    if _async_session is not None:
+        await _async_session.close()
+    _async_w3 = None
+    _async_session = None
+
+def get_address():
+    context = get_context()
+    if context is None:
+        return None
+    return context.address
+
+def _check_value(value_wei: int) -> int:
+    # Amounts arrive already converted (amounts.to_base_units); a float here would be a lossy shortcut
+    if not isinstance(value_wei, int) or isinstance(value_wei, bool):
+        raise TypeError(f"value_wei must be an int, got {type(value_wei).__name__}")
+    if value_wei < 0:
+        raise ValueError("value_wei must not be negative")
+    return value_wei
+
+def send_zeta(to_address: str, value_wei: int, urgency: str = DEFAULT_URGENCY):
+    """Send `value_wei` (an exact integer, 1 ZETA = 10**18) to `to_address`."""
+    context = get_context()
+    if context is None:
+        raise ValueError("Private key not found in .env")
+    _check_value(value_wei)
+
+    return _send_with_nonce(context, lambda nonce: _sign_and_send(context, to_address, value_wei, nonce, urgency))
+
+def prepare_transfer(to_address: str, value_wei: int, urgency: str = DEFAULT_URGENCY) -> dict:
+    """
+    Do every lookup send_zeta needs before signing, except taking a nonce:
+    checksum address, value, gas limit, fee fields and chain id, plus syncing
+    the nonce manager. send_prepared() then only allocates a nonce in memory,
+    signs and broadcasts. The fee fields are a snapshot, so do not hold on to
+    the result for more than a few blocks.
+    """
+    context = get_context()
+    if context is None:
+        raise ValueError("Private key not found in .env")
+    if context.nonces.needs_sync:
+        context.warm_up()
+    return _build_tx(context, to_address, _check_value(value_wei), urgency)
+
+def send_prepared(tx: dict):
+    """Sign and broadcast a prepare_transfer() result with the next nonce."""
+    context = get_context()
+    if context is None:
         raise ValueError("Private key not found in .env")
+    return _send_with_nonce(context, lambda nonce: _send_signed(_sign_tx(context, dict(tx, nonce=nonce))))
+
+def _resync_after_unknown(nonces):
+    # The nonce may already be taken in the mempool, so it cannot be released: reload instead
+    try:
+        nonces.resync()
+    except Exception:
+        nonces.invalidate()
 
-    account = w3.eth.account.from_key(PRIVATE_KEY)
-    from_address = account.address
-    
-    # Convert amount to Wei
-    value_wei = w3.to_wei(amount, 'ether')
-    
-    # Get nonce
-    nonce = w3.eth.get_transaction_count(from_address)
-    
-    # Build transaction
+def _after_failure(nonces, nonce: int, error: Exception):
+    """Release the nonce of a failed attempt only if its transaction surely never reached a node."""
+    if isinstance(error, BroadcastUnknownError):
+        _resync_after_unknown(nonces)
+    else:
+        nonces.release(nonce)
+
+def _send_with_nonce(context: ChainContext, attempt):
+    """Run `attempt(nonce)` with a fresh nonce, giving it back on failure when that is safe."""
+    nonces = context.nonces
+    with SEND_STAGE_LATENCY.labels("nonce").time():
+        nonce = nonces.allocate()
+    try:
+        return attempt(nonce)
+    except Exception as e:
+        if not (is_nonce_too_low(e) or is_nonce_gap(e)):
+            _after_failure(nonces, nonce, e)
+            raise
+        # Someone else used this account or a tx was dropped; reload and retry once
+        with SEND_STAGE_LATENCY.labels("nonce").time():
+            nonces.resync()
+            nonce = nonces.allocate()
+        try:
+            return attempt(nonce)
+        except Exception as e:
+            _after_failure(nonces, nonce, e)
+            raise
+
+async def async_send_zeta(to_address: str, value_wei: int, urgency: str = DEFAULT_URGENCY):
+    """
+    send_zeta for the async mode: the nonce, fees and chain id come from the
+    warmed-up ChainContext, so the only awaited RPC is the broadcast. Cache
+    misses (new block fee history, new gas shape) run in a worker thread.
+    """
+    context = get_context()
+    if context is None:
+        raise ValueError("Private key not found in .env")
+    if _async_w3 is None:
+        raise RuntimeError("Async web3 is not open; call open_async_web3() first")
+    _check_value(value_wei)
+    if context.nonces.needs_sync:
+        await asyncio.to_thread(context.warm_up)
+
+    return await _async_send_with_nonce(
+        context, lambda nonce: _async_sign_and_send(context, to_address, value_wei, nonce, urgency)
+    )
+
+async def async_send_prepared(tx: dict):
+    """send_prepared for the async mode."""
+    context = get_context()
+    if context is None:
+        raise ValueError("Private key not found in .env")
+    if _async_w3 is None:
+        raise RuntimeError("Async web3 is not open; call open_async_web3() first")
+    if context.nonces.needs_sync:
+        # The nonce was invalidated since prepare: reload it off the event loop
+        await asyncio.to_thread(context.warm_up)
+
+    async def attempt(nonce: int):
+        signed_tx = await asyncio.to_thread(_sign_tx, context, dict(tx, nonce=nonce))
+        return await _async_send_signed(signed_tx)
+
+    return await _async_send_with_nonce(context, attempt)
+
+async def _async_send_with_nonce(context: ChainContext, attempt):
+    nonces = context.nonces
+    with SEND_STAGE_LATENCY.labels("nonce").time():
+        nonce = nonces.allocate()
+    try:
+        return await attempt(nonce)
+    except Exception as e:
+        if not (is_nonce_too_low(e) or is_nonce_gap(e)):
+            await asyncio.to_thread(_after_failure, nonces, nonce, e)
+            raise
+        with SEND_STAGE_LATENCY.labels("nonce").time():
+            await asyncio.to_thread(nonces.resync)
+            nonce = nonces.allocate()
+        try:
+            return await attempt(nonce)
+        except Exception as e:
+            await asyncio.to_thread(_after_failure, nonces, nonce, e)
+            raise
+
+def send_zeta_batch(transfers: list):
+    """
+    Send many (to_address, value_wei, urgency) transfers with consecutive nonces.
+
+    Unknown gas shapes are estimated in JSON-RPC batches, then all
+    transactions are signed locally and broadcast in batch requests of at
+    most RPC_BATCH_SIZE. A slice that fails leaves the later ones unsent.
+    Returns one dict per transfer, in order, holding either "tx_hash" or "error".
+    If a broadcast slice fails without an answer, each of its items holds both an
+    "error" and the "tx_hash" it may have been mined under, with "unknown": True.
+    """
+    context = get_context()
+    if context is None:
+        raise ValueError("Private key not found in .env")
+    if not transfers:
+        return []
+
+    results = [None] * len(transfers)
+    calls = []
+    fees = {}
+    for i, (to_address, value_wei, urgency) in enumerate(transfers):
+        try:
+            if urgency not in fees:
+                with SEND_STAGE_LATENCY.labels("fees").time():
+                    fees[urgency] = context.fee_fields(urgency)
+            calls.append((i, urgency, {'to': w3.to_checksum_address(to_address), 'value': _check_value(value_wei)}))
+        except Exception as e:
+            results[i] = {"error": str(e)}
+    if not calls:
+        return results
+
+    with SEND_STAGE_LATENCY.labels("gas").time():
+        gas_limits = context.gas.estimate_many([call for _, _, call in calls])
+
+    nonces = context.nonces
+    with SEND_STAGE_LATENCY.labels("nonce").time():
+        allocated = iter(nonces.allocate_many(sum(not isinstance(gas, Exception) for gas in gas_limits)))
+    pending = []
+    for (i, urgency, call), gas in zip(calls, gas_limits):
+        if isinstance(gas, Exception):
+            results[i] = {"error": str(gas)}
+            continue
+        nonce = next(allocated)
+        try:
+            tx = dict(call, nonce=nonce, gas=gas, chainId=context.chain_id, **fees[urgency])
+            with SEND_STAGE_LATENCY.labels("sign").time():
+                signed_tx = context.account.sign_transaction(tx)
+        except Exception as e:
+            nonces.release(nonce)
+            results[i] = {"error": str(e)}
+            continue
+        pending.append((i, nonce, signed_tx))
+
+    if not pending:
+        return results
+
+    needs_resync = False
+    for start, chunk in batch_slices(pending):
+        try:
+            with SEND_STAGE_LATENCY.labels("broadcast").time():
+                responses = w3.provider.make_batch_request([
+                    ("eth_sendRawTransaction", [w3.to_hex(signed_tx.raw_transaction)])
+                    for _, _, signed_tx in chunk
+                ])
+        except Exception as e:
+            if is_connect_error(e):
+                # Nothing from this slice on reached a node
+                _skip_unsent(pending[start:], nonces, results, str(e))
+                if start == 0:
+                    raise
+                break
+            # Any of them may have gone out: report the hashes so clients check instead of resending
+            for i, _, signed_tx in chunk:
+                unknown = BroadcastUnknownError(_tx_hash(signed_tx), e)
+                results[i] = {"error": str(unknown), "tx_hash": unknown.tx_hash, "unknown": True}
+                receipt_tracker.track(unknown.tx_hash)
+            # Later nonces would queue behind the unknown ones: leave them unsent
+            _skip_unsent(pending[start + len(chunk):], nonces, results, "Not sent: an earlier part of the batch has an unknown outcome")
+            _resync_after_unknown(nonces)
+            return results
+        if not isinstance(responses, list):
+            # The node rejected the slice as a whole
+            message = f"Batch request failed: {responses.get('error')}"
+            _skip_unsent(pending[start:], nonces, results, message)
+            if start == 0:
+                raise ValueError(message)
+            break
+
+        for (i, nonce, signed_tx), response in zip(chunk, responses):
+            if "error" in response:
+                message = response["error"].get("message", str(response["error"]))
+                if is_already_known(message):
+                    # The node has this exact transaction (e.g. a retried request): it was sent
+                    results[i] = {"tx_hash": _tx_hash(signed_tx)}
+                    receipt_tracker.track(results[i]["tx_hash"])
+                    continue
+                results[i] = {"error": message}
+                if is_nonce_too_low(message) or is_nonce_gap(message):
+                    needs_resync = True
+                else:
+                    nonces.release(nonce)
+            else:
+                results[i] = {"tx_hash": response["result"]}
+                receipt_tracker.track(response["result"])
+    if needs_resync:
+        nonces.resync()
+    return results
+
+def _skip_unsent(pending: list, nonces, results: list, message: str):
+    """Release the nonces of signed batch items that were never broadcast."""
+    for i, nonce, _ in pending:
+        nonces.release(nonce)
+        results[i] = {"error": message}
+
+def _build_tx(context: ChainContext, to_address: str, value_wei: int, urgency: str) -> dict:
+    # Build transaction (everything but the nonce)
     tx = {
-        'nonce': nonce,
         'to': w3.to_checksum_address(to_address),
         'value': value_wei,
-        'gas': 2000000, 
-        'gasPrice': w3.eth.gas_price,
-        'chainId': w3.eth.chain_id
+        'chainId': context.chain_id
     }
-    
+    with SEND_STAGE_LATENCY.labels("gas").time():
+        tx['gas'] = context.gas.estimate(tx)
+    with SEND_STAGE_LATENCY.labels("fees").time():
+        tx.update(context.fee_fields(urgency))
+    return tx
+
+def _sign_tx(context: ChainContext, tx: dict):
+    with SEND_STAGE_LATENCY.labels("sign").time():
+        return context.account.sign_transaction(tx)
+
+def _sign(context: ChainContext, to_address: str, value_wei: int, nonce: int, urgency: str):
+    tx = _build_tx(context, to_address, value_wei, urgency)
+    tx['nonce'] = nonce
+
     # Sign transaction
-    signed_tx = w3.eth.account.sign_transaction(tx, PRIVATE_KEY)
-    
+    return _sign_tx(context, tx)
+
+def _tx_hash(signed_tx) -> str:
+    return w3.to_hex(keccak(signed_tx.raw_transaction))
+
+def _broadcast_failed(signed_tx, error: Exception) -> str:
+    """
+    Called from the `except` of a broadcast. Returns the hash if the node
+    already has this exact transaction; re-raises node rejections and connect
+    errors as is (the nonce can be released); anything else leaves the
+    outcome unknown and becomes a BroadcastUnknownError.
+    """
+    if is_already_known(error):
+        return _tx_hash(signed_tx)
+    if isinstance(error, Web3RPCError) or is_connect_error(error):
+        raise error
+    unknown = BroadcastUnknownError(_tx_hash(signed_tx), error)
+    receipt_tracker.track(unknown.tx_hash)
+    raise unknown from error
+
+def _send_signed(signed_tx):
     # Send transaction
-    tx_hash = w3.eth.send_raw_transaction(signed_tx.raw_transaction)
-    
-    return w3.to_hex(tx_hash)
+    with SEND_STAGE_LATENCY.labels("broadcast").time():
+        try:
+            tx_hash = w3.to_hex(w3.eth.send_raw_transaction(signed_tx.raw_transaction))
+        except Exception as e:
+            tx_hash = _broadcast_failed(signed_tx, e)
+    receipt_tracker.track(tx_hash)
+
+    return tx_hash
+
+def _sign_and_send(context: ChainContext, to_address: str, value_wei: int, nonce: int, urgency: str):
+    return _send_signed(_sign(context, to_address, value_wei, nonce, urgency))
+
+async def _async_send_signed(signed_tx):
+    with SEND_STAGE_LATENCY.labels("broadcast").time():
+        try:
+            tx_hash = w3.to_hex(await _async_w3.eth.send_raw_transaction(signed_tx.raw_transaction))
+        except Exception as e:
+            tx_hash = _broadcast_failed(signed_tx, e)
+    receipt_tracker.track(tx_hash)
+    return tx_hash
+
+async def _async_sign_and_send(context: ChainContext, to_address: str, value_wei: int, nonce: int, urgency: str):
+    signed_tx = await asyncio.to_thread(_sign, context, to_address, value_wei, nonce, urgency)
+    return await _async_send_signed(signed_tx)
@@ -4,18 +4,27 @@ import './App.css'
 interface AgentResponse {
   type: string;
   recipient: string;
-  amount: number;
+  // Decimal string; base_units is the exact integer the backend signs with
+  amount: string;
   token: string;
+  // Sent as a string: wei amounts exceed Number.MAX_SAFE_INTEGER
+  base_units?: string | null;
   error?: string;
   raw?: string;
+  // Set when the backend already prefetched gas and fees for this transfer
+  confirmation?: { token: string; expires_in: number } | null;
 }
 
 function App() {
   const [prompt, setPrompt] = useState('')
   const [loading, setLoading] = useState(false)
   const [agentResponse, setAgentResponse] = useState<AgentResponse | null>(null)
+  // One key per parsed intent: repeated clicks or retries reuse the original transfer
+  const [idempotencyKey, setIdempotencyKey] = useState<string | null>(null)
   const [txHash, setTxHash] = useState<string | null>(null)
   const [explorerUrl, setExplorerUrl] = useState<string | null>(null)
+  // 504 from the backend: the broadcast may or may not have gone through
+  const [unknownTx, setUnknownTx] = useState<{ message: string; tx_hash: string } | null>(null)
   const [logs, setLogs] = useState<string[]>([])
 
   const addLog = (msg: string) => setLogs(prev => [...prev, `[${new Date().toLocaleTimeString()}] ${msg}`])
@@ -26,10 +35,12 @@ function App() {
     setAgentResponse(null);
     setTxHash(null);
     setExplorerUrl(null);
+    setUnknownTx(null);
     addLog(`Sending prompt to Agent: "${prompt}"`);
 
     try {
-      const res = await fetch('http://localhost:8000/api/chat', {
+      // Parses the intent and prepares the transaction in one round trip
+      const res = await fetch('http://localhost:8000/api/chat/prepare', {
         method: 'POST',
         headers: { 'Content-Type': 'application/json' },
         body: JSON.stringify({ prompt })
@@ -40,6 +51,7 @@ function App() {
       const data = await res.json();
       addLog('Agent parsed user intent.');
       setAgentResponse(data);
+      setIdempotencyKey(crypto.randomUUID());
     } catch (err) {
       addLog(`Error: ${err}`);
       console.error(err);
@@ -51,15 +63,46 @@ function App() {
   const handleExecute = async () => {
     if (!agentResponse) return;
     setLoading(true);
+    setUnknownTx(null);
     addLog('Executing transaction on ZetaChain...');
 
     try {
-      const res = await fetch('http://localhost:8000/api/execute', {
-        method: 'POST',
-        headers: { 'Content-Type': 'application/json' },
-        body: JSON.stringify(agentResponse)
-      });
+      const confirmation = agentResponse.confirmation;
+      // A prepared transfer only needs signing; its token doubles as the idempotency key
+      const res = confirmation
+        ? await fetch('http://localhost:8000/api/execute/confirm', {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({ confirmation_token: confirmation.token })
+          })
+        : await fetch('http://localhost:8000/api/execute', {
+            method: 'POST',
+            headers: {
+              'Content-Type': 'application/json',
+              ...(idempotencyKey ? { 'Idempotency-Key': idempotencyKey } : {}),
+            },
+            // Amount only: base_units can exceed 2^53 and would not survive a JS number round trip
+            body: JSON.stringify({
+              recipient: agentResponse.recipient,
+              amount: agentResponse.amount,
+              token: agentResponse.token,
+            })
+          });
+
+      if (res.status === 410) {
+        setAgentResponse({ ...agentResponse, confirmation: null });
+        throw new Error('Confirmation expired, click again to send without the prepared transaction');
+      }
 
+      if (res.status === 429) {
+        throw new Error(`Too many pending transfers, retry in ${res.headers.get('Retry-After') ?? 'a few'}s`);
+      }
+      if (res.status === 504) {
+        // Outcome unknown: the transfer may still land, so show its hash instead of inviting a resend
+        const { detail } = await res.json();
+        setUnknownTx(detail);
+        throw new Error(detail.message);
+      }
       if (!res.ok) {
         const errData = await res.json();
         throw new Error(errData.detail || 'Execution failed');
@@ -122,6 +165,15 @@ function App() {
         </div>
       )}
 
+      {unknownTx && (
+        <div className="card">
+          <h3>3. Outcome Unknown</h3>
+          <p>{unknownTx.message}</p>
+          <p>Transaction Hash: {unknownTx.tx_hash}</p>
+          <p>Check this hash on ZetaScan before sending again.</p>
+        </div>
+      )}
+
       <div className="card" style={{ marginTop: '40px', fontSize: '0.8em', color: '#888' }}>
         <h4>Logs</h4>
         {logs.map((log, i) => (